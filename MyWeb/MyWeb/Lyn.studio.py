@@ -1,189 +1,80 @@
 import streamlit as st
-import pandas as pd
 import datetime
-import sqlite3
+import hashlib
 import json
-from streamlit_calendar import calendar
+import os
+import sys
 
 # ==========================================
-# 1. 数据库逻辑 (保持不变)
+# 1. 数据库逻辑
 # ==========================================
-DB_FILE = 'my_notion.db'
-
-
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute(
-        '''CREATE TABLE IF NOT EXISTS problems (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, difficulty TEXT, tags TEXT, link TEXT, description TEXT, solution_code TEXT, notes TEXT, created_at DATE)''')
-    c.execute(
-        '''CREATE TABLE IF NOT EXISTS logs (id INTEGER PRIMARY KEY AUTOINCREMENT, problem_id INTEGER, log_date DATE, status TEXT)''')
-    c.execute(
-        '''CREATE TABLE IF NOT EXISTS resources (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, category TEXT, url TEXT, image_url TEXT)''')
-    c.execute(
-        '''CREATE TABLE IF NOT EXISTS notebooks (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, created_at DATE)''')
-    c.execute(
-        '''CREATE TABLE IF NOT EXISTS notes (id INTEGER PRIMARY KEY AUTOINCREMENT, notebook_id INTEGER, title TEXT, content TEXT, created_at DATE, updated_at DATE)''')
-    conn.commit()
-    conn.close()
-
-
-def run_query(query, params=(), fetch=False, get_lastrowid=False):
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute(query, params)
-    if fetch:
-        data = c.fetchall()
-        conn.close()
-        return [dict(row) for row in data]
-    else:
-        last_id = c.lastrowid if get_lastrowid else None
-        conn.commit()
-        conn.close()
-        return last_id
+# 连接池、表结构迁移都来自 my_web 应用目录 (my_web/my_web) 的 db.py / migrations.py，
+# 两个应用打开同一个数据库时看到的是同一套表结构，谁都可以写入。
+# 默认按仓库里的目录结构找 (本文件的 ../../my_web/my_web)；放在别处时用环境变量 MY_NOTION_WEB_DIR 指定那个目录。
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+WEB_DIR = os.path.abspath(os.environ.get("MY_NOTION_WEB_DIR",
+                                         os.path.join(APP_DIR, "..", "..", "my_web", "my_web")))
+if not os.path.exists(os.path.join(WEB_DIR, "db.py")):
+    raise ImportError(f"在 {WEB_DIR} 下找不到 db.py：请把 MY_NOTION_WEB_DIR 设为 my_web 应用所在的目录 (见 README)")
+sys.path.insert(0, WEB_DIR)
+
+import db  # noqa: E402
+from db import run_query  # noqa: E402
+from ui import init_db_once  # noqa: E402
 
+DB_FILE = 'my_notion.db'
+db.DB_FILE = os.path.abspath(DB_FILE)
 
-init_db()
+# 与 my_web 的 app.py 相同：迁移每个进程只执行一次，之后的 rerun 不再检查
+init_db_once(db.DB_FILE)
 
 # ==========================================
 # 2. UI 样式
 # ==========================================
 st.set_page_config(page_title="Lyn's Apricot Studio", page_icon="🍊", layout="wide")
 
-# --- 新增：日历专用的 CSS 变量 ---
-calendar_style = """
-    .fc .fc-button-primary {
-        background-color: white !important;
-        border: 1.5px solid #FFEDD5 !important;
-        color: #5F5A54 !important;
-        border-radius: 12px !important;
-        font-weight: 600 !important;
-        transition: all 0.2s !important;
-        text-transform: capitalize !important;
-    }
-
-    /* 文字居中 */
-    .fc-event-title {
-        display: flex !important;
-        justify-content: center !important;
-        align-items: center !important;
-        text-align: center !important;
-        font-family: 'Quicksand', sans-serif !important;
-        font-weight: 700 !important;
-    }
-
-    .fc .fc-button-primary:hover {
-        border-color: #FFB347 !important;
-        color: #FFB347 !important;
-        background-color: #FFFBF5 !important;
-    }
-
-    /* 修改此处：让激活状态的按钮（如month）也保持白底样式，与today一致 */
-    .fc .fc-button-primary.fc-button-active {
-        background-color: white !important;
-        border-color: #FFEDD5 !important;
-        color: #5F5A54 !important;
-        box-shadow: none !important;
-    }
-
-    /* 激活态按钮的悬停效果 */
-    .fc .fc-button-primary.fc-button-active:hover {
-        border-color: #FFB347 !important;
-        color: #FFB347 !important;
-    }
-
-    .fc-event { cursor: pointer !important; }
-    .fc-event-title { 
-        text-align: center !important; 
-        font-weight: 700 !important; 
-        font-family: 'Quicksand', sans-serif !important;
-    }
-"""
-
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Quicksand:wght@500;700&family=Noto+Sans+SC:wght@500&display=swap');
-
-    :root {
-        --bg-orange: #FFFBF5; 
-        --dot-color: #FFD3A3; 
-        --card-bg: rgba(255, 255, 255, 0.82);
-        --text-main: #5F5A54;
-        --mac-orange: #FFEDD5;
-        --accent-orange: #FFB347;
-    }
-
-    .stApp {
-        background-color: var(--bg-orange);
-        background-image: radial-gradient(var(--dot-color) 1.8px, transparent 1.8px);
-        background-size: 32px 32px;
-        background-attachment: fixed;
-        color: var(--text-main);
-        font-family: 'Quicksand', 'Noto Sans SC', sans-serif;
-    }
-
-    .creamy-card {
-        background: var(--card-bg);
-        backdrop-filter: blur(15px);
-        border: 2px solid white;
-        border-radius: 32px;
-        padding: 24px;
-        margin-bottom: 15px;
-        box-shadow: 0 8px 25px rgba(255, 179, 71, 0.12);
-        transition: all 0.3s ease;
-    }
-    .creamy-card:hover {
-        transform: translateY(-3px);
-        border-color: var(--accent-orange);
-        box-shadow: 0 12px 30px rgba(255, 179, 71, 0.18);
-    }
-
-    /* --- 修改：筛选器卡片样式（让线框更细致贴合） --- */
-    [data-testid="stExpander"] {
-        background: white !important;
-        border: 1px solid #FFEDD5 !important; /* 减细边框，颜色减淡 */
-        border-radius: 32px !important;
-        box-shadow: 0 4px 15px rgba(255, 179, 71, 0.08) !important;
-    }
-    [data-testid="stExpander"] > details {
-        border: none !important;
-    }
-
-    /* 侧边栏 */
-    [data-testid="stSidebar"] {
-        background-color: rgba(255, 255, 255, 0.4) !important;
-        backdrop-filter: blur(20px);
-        border-right: 1px dashed var(--accent-orange);
-    }
-
-    .sticker {
-        display: inline-block;
-        padding: 4px 12px;
-        border-radius: 14px;
-        font-size: 11px;
-        font-weight: 700;
-        margin-right: 8px;
-    }
-    .st-orange { background: #FFEDD5; color: #9A3412; }
-    .st-green { background: #D1FAE5; color: #065F46; }
-    .st-blue { background: #E0F2FE; color: #0369A1; }
-    .st-pink { background: #FCE7F3; color: #9D174D; }
-
-    .stButton>button {
-        border-radius: 18px !important;
-        border: 1.5px solid white !important;
-        background: rgba(255,255,255,0.7) !important;
-        font-weight: 600 !important;
-        color: var(--text-main) !important;
-    }
-    .stButton>button:hover {
-        border-color: var(--accent-orange) !important;
-        background: white !important;
-        color: var(--accent-orange) !important;
-    }
-    </style>
-""", unsafe_allow_html=True)
+# 样式在 assets/ 下 (theme.css 全站、calendar.css 日历)，按内容哈希复制到 static/ 后引用：
+# 内容不变地址就不变，浏览器缓存之后不再重复下载；Streamlit 以 app/static/ 提供 static/ (见 .streamlit/config.toml)。
+# 本地字体由 my_web 的 assets.py 下载 (见 README)，生成 assets/fonts.css 之后这里会一并引用。
+STATIC_SERVING = st.get_option("server.enableStaticServing")
+
+
+def _css_source(name):
+    path = os.path.join(APP_DIR, "assets", f"{name}.css")
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def static_css(name):
+    """把 assets/<name>.css 复制为 static/<name>.<内容哈希>.css (已存在则跳过)，返回文件名；源文件不存在时返回 None。"""
+    data = _css_source(name)
+    if data is None:
+        return None
+    filename = f"{name}.{hashlib.sha256(data).hexdigest()[:10]}.css"
+    path = os.path.join(APP_DIR, "static", filename)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)  # 不会让别的会话读到写了一半的文件
+    return filename
+
+
+def stylesheet_imports(*names):
+    """日历组件在 iframe 里，只能在 custom_css 里用 @import 引用 (绝对地址)。没打开静态文件服务时直接写入样式内容。"""
+    if not STATIC_SERVING:
+        return "".join(_css_source(n).decode("utf-8") for n in names if n != "fonts" and _css_source(n))
+    return "".join(f'@import url("/app/static/{filename}");\n' for filename in map(static_css, names) if filename)
+
+
+if STATIC_SERVING:
+    st.markdown("".join(f'<link rel="stylesheet" href="app/static/{filename}">'
+                        for filename in map(static_css, ("fonts", "theme")) if filename), unsafe_allow_html=True)
+else:  # 本地字体要靠静态文件服务提供，这里只写入主题
+    st.markdown(f"<style>{_css_source('theme').decode('utf-8')}</style>", unsafe_allow_html=True)
 
 # ==========================================
 # 3. 路由逻辑
@@ -279,7 +170,7 @@ elif curr == "problems":
             if st.button("详情", key=f"view_{p['id']}"): navigate("problem_detail", id=p['id'], src="problems")
             if st.session_state.get('conf_p') == p['id']:
                 if st.button("✅", key=f"cp_{p['id']}"):
-                    run_query("DELETE FROM problems WHERE id=?", (p['id'],))
+                    run_query("DELETE FROM problems WHERE id=?", (p['id'],))  # 打卡记录由外键级联删除
                     st.session_state.conf_p = None
                     st.rerun()
             else:
@@ -327,6 +218,8 @@ elif curr == "problem_detail":
 
 # --- ⏳ 日历 ---
 elif curr == "calendar":
+    from streamlit_calendar import calendar  # 只有日历页用到，放在这里导入，其他页面冷启动不必加载
+
     st.title("日历 ⏳")
     logs = run_query(
         "SELECT logs.log_date, problems.title, problems.id as pid FROM logs JOIN problems ON logs.problem_id = problems.id",
@@ -334,11 +227,11 @@ elif curr == "calendar":
     events = [{"id": str(l['pid']), "title": f"{l['title']}", "start": str(l['log_date']), "backgroundColor": "#FFEDD5",
                "borderColor": "#FFB347", "textColor": "#9A3412"} for l in logs]
 
-    # 修改：将定义的 calendar_style 通过 custom_css 参数注入
+    # 修改：日历样式通过 custom_css 里的 @import 引用 (assets/calendar.css)，不再每次传入整段样式
     cal_res = calendar(
         events=events,
         options={"headerToolbar": {"left": "prev,next today", "center": "title", "right": "dayGridMonth"}},
-        custom_css=calendar_style
+        custom_css=stylesheet_imports("fonts", "calendar")
     )
     if cal_res.get("eventClick"):
         pid = cal_res["eventClick"]["event"]["id"]
@@ -397,7 +290,7 @@ elif curr == "notebook":
             if st.button("进入", key=f"enb_{nb['id']}"): navigate("notebook_detail", nid=nb['id'])
             if st.session_state.get('conf_nb') == nb['id']:
                 if st.button("✅", key=f"cnb_{nb['id']}"):
-                    run_query("DELETE FROM notebooks WHERE id=?", (nb['id'],))
+                    run_query("DELETE FROM notebooks WHERE id=?", (nb['id'],))  # 笔记由外键级联删除
                     st.session_state.conf_nb = None
                     st.rerun()
             else:
@@ -0,0 +1,251 @@
+import datetime
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import db
+from db import run_query
+
+# ==========================================
+# 统计分析：打卡热力图、按难度 / 标签的趋势、连续打卡天数
+# ==========================================
+# 已完成的打卡记录一次读进 DataFrame (每行只有 日期 / 题目 两列)，题目的难度和标签读成按题目 id 下标的数组，
+# 所有统计都是整列的 groupby / bincount，不逐行循环。
+# 读取时让 SQLite 按日期 (难度、标签) 分组、把题目 id 用 group_concat 拼成一个字符串，每组只解析一次，
+# 比逐行取 tuple 再构造 DataFrame 快几倍。
+# 读出的数据和算好的统计缓存在进程里，按数据版本失效：版本是 stats 表里由触发器维护的计数 (迁移版本 10)，
+# 只新增了打卡记录时只读新增的行，其他修改才整表重读；数据没变时打开页面只读 stats 的一行。
+# 这个模块不依赖 streamlit，统计页面 (views/analytics_view.py) 调用它。
+
+HEATMAP_WEEKS = 53  # 热力图显示的周数 (和 GitHub 一样约一年)
+TREND_WEEKS = 26  # 难度趋势：按周
+TREND_MONTHS = 12  # 标签趋势：按月
+TOP_TAGS = 8
+DIFFICULTY_ORDER = ["简单", "中等", "困难"]
+
+Report = namedtuple("Report", ["heatmap", "difficulty_trend", "tag_trend", "summary"])
+
+_VERSION = "SELECT log_inserts, log_edits, problem_edits FROM stats WHERE id = 1"
+# 日期换成距 1970-01-01 的天数 (每组算一次)；日期无法解析的记录不参与统计
+_LOGS_BY_DAY = ("SELECT CAST(julianday(substr(log_date, 1, 10)) - 2440587.5 AS INTEGER) AS day, "
+                "group_concat(problem_id) FROM logs WHERE id > ? AND id <= ? AND status = '已完成' "
+                "AND problem_id IS NOT NULL GROUP BY log_date HAVING day IS NOT NULL")
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def _day_number(day):
+    return (day - _EPOCH).days
+
+
+def _dates(days):
+    """天数数组 -> DatetimeIndex。"""
+    return pd.DatetimeIndex(np.asarray(days, dtype="int64").astype("datetime64[D]"))
+
+
+def _read_groups(query, params=()):
+    """读 (键, group_concat(id)) 的分组结果，返回 (键的列表, 每组 id 数组的列表)。"""
+    keys, ids = [], []
+    for key, joined in run_query(query, params, fetch=True, cache=False, as_tuple=True):
+        keys.append(key)
+        ids.append(np.fromstring(joined, dtype=np.int64, sep=","))
+    return keys, ids
+
+
+def _read_logs(first_id, last_id):
+    """id 在 (first_id, last_id] 内、已完成的打卡记录：DataFrame(day, problem_id)。"""
+    days, ids = _read_groups(_LOGS_BY_DAY, (first_id, last_id))
+    return pd.DataFrame({
+        "day": np.repeat(np.array(days, dtype=np.int32), [len(i) for i in ids]),
+        "problem_id": np.concatenate(ids) if ids else np.empty(0, dtype=np.int64),
+    })
+
+
+class _Data:
+    """一个数据库的打卡 / 题目数据，和按数据版本缓存的统计结果。"""
+
+    def __init__(self):
+        self.version = None
+        self.logs = None  # 已完成的打卡：DataFrame(day (天数), problem_id)
+        self.max_log_id = 0  # 读取时 logs 表的最大 id，之后新增的打卡只需读它之后的行
+        self.difficulty = np.full(1, -1, dtype=np.int8)  # 题目 id -> 难度编号，-1 表示没有难度
+        self.difficulties = []
+        # 题目的标签 (CSR)：题目 p 的标签编号是 tag_codes[tag_offsets[p]:tag_offsets[p + 1]]
+        self.tag_offsets = np.zeros(2, dtype=np.int64)
+        self.tag_codes = np.empty(0, dtype=np.int32)
+        self.tag_names = []
+        self.reports = {}  # 日期 -> Report
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """数据版本变了时重读变化的部分，返回是否有变化。"""
+        version = tuple(run_query(_VERSION, fetch=True, cache=False, as_tuple=True)[0])
+        if version == self.version:
+            return False
+        old = self.version or (None, None, None)
+        if old[2] != version[2]:
+            self._load_problems()
+        if old[1] != version[1] or not self._append_logs(version[0] - old[0]):
+            self._load_logs()
+        self.version = version
+        self.reports.clear()
+        return True
+
+    def _load_logs(self):
+        self.max_log_id = run_query("SELECT COALESCE(MAX(id), 0) FROM logs", fetch=True, cache=False,
+                                    as_tuple=True)[0][0]
+        self.logs = _read_logs(0, self.max_log_id)
+
+    def _append_logs(self, inserted):
+        """
+        只新增了 inserted 条打卡记录：读 max_log_id 之后的行。
+        之后的行数对不上时 (导入时指定了较小的 id，或者读取期间又有写入) 返回 False，由调用方整表重读。
+        """
+        if self.logs is None:
+            return False
+        added, max_log_id = run_query("SELECT COUNT(*), MAX(id) FROM logs WHERE id > ?", (self.max_log_id,),
+                                      fetch=True, cache=False, as_tuple=True)[0]
+        if added != inserted:
+            return False
+        if added:
+            self.logs = pd.concat([self.logs, _read_logs(self.max_log_id, max_log_id)], ignore_index=True)
+            self.max_log_id = max_log_id
+        return True
+
+    def _load_problems(self):
+        names, ids = _read_groups("SELECT difficulty, group_concat(id) FROM problems "
+                                  "WHERE difficulty IS NOT NULL GROUP BY difficulty")
+        size = int(run_query("SELECT COALESCE(MAX(id), 0) FROM problems", fetch=True, cache=False,
+                             as_tuple=True)[0][0]) + 1
+        order = sorted(range(len(names)), key=lambda i: (
+            DIFFICULTY_ORDER.index(names[i]) if names[i] in DIFFICULTY_ORDER else len(DIFFICULTY_ORDER), names[i]))
+        self.difficulty = np.full(size, -1, dtype=np.int8)
+        for code, i in enumerate(order):
+            self.difficulty[ids[i]] = code
+        self.difficulties = [names[i] for i in order]
+
+        tag_names, tag_ids = _read_groups("SELECT tag, group_concat(problem_id) FROM problem_tags GROUP BY tag")
+        problem_ids = np.concatenate(tag_ids) if tag_ids else np.empty(0, dtype=np.int64)
+        codes = np.repeat(np.arange(len(tag_names), dtype=np.int32), [len(i) for i in tag_ids])
+        by_problem = np.argsort(problem_ids, kind="stable")
+        self.tag_codes = codes[by_problem]
+        self.tag_offsets = np.concatenate(([0], np.cumsum(np.bincount(problem_ids, minlength=size))))
+        self.tag_names = tag_names
+
+    def difficulty_of(self, problem_ids):
+        known = problem_ids < len(self.difficulty)
+        return np.where(known, self.difficulty[np.where(known, problem_ids, 0)], -1)
+
+    def expand_tags(self, problem_ids):
+        """每个题目展开成它的每个标签：返回 (原数组的下标, 标签编号)，都是长度为标签总数的数组。"""
+        problem_ids = np.where(problem_ids < len(self.tag_offsets) - 1, problem_ids, 0)
+        starts = self.tag_offsets[problem_ids]
+        counts = self.tag_offsets[problem_ids + 1] - starts
+        owner = np.repeat(np.arange(len(problem_ids)), counts)
+        # 第 k 个输出位置对应 tag_codes[starts[owner] + (k - 该题目第一个输出位置)]
+        positions = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts) + starts[owner]
+        return owner, self.tag_codes[positions]
+
+
+_data = {}  # 数据库文件 -> _Data
+_data_lock = threading.Lock()
+
+
+def _get_data():
+    path = os.path.abspath(db.DB_FILE)
+    with _data_lock:
+        data = _data.get(path)
+        if data is None:
+            data = _data[path] = _Data()
+        return data
+
+
+def _heatmap(days, today):
+    """最近 HEATMAP_WEEKS 周 (从周一开始) 每天完成的次数，按日期索引的 Series。"""
+    start = today - (today + 3) % 7 - (HEATMAP_WEEKS - 1) * 7  # 1970-01-01 是周四
+    in_range = days[(days >= start) & (days <= today)]
+    counts = np.bincount(in_range - start, minlength=today - start + 1)
+    return pd.Series(counts, index=_dates(np.arange(start, today + 1)), name="solved")
+
+
+def _difficulty_trend(data, logs, today):
+    """最近 TREND_WEEKS 周每周各难度完成的次数 (行：周一的日期，列：难度)。"""
+    last_week = (today + 3) // 7
+    first_week = last_week - TREND_WEEKS + 1
+    weeks = (logs["day"].to_numpy() + 3) // 7
+    mask = (weeks >= first_week) & (weeks <= last_week)
+    codes = data.difficulty_of(logs["problem_id"].to_numpy()[mask])
+    counts = (pd.DataFrame({"week": weeks[mask], "difficulty": codes})
+              .query("difficulty >= 0")
+              .groupby(["week", "difficulty"]).size()
+              .unstack(fill_value=0)
+              .reindex(index=range(first_week, last_week + 1), columns=range(len(data.difficulties)), fill_value=0))
+    counts.index = _dates(counts.index.to_numpy() * 7 - 3)
+    counts.columns = data.difficulties
+    return counts
+
+
+def _tag_trend(data, logs, today):
+    """最近 TREND_MONTHS 个月完成次数最多的 TOP_TAGS 个标签每月的完成次数 (行：月初，列：标签)。"""
+    last_month = np.datetime64(today, "D").astype("datetime64[M]")
+    months = np.arange(last_month - TREND_MONTHS + 1, last_month + 1)
+    first_day = int(months[0].astype("datetime64[D]").astype(np.int64))
+    days = logs["day"].to_numpy()
+    mask = (days >= first_day) & (days <= today)
+    month_index = (days[mask].astype("datetime64[D]").astype("datetime64[M]") - months[0]).astype(np.int64)
+    owner, tags = data.expand_tags(logs["problem_id"].to_numpy()[mask])
+    counts = np.bincount(month_index[owner] * len(data.tag_names) + tags,
+                         minlength=TREND_MONTHS * len(data.tag_names)).reshape(TREND_MONTHS, len(data.tag_names))
+    top = [i for i in np.argsort(-counts.sum(axis=0), kind="stable")[:TOP_TAGS] if counts[:, i].any()]
+    return pd.DataFrame(counts[:, top], index=pd.DatetimeIndex(months.astype("datetime64[D]")),
+                        columns=[data.tag_names[i] for i in top])
+
+
+def _streaks(days, today):
+    """连续打卡：当前连续天数 (今天还没打卡时从昨天算起)、最长连续天数及其起止日期、打卡天数。"""
+    summary = {"active_days": 0, "current_streak": 0, "longest_streak": 0, "longest_start": None, "longest_end": None}
+    days = days[days <= today]
+    if not len(days):
+        return summary
+    first = int(days.min())
+    active = np.flatnonzero(np.bincount(days - first)) + first
+    breaks = np.flatnonzero(np.diff(active) != 1)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(active) - 1]))
+    lengths = ends - starts + 1
+    longest = int(np.argmax(lengths))
+    summary.update(
+        active_days=int(len(active)),
+        current_streak=int(lengths[-1]) if active[-1] >= today - 1 else 0,
+        longest_streak=int(lengths[longest]),
+        longest_start=_EPOCH + datetime.timedelta(days=int(active[starts[longest]])),
+        longest_end=_EPOCH + datetime.timedelta(days=int(active[ends[longest]])),
+    )
+    return summary
+
+
+def _report(data, day):
+    today = _day_number(day)
+    days = data.logs["day"].to_numpy()
+    heatmap = _heatmap(days, today)
+    summary = _streaks(days, today)
+    summary.update(total_solved=int(len(days)), year_solved=int(heatmap.sum()),
+                   best_day=heatmap.idxmax().date() if heatmap.any() else None, best_day_solved=int(heatmap.max()))
+    return Report(heatmap, _difficulty_trend(data, data.logs, today), _tag_trend(data, data.logs, today), summary)
+
+
+def report(day=None):
+    """
+    day (默认今天) 的统计：Report(heatmap, difficulty_trend, tag_trend, summary)。
+    只统计状态为 “已完成” 的打卡。返回的 DataFrame / Series 是缓存的结果，调用方不应修改。
+    """
+    day = day or datetime.date.today()
+    data = _get_data()
+    with data.lock:
+        data.refresh()
+        result = data.reports.get(day)
+        if result is None:
+            result = data.reports[day] = _report(data, day)
+        return result
@@ -0,0 +1,172 @@
+import argparse
+import hashlib
+import os
+import re
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# 静态资源：按内容哈希命名的样式表和本地字体
+# ==========================================
+# 样式的源文件在 assets/ 下，启动时复制到 static/<名字>.<内容哈希>.css，由 Streamlit 的静态文件服务提供
+# (.streamlit/config.toml 里打开 enableStaticServing，地址是 app/static/...)。页面只插入一行 <link>：
+# - 内容不变文件名就不变，浏览器缓存之后再打开页面、每次 rerun 都不再传输样式；改了样式文件名跟着变，不会用到旧缓存。
+# - 用 serve.py 启动时，带哈希的文件额外返回一年的 Cache-Control: immutable，连再验证的请求也省掉。
+# - 字体不再每次从 Google Fonts 加载：运行 fetch_fonts 把字体下载到 static/fonts/，并生成 assets/fonts.css，离线也能显示。
+# 这个模块不依赖 streamlit。
+#
+# 用法 (在 my_web/my_web 目录下)：
+#   python assets.py build     # 生成 static/ 下的哈希文件 (app.py 启动时也会自动生成)
+#   python assets.py fonts     # 下载字体到 static/fonts/，生成 assets/fonts.css
+#   python assets.py fonts --dir ../../MyWeb/MyWeb --family "Quicksand:wght@500;700" --family "Noto Sans SC:wght@500"
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(APP_DIR, "assets")
+STATIC_DIR = os.path.join(APP_DIR, "static")  # Streamlit 只提供主脚本旁边的 static/ 目录
+STATIC_URL = "app/static/"
+
+STYLESHEETS = ("fonts", "theme")  # 按顺序引用；fonts.css 由 fetch_fonts 生成，没有时跳过
+FONT_FAMILIES = ("Noto Sans SC:wght@300;400;700",)
+GOOGLE_FONTS_CSS = "https://fonts.googleapis.com/css2"
+# Google Fonts 按 User-Agent 决定返回的字体格式，用现代浏览器的 UA 才会拿到 woff2
+FONT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/124.0 Safari/537.36")
+FONT_DOWNLOADS = 8
+TIMEOUT = 30
+
+HASH_LENGTH = 10
+HASHED_FILE = re.compile(r"\.[0-9a-f]{%d}\.(?:css|woff2?)$" % HASH_LENGTH)
+_FONT_URL = re.compile(r"url\((https://[^)]+)\)")
+
+_published = {}  # (源文件路径, static 目录) -> (mtime_ns, 大小, 文件名)
+_lock = threading.Lock()
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def is_hashed(path):
+    """文件名里带内容哈希 (内容变了文件名一定跟着变)，可以让浏览器永久缓存。"""
+    return HASHED_FILE.search(path) is not None
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)  # 多个进程同时启动时，别的进程不会读到写了一半的文件
+
+
+def publish(name, source_dir=SOURCE_DIR, static_dir=STATIC_DIR):
+    """
+    把 source_dir/<name>.css 发布为 static_dir/<name>.<内容哈希>.css，并删掉这个样式的旧版本，返回文件名。
+    源文件的修改时间和大小没变时直接返回上次的结果 (每次 rerun 只多一次 stat)；源文件不存在时返回 None。
+    """
+    source = os.path.join(source_dir, f"{name}.css")
+    try:
+        stat = os.stat(source)
+    except FileNotFoundError:
+        return None
+    key = (source, static_dir)
+    with _lock:
+        cached = _published.get(key)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        with open(source, "rb") as f:
+            data = f.read()
+        filename = f"{name}.{content_hash(data)}.css"
+        os.makedirs(static_dir, exist_ok=True)
+        if not os.path.exists(os.path.join(static_dir, filename)):
+            _write_atomic(os.path.join(static_dir, filename), data)
+        for old in os.listdir(static_dir):
+            if old != filename and old.startswith(f"{name}.") and is_hashed(old):
+                os.remove(os.path.join(static_dir, old))
+        _published[key] = (stat.st_mtime_ns, stat.st_size, filename)
+        return filename
+
+
+def stylesheet_urls(names=STYLESHEETS):
+    return [STATIC_URL + filename for filename in map(publish, names) if filename]
+
+
+def link_tags(names=STYLESHEETS):
+    """页面里引用样式表的 <link> 标签。"""
+    return "".join(f'<link rel="stylesheet" href="{url}">' for url in stylesheet_urls(names))
+
+
+def inline_style(names=("theme",)):
+    """没打开静态文件服务时的退路：把样式直接写进 <style> (本地字体要靠静态文件服务提供，这里不包含)。"""
+    parts = []
+    for name in names:
+        source = os.path.join(SOURCE_DIR, f"{name}.css")
+        if os.path.exists(source):
+            with open(source, encoding="utf-8") as f:
+                parts.append(f.read())
+    return f"<style>\n{''.join(parts)}</style>"
+
+
+# --- 本地字体 ---
+def _download(url):
+    request = urllib.request.Request(url, headers={"User-Agent": FONT_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+        return response.read()
+
+
+def fetch_fonts(families=FONT_FAMILIES, source_dir=SOURCE_DIR, static_dir=STATIC_DIR, download=_download):
+    """
+    从 Google Fonts 下载 families 的字体文件到 static_dir/fonts/ (按内容哈希命名)，
+    把 CSS 里的字体地址换成本地的相对地址后写入 source_dir/fonts.css，再由 publish 发布。
+    中文字体按 unicode-range 切成很多小文件，浏览器只下载页面上用到的那几块。返回 (字体文件数, 总字节数)。
+    """
+    query = "&".join(f"family={urllib.parse.quote(family, safe=':;@')}" for family in families)
+    css = download(f"{GOOGLE_FONTS_CSS}?{query}&display=swap").decode("utf-8")
+    urls = list(dict.fromkeys(_FONT_URL.findall(css)))
+    fonts_dir = os.path.join(static_dir, "fonts")
+    os.makedirs(fonts_dir, exist_ok=True)
+
+    def save(url):
+        data = download(url)
+        extension = os.path.splitext(urllib.parse.urlparse(url).path)[1] or ".woff2"
+        filename = f"font.{content_hash(data)}{extension}"
+        path = os.path.join(fonts_dir, filename)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        return filename, len(data)
+
+    with ThreadPoolExecutor(FONT_DOWNLOADS) as pool:
+        saved = dict(zip(urls, pool.map(save, urls)))
+    # fonts.css 发布在 static/ 下，相对地址 fonts/... 指向 static/fonts/
+    css = _FONT_URL.sub(lambda m: f"url(fonts/{saved[m.group(1)][0]})", css)
+    os.makedirs(source_dir, exist_ok=True)
+    _write_atomic(os.path.join(source_dir, "fonts.css"),
+                  f"/* 由 python assets.py fonts 生成：{', '.join(families)} */\n{css}".encode("utf-8"))
+
+    # 删掉不再引用的旧字体文件
+    in_use = {filename for filename, _ in saved.values()}
+    for old in os.listdir(fonts_dir):
+        if old not in in_use and is_hashed(old):
+            os.remove(os.path.join(fonts_dir, old))
+    return len(saved), sum(size for _, size in saved.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="发布按内容哈希命名的样式表，下载本地字体")
+    parser.add_argument("command", choices=["build", "fonts"])
+    parser.add_argument("--dir", default=APP_DIR, help="应用目录 (样式源文件在 <dir>/assets，发布到 <dir>/static)")
+    parser.add_argument("--family", action="append", help="Google Fonts 的 family 参数，可以重复，例如 \"Noto Sans SC:wght@400;700\"")
+    args = parser.parse_args(argv)
+    source_dir, static_dir = os.path.join(args.dir, "assets"), os.path.join(args.dir, "static")
+
+    if args.command == "fonts":
+        count, size = fetch_fonts(args.family or FONT_FAMILIES, source_dir, static_dir)
+        print(f"已下载 {count} 个字体文件，共 {size / 1024 / 1024:.1f} MB，写入 {os.path.join(source_dir, 'fonts.css')}")
+    names = sorted(os.path.splitext(f)[0] for f in os.listdir(source_dir) if f.endswith(".css"))
+    for name in names:
+        print(f"{name}.css -> static/{publish(name, source_dir, static_dir)}")
+
+
+if __name__ == "__main__":
+    main()
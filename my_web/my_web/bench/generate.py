@@ -0,0 +1,132 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import time
+
+# ==========================================
+# 生成用于基准测试的合成数据库
+# ==========================================
+# 按规模生成 N 道题目、N 条打卡记录、N 篇笔记 (另有 N/100 个资源、N/1000 个笔记本)，
+# 表结构由 migrations.py 建立，标签索引、统计表都由触发器照常维护，和真实数据库一致；
+# 全文索引在写完之后用 search.sync_index() 一次建好 (和应用第一次搜索时做的一样)。
+# 同一个 seed 生成的数据完全相同，不同提交之间的结果可以直接对比。
+#
+# 用法 (在 my_web/my_web 目录下)：python bench/generate.py 1k 100k [--force]
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import db  # noqa: E402
+import search  # noqa: E402
+from db import get_pool  # noqa: E402
+from migrations import migrate  # noqa: E402
+
+DATA_DIR = os.path.join(APP_DIR, "bench", "data")
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+BATCH = 10_000
+
+DIFFICULTIES = ["简单", "中等", "困难"]
+TAGS = ["数组", "哈希表", "双指针", "字符串", "链表", "栈", "队列", "二分查找", "排序", "贪心", "动态规划", "回溯",
+        "深度优先搜索", "广度优先搜索", "树", "二叉树", "图", "堆", "滑动窗口", "前缀和", "位运算", "数学", "矩阵",
+        "并查集", "字典树", "单调栈", "拓扑排序", "最短路", "模拟", "设计"]
+WORDS_EN = ["two", "sum", "array", "string", "tree", "graph", "path", "window", "matrix", "interval", "merge",
+            "search", "binary", "stack", "queue", "heap", "prefix", "palindrome", "subarray", "sequence", "cache",
+            "node", "list", "island", "coin", "change", "jump", "game", "word", "break", "median", "rotate"]
+WORDS_ZH = ["两数之和", "最长", "子串", "回文", "合并", "区间", "旋转", "数组", "链表", "反转", "二叉树", "遍历",
+            "最大", "最小", "路径", "岛屿", "数量", "零钱", "兑换", "跳跃", "游戏", "单词", "拆分", "中位数", "缓存"]
+CATEGORIES = ["书籍", "文章", "视频", "工具", "网站"]
+DAYS = 3 * 365  # 数据分布在最近三年
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS_EN) if rng.random() < 0.5 else rng.choice(WORDS_ZH) for _ in range(words))
+
+
+def _day(rng, today):
+    return (today - datetime.timedelta(days=rng.randrange(DAYS))).isoformat()
+
+
+def _insert(conn, query, rows):
+    """分批 executemany，每批一个事务。"""
+    for start in range(0, len(rows), BATCH):
+        conn.execute("BEGIN")
+        conn.executemany(query, rows[start:start + BATCH])
+        conn.commit()
+
+
+def generate(path, n, seed=0):
+    """在 path 生成规模为 n 的数据库 (已存在的文件会被覆盖)。"""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    notebooks = max(5, n // 1000)
+
+    pool = get_pool(path)
+    with pool.connection() as conn:
+        migrate(conn)
+    pool.close_all()  # 与 db.init_db 一样，迁移之后换新连接再写入
+
+    with pool.connection() as conn:
+        _insert(conn, "INSERT INTO problems (title, difficulty, tags, link, description, solution_code, notes, created_at) "
+                      "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(f"{_sentence(rng, 3)} {i}", rng.choice(DIFFICULTIES),
+                  json.dumps(rng.sample(TAGS, rng.randint(1, 3)), ensure_ascii=False),
+                  f"https://leetcode.cn/problems/p-{i}/", _sentence(rng, 30),
+                  f"class Solution:\n    def solve(self, nums):\n        return {rng.choice(WORDS_EN)}(nums)",
+                  _sentence(rng, 15), _day(rng, today)) for i in range(1, n + 1)])
+        _insert(conn, "INSERT INTO logs (problem_id, log_date, status) VALUES (?, ?, ?)",
+                [(rng.randint(1, n), _day(rng, today), "已完成" if rng.random() < 0.9 else "未完成")
+                 for _ in range(n)])
+        _insert(conn, "INSERT INTO resources (title, category, url, image_url, status) VALUES (?, ?, ?, ?, ?)",
+                [(_sentence(rng, 4), rng.choice(CATEGORIES), f"https://example.com/r/{i}", "", "待看")
+                 for i in range(max(10, n // 100))])
+        _insert(conn, "INSERT INTO notebooks (name, created_at) VALUES (?, ?)",
+                [(f"笔记本 {i}", _day(rng, today)) for i in range(1, notebooks + 1)])
+        # 笔记本大小不均匀：前几个笔记本的笔记明显更多，用来测侧边栏目录的最坏情况
+        _insert(conn, "INSERT INTO notes (notebook_id, title, content, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(min(notebooks, int(rng.paretovariate(1.2))), _sentence(rng, 4), _sentence(rng, 80),
+                  _day(rng, today), _day(rng, today)) for _ in range(n)])
+
+    # sync_index 通过 run_query / 写入队列访问 db.DB_FILE
+    default_db, db.DB_FILE = db.DB_FILE, path
+    try:
+        search.sync_index()
+        db.get_writer(path).close()
+    finally:
+        db.DB_FILE = default_db
+
+    with pool.connection() as conn:
+        # 不额外 ANALYZE：统计信息保持和应用里从空库开始、一路写入的真实数据库一样
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    pool.close_all()
+
+
+def ensure(size, seed=0, force=False):
+    """返回规模为 size 的数据库路径，不存在 (或 force) 时先生成。"""
+    path = os.path.join(DATA_DIR, f"my_notion_{size}.db")
+    if force or not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        started = time.perf_counter()
+        print(f"生成 {size} 数据库: {path}", file=sys.stderr)
+        generate(path, SIZES[size], seed)
+        print(f"  完成，用时 {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成基准测试用的合成数据库")
+    parser.add_argument("sizes", nargs="+", choices=list(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--force", action="store_true", help="已存在时也重新生成")
+    args = parser.parse_args(argv)
+    for size in args.sizes:
+        print(ensure(size, args.seed, args.force))
+
+
+if __name__ == "__main__":
+    main()
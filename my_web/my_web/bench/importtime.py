@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# ==========================================
+# 冷启动导入耗时 (python -X importtime)
+# ==========================================
+# 每个页面在一个全新的解释器里导入：streamlit + db + ui + 该页面的模块，
+# 汇总 -X importtime 的输出，得到首次打开这个页面需要的导入时间、最重的几个顶层包和进程内存峰值。
+# "全部页面" 一行相当于拆分之前 app.py 在顶部导入所有依赖的情况。
+#
+# 用法 (在 my_web/my_web 目录下)：python bench/importtime.py [--repeat 5] [--top 8] [--json]
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from views import PAGES  # noqa: E402
+
+# 每个页面都会导入的部分 (app.py 顶部)
+BASE_IMPORTS = ["streamlit", "db", "ui", "views"]
+# 拆分前 app.py 顶部的导入，用来对比
+MONOLITH_IMPORTS = BASE_IMPORTS + ["pandas", "plotly.express", "streamlit_calendar"]
+
+# import time: self [us] | cumulative | imported package
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+_PROBE = """
+import resource, sys
+{imports}
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def measure(modules):
+    """在新进程里导入 modules，返回 (总耗时 ms, {顶层包: 累计 ms}, 内存峰值 MB)。"""
+    code = _PROBE.format(imports="\n".join(f"import {m}" for m in modules))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=APP_DIR,
+                          capture_output=True, text=True, check=True)
+    top_level = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m and not m.group(3):  # 没有缩进的是顶层导入，cumulative 已包含它的子模块
+            name = m.group(4).split('.')[0]
+            top_level[name] = top_level.get(name, 0) + int(m.group(2)) / 1000
+    max_rss_kb = int(proc.stdout.split()[-1])
+    return sum(top_level.values()), top_level, max_rss_kb / 1024
+
+
+def best_of(modules, repeat):
+    """重复测量取最快的一次 (第一次通常包含编译 .pyc 和冷磁盘缓存)。"""
+    return min((measure(modules) for _ in range(repeat)), key=lambda r: r[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测量每个页面冷启动时的导入耗时")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量次数，取最快的一次")
+    parser.add_argument("--top", type=int, default=8, help="列出最重的前几个顶层包")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    args = parser.parse_args(argv)
+
+    targets = {"(基础: app.py)": BASE_IMPORTS}
+    for page, (module, _) in PAGES.items():
+        targets[page] = BASE_IMPORTS + [module]
+    targets["(全部页面)"] = BASE_IMPORTS + sorted({module for module, _ in PAGES.values()})
+    targets["(拆分前的 app.py)"] = MONOLITH_IMPORTS
+
+    report = {}
+    for name, modules in targets.items():
+        total_ms, top_level, rss_mb = best_of(modules, args.repeat)
+        heaviest = sorted(top_level.items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+        report[name] = {"import_ms": round(total_ms, 1), "max_rss_mb": round(rss_mb, 1),
+                        "heaviest": {k: round(v, 1) for k, v in heaviest}}
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'页面':<20}{'导入耗时(ms)':>14}{'内存峰值(MB)':>14}  最重的顶层包 (ms)")
+    for name, r in report.items():
+        heaviest = ", ".join(f"{k} {v:.0f}" for k, v in list(r["heaviest"].items())[:4])
+        print(f"{name:<20}{r['import_ms']:>14.1f}{r['max_rss_mb']:>14.1f}  {heaviest}")
+
+
+if __name__ == "__main__":
+    main()
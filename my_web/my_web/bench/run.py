@@ -0,0 +1,291 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+# ==========================================
+# 基准测试：各页面的数据读取路径
+# ==========================================
+# 在 bench/generate.py 生成的合成数据库上，直接调用页面使用的 queries.py / search.py 函数计时 (不需要浏览器)：
+# - cold：每次调用前清空 run_query 的读缓存，测的是 SQL 本身。
+# - warm：像页面 rerun 一样先调用一次 db.init_db，再调用一次，测缓存命中的开销；
+#   warm_hit_rate 是这次调用里读缓存的命中率 (rerun 清空了缓存时会降到 0，对比时算回归)。
+# 加 --pages 时再用 streamlit 的 AppTest 无界面地完整渲染每个页面，并在同一个会话里再 rerun 一次
+# (rerun_ms / rerun_hit_rate，数据没变时 rerun 应当全部命中缓存)。
+#
+# 用法 (在 my_web/my_web 目录下)：
+#   python bench/run.py --sizes 1k 100k --out bench/results/$(git rev-parse --short HEAD).json
+#   python bench/run.py --sizes 1k 100k --compare bench/results/<旧提交>.json
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import analytics  # noqa: E402
+import db  # noqa: E402
+import queries  # noqa: E402
+from generate import SIZES, ensure  # noqa: E402
+from search import search  # noqa: E402
+
+
+def page_runs(f):
+    """在 AppTest 里渲染的页面：(page 参数, 其他 URL 参数)。"""
+    return [
+        ("dashboard", {}),
+        ("code_problems", {}),
+        ("calendar", {}),
+        ("analytics", {}),
+        ("resources", {}),
+        ("notebook", {}),
+        ("notebook_detail", {"notebook_id": str(f["notebook_id"])}),
+        ("search", {}),
+    ]
+
+
+def _fixtures():
+    """从当前数据库里挑出测试参数：最大的笔记本、两个常见标签、第 500 条题目的 id 等。"""
+    biggest_notebook = db.run_query(
+        "SELECT notebook_id FROM notes GROUP BY notebook_id ORDER BY COUNT(*) DESC LIMIT 1", fetch=True, cache=False)
+    deep_floor = db.run_query("SELECT id FROM problems ORDER BY id DESC LIMIT 1 OFFSET 499", fetch=True, cache=False)
+    newest_problem = db.run_query("SELECT MAX(id) AS id FROM problems", fetch=True, cache=False)
+    tags = queries.get_all_tags()
+    month_start = datetime.date.today().replace(day=1)
+    return {
+        "notebook_id": biggest_notebook[0]['notebook_id'] if biggest_notebook else 1,
+        "deep_floor": deep_floor[0]['id'] if deep_floor else None,
+        "problem_id": newest_problem[0]['id'] or 1,
+        "tags": tags[:2],
+        "window": (month_start - datetime.timedelta(days=7),
+                   (month_start + datetime.timedelta(days=32)).replace(day=1) + datetime.timedelta(days=14)),
+    }
+
+
+def cases(f):
+    """基准用例：名称 -> 无参函数 (与各页面的调用方式一致)。"""
+    return {
+        "dashboard.stats": queries.get_dashboard_stats,
+        "dashboard.recent_activity": lambda: queries.get_recent_activity(5),
+        "problems.tags": queries.get_all_tags,
+        "problems.first_page": lambda: queries.get_problem_page("所有", [], 20),
+        "problems.first_page_filtered": lambda: queries.get_problem_page("中等", f["tags"], 20),
+        "problems.load_more_500": lambda: queries.get_problem_page("所有", [], 20, f["deep_floor"]),
+        "problems.load_more_filtered": lambda: queries.get_problem_page("中等", f["tags"], 20, f["problem_id"]),
+        "problem_detail": lambda: queries.get_problem(f["problem_id"]),
+        "calendar.month_window": lambda: queries.iter_calendar_logs(*f["window"]),
+        "analytics.report": analytics.report,
+        "resources.list": queries.get_resources,
+        "notebook.list": queries.get_notebooks,
+        "notebook.sidebar_toc": lambda: queries.get_notebook_toc(f["notebook_id"]),
+        "notebook.latest_note": lambda: queries.get_latest_note_id(f["notebook_id"]),
+        "search.common_word": lambda: search("two"),
+        "search.chinese_phrase": lambda: search("数组"),
+    }
+
+
+def _rows(result):
+    """结果行数；stream=True 返回的迭代器在这里被完整读完 (计入耗时)。"""
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, list):
+        return len(result)
+    if hasattr(result, "__next__"):
+        return sum(1 for _ in result)
+    return int(result is not None)
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    return {
+        "min": round(samples[0], 3),
+        "median": round(statistics.median(samples), 3),
+        "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+    }
+
+
+def _hit_rate(before, after):
+    """两次 cache.stats() 之间的命中率；期间没有经过读缓存的查询 (例如 stream=True) 时为 None。"""
+    hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+    return round(hits / (hits + misses), 3) if hits + misses else None
+
+
+def time_case(fn, repeat):
+    cache = db.get_cache()
+    cold, warm = [], []
+    rows = 0
+    hit_rates = []
+    for _ in range(repeat):
+        cache.clear()
+        started = time.perf_counter()
+        rows = _rows(fn())
+        cold.append((time.perf_counter() - started) * 1000)
+        # app.py 每次 rerun 都会经过初始化；它不应丢掉上一次运行留下的缓存
+        db.init_db()
+        before = cache.stats()
+        started = time.perf_counter()
+        _rows(fn())
+        warm.append((time.perf_counter() - started) * 1000)
+        hit_rates.append(_hit_rate(before, cache.stats()))
+    rates = [r for r in hit_rates if r is not None]
+    return {"rows": rows, "cold_ms": _summary(cold), "warm_ms": _summary(warm),
+            "warm_hit_rate": min(rates) if rates else None}
+
+
+def time_pages(f, repeat, timeout):
+    """
+    用 AppTest 渲染每个页面 (第一次渲染不计，包含导入页面模块的时间)。
+    超时或页面报错时记录 error，不中断其他页面的测量。
+    """
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    for page, params in page_runs(f):
+        samples, reruns, hit_rates = [], [], []
+        try:
+            for i in range(repeat + 1):
+                db.get_cache().clear()
+                at = AppTest.from_file(os.path.join(APP_DIR, "app.py"), default_timeout=timeout)
+                at.query_params["page"] = page
+                for key, value in params.items():
+                    at.query_params[key] = value
+                started = time.perf_counter()
+                at.run()
+                if at.exception:
+                    raise RuntimeError(at.exception[0].message)
+                if i:
+                    samples.append((time.perf_counter() - started) * 1000)
+                # 同一个会话再 rerun 一次 (用户点了一下按钮、数据没变)
+                before = db.get_cache().stats()
+                started = time.perf_counter()
+                at.run()
+                if at.exception:
+                    raise RuntimeError(at.exception[0].message)
+                if i:
+                    reruns.append((time.perf_counter() - started) * 1000)
+                    hit_rates.append(_hit_rate(before, db.get_cache().stats()))
+        except RuntimeError as e:  # AppTest 超时也是 RuntimeError
+            results[page] = {"error": str(e)}
+            continue
+        rates = [r for r in hit_rates if r is not None]
+        results[page] = {"render_ms": _summary(samples), "rerun_ms": _summary(reruns),
+                         "rerun_hit_rate": min(rates) if rates else None}
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat, pages, seed, page_timeout=60):
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        path = ensure(size, seed)
+        # run_query 等默认使用 db.DB_FILE；AppTest 在同一进程里运行 app.py，同样会用到这个库
+        db.DB_FILE = path
+        db.init_db()
+        fixtures = _fixtures()
+        size_results = {name: time_case(fn, repeat) for name, fn in cases(fixtures).items()}
+        if pages:
+            page_results = time_pages(fixtures, max(1, repeat // 5), page_timeout)
+            size_results.update({f"page.{k}": v for k, v in page_results.items()})
+        report["results"][size] = size_results
+        db.get_pool(path).close_all()
+    return report
+
+
+def _metric(result):
+    """对比用的指标：SQL 用 cold 中位数，页面用渲染中位数，出错时为 None。"""
+    timing = result.get("cold_ms", result.get("render_ms"))
+    return timing["median"] if timing else None
+
+
+def _hit_rate_of(result):
+    """rerun 之后的读缓存命中率 (SQL 用例的 warm，页面的 rerun)，没有记录时为 None。"""
+    return result.get("warm_hit_rate", result.get("rerun_hit_rate"))
+
+
+def _fmt(value):
+    return "出错" if value is None else f"{value:.2f}"
+
+
+def compare(report, baseline, threshold, noise_ms):
+    """
+    逐项对比中位数，变慢超过 threshold 倍 (且差值大于 noise_ms) 视为回归；
+    rerun 之后的缓存命中率比基准低也算回归 (缓存在 rerun 之间被清空时 warm 的耗时看不出来)。返回回归的项数。
+    """
+    regressions = 0
+    print(f"对比基准 {baseline['meta'].get('commit')} -> {report['meta'].get('commit')} (中位数, ms)")
+    for size, results in report["results"].items():
+        old_results = baseline["results"].get(size, {})
+        for name, result in results.items():
+            if name not in old_results:
+                continue
+            old, new = _metric(old_results[name]), _metric(result)
+            if new is None or old is None:
+                # 原来能跑完、现在出错算回归；原来就出错的不算
+                regressed = new is None and old is not None
+                regressions += regressed
+                print(f"  {size:>5} {name:<32}{_fmt(old):>10}{_fmt(new):>10}{'':>9}{'  <-- 回归' if regressed else ''}")
+                continue
+            ratio = new / old if old else float("inf")
+            regressed = ratio > threshold and new - old > noise_ms
+            regressions += regressed
+            flag = "  <-- 回归" if regressed else ""
+            print(f"  {size:>5} {name:<32}{old:>10.2f}{new:>10.2f}{ratio:>8.2f}x{flag}")
+
+            old_rate, new_rate = _hit_rate_of(old_results[name]), _hit_rate_of(result)
+            if old_rate is not None and new_rate is not None and new_rate < old_rate:
+                regressions += 1
+                print(f"  {size:>5} {name + ' (rerun 命中率)':<32}{old_rate:>10.2f}{new_rate:>10.2f}{'':>9}  <-- 回归")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="在合成数据库上测量各页面的数据读取耗时")
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], choices=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--pages", action="store_true", help="同时用 AppTest 渲染每个页面")
+    parser.add_argument("--page-timeout", type=float, default=60, help="单个页面渲染的超时 (秒)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="把结果写入 JSON 文件 (默认打印到标准输出)")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果对比，有回归时退出码为 1")
+    parser.add_argument("--threshold", type=float, default=1.5, help="变慢多少倍算回归")
+    parser.add_argument("--noise-ms", type=float, default=1.0, help="小于这个差值的变化忽略")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat, args.pages, args.seed, args.page_timeout)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    elif not args.compare:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(report, baseline, args.threshold, args.noise_ms) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# ==========================================
+# 并发写入：逐条提交 vs 写入线程 group commit
+# ==========================================
+# 在数据库的一份拷贝上，用多个线程同时执行打卡 (INSERT INTO logs，会触发统计表的触发器)：
+# - direct：改动前的做法，每个线程自己的连接，每条语句单独提交。
+# - queue：经过 db.run_query，由后台写入线程攒批提交。
+# 同时对比 synchronous=NORMAL 和 FULL。
+#
+# 用法 (在 my_web/my_web 目录下)：python bench/writes.py [--db my_notion.db] [--threads 1 8 32] [--ops 200]
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import db  # noqa: E402
+
+CHECK_IN = "INSERT INTO logs (problem_id, log_date, status) VALUES (?, ?, ?)"
+
+
+def _direct(path, synchronous, problem_id, ops, errors):
+    conn = sqlite3.connect(path, timeout=5)
+    for pragma in db.CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    try:
+        for _ in range(ops):
+            conn.execute(CHECK_IN, (problem_id, "2000-01-01", "已完成"))
+            conn.commit()
+    except sqlite3.Error as e:
+        errors.append(e)
+    finally:
+        conn.close()
+
+
+def _queued(problem_id, ops, errors):
+    try:
+        for _ in range(ops):
+            db.run_query(CHECK_IN, (problem_id, "2000-01-01", "已完成"))
+    except sqlite3.Error as e:
+        errors.append(e)
+
+
+def measure(mode, path, synchronous, threads, ops):
+    """返回 (每秒写入次数, 出错的线程数)。"""
+    problem_id = db.run_query("SELECT id FROM problems LIMIT 1", fetch=True, cache=False)[0]['id']
+    errors = []
+    if mode == "direct":
+        workers = [threading.Thread(target=_direct, args=(path, synchronous, problem_id, ops, errors))
+                   for _ in range(threads)]
+    else:
+        workers = [threading.Thread(target=_queued, args=(problem_id, ops, errors)) for _ in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return threads * ops / (time.perf_counter() - started), len(errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对比逐条提交和 group commit 的并发写入吞吐")
+    parser.add_argument("--db", default=os.path.join(APP_DIR, "my_notion.db"), help="在它的拷贝上测试")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--ops", type=int, default=200, help="每个线程写入的次数")
+    args = parser.parse_args(argv)
+
+    # 拷贝放在数据库所在的磁盘上 (而不是可能在内存里的 /tmp)，fsync 的开销才真实
+    work_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(args.db)))
+    try:
+        print(f"{'模式':<8}{'synchronous':<13}{'线程':>6}{'写入/秒':>10}{'批次平均大小':>14}{'出错':>6}")
+        for synchronous in ("NORMAL", "FULL"):
+            for mode in ("direct", "queue"):
+                path = os.path.join(work_dir, f"{mode}_{synchronous}.db")
+                shutil.copy(args.db, path)
+                db.DB_FILE = path
+                db.init_db()
+                writer = db.get_writer()
+                writer.synchronous = synchronous
+                for threads in args.threads:
+                    before = writer.stats()
+                    rate, errors = measure(mode, path, synchronous, threads, args.ops)
+                    after = writer.stats()
+                    batches = after["batches"] - before["batches"]
+                    avg = (after["ops"] - before["ops"]) / batches if batches else 0
+                    print(f"{mode:<8}{synchronous:<13}{threads:>6}{rate:>10.0f}{avg:>14.1f}{errors:>6}")
+                writer.close()
+                db.get_pool(path).close_all()
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
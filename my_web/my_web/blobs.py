@@ -0,0 +1,182 @@
+import argparse
+import hashlib
+import os
+import zlib
+
+# ==========================================
+# 大文本的压缩存储 (text_blobs)
+# ==========================================
+# 题目的描述 / 代码 / 笔记和笔记内容超过 MIN_CHARS 个字符时，由触发器 (migrations.sync_blob_triggers) 移到 text_blobs 表：
+# 原来的列里只留一个引用 (REF_PREFIX + 内容哈希)，内容压缩后按哈希存一份，相同内容只存一次 (refs 记录引用次数)。
+# 列表页扫描的题目表、笔记表因此只剩小行；详情页读取时再取回全文 (queries.expand_blobs / resolved())。
+# 默认关闭 (MIN_CHARS = 0)：设置环境变量 MY_NOTION_BLOB_MIN_CHARS=4096 打开，已有的数据用下面的命令迁移。
+# 移动文本的触发器要调用这里注册的函数，所以只在打开时安装 (db.init_db)；打开之后只有本应用的连接能写入题目和笔记，
+# 关闭时 (包括 unpack) 会删掉这些触发器，表结构恢复成普通 SQLite 连接也能写入的样子。
+# 压缩默认用 zlib；装了 zstandard 时可以设置 MY_NOTION_BLOB_CODEC=zstd。
+# 这个模块不依赖 streamlit，也不在顶层导入 db (db 打开连接时调用这里的 register)。
+#
+# 用法 (在 my_web/my_web 目录下)：
+#   python blobs.py stats
+#   python blobs.py pack --min-chars 4096    # 把已有的大文本移到 text_blobs
+#   python blobs.py unpack                   # 全部移回原来的列
+
+MIN_CHARS = int(os.environ.get("MY_NOTION_BLOB_MIN_CHARS", 0))
+CODEC = os.environ.get("MY_NOTION_BLOB_CODEC", "zlib")
+REF_PREFIX = "\x01"  # 引用以控制字符开头，不会和正常文本混淆
+
+# 可以移到 text_blobs 的列
+TEXT_COLUMNS = {
+    "problems": ("description", "solution_code", "notes"),
+    "notes": ("content",),
+}
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def ref(text):
+    """文本对应的引用；已经是引用或为 NULL 时原样返回。"""
+    if text is None or text.startswith(REF_PREFIX):
+        return text
+    return REF_PREFIX + text_hash(text)
+
+
+def is_ref(value):
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+
+def pack(text, codec=None):
+    data = text.encode("utf-8")
+    codec = codec or CODEC
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("MY_NOTION_BLOB_CODEC=zstd 需要先安装 zstandard")
+        return zstandard.ZstdCompressor(level=9).compress(data)
+    return zlib.compress(data, 6)
+
+
+def unpack(codec, data):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("这段内容用 zstd 压缩，需要先安装 zstandard")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def _min_chars():
+    return MIN_CHARS
+
+
+def register(conn):
+    """注册移动大文本的触发器和 resolved() 用到的函数 (每个连接打开时调用)。"""
+    conn.create_function("blob_min_chars", 0, _min_chars)
+    conn.create_function("blob_codec", 0, lambda: CODEC)
+    conn.create_function("blob_ref", 1, ref, deterministic=True)
+    conn.create_function("blob_hash", 1, text_hash, deterministic=True)
+    conn.create_function("blob_pack", 1, pack)
+    conn.create_function("blob_text", 2, unpack, deterministic=True)
+
+
+def resolved(expr):
+    """SQL 表达式：expr 是引用时换成 text_blobs 里的全文，否则原样返回。"""
+    return (f"CASE WHEN substr({expr}, 1, 1) = char(1) THEN (SELECT blob_text(codec, data) FROM text_blobs "
+            f"WHERE hash = substr({expr}, 2)) ELSE {expr} END")
+
+
+def should_move(expr):
+    """SQL 条件：按当前的 MIN_CHARS，expr 这段文本需要移到 text_blobs。"""
+    return f"blob_min_chars() > 0 AND substr({expr}, 1, 1) IS NOT char(1) AND length({expr}) >= blob_min_chars()"
+
+
+def select_list(table, columns):
+    """SELECT 的列清单，可以移走的列换成 resolved()。"""
+    return ", ".join(f"{resolved(c)} AS {c}" if c in TEXT_COLUMNS.get(table, ()) else c for c in columns)
+
+
+# --- 命令行 ---
+CHUNK_IDS = 1000
+
+
+def stats(run_query):
+    result = run_query("SELECT codec, COUNT(*) AS blobs, SUM(refs) AS refs, SUM(size) AS chars, "
+                       "SUM(LENGTH(data)) AS bytes FROM text_blobs GROUP BY codec", fetch=True, cache=False)
+    columns = {}
+    for table, cols in TEXT_COLUMNS.items():
+        for c in cols:
+            columns[f"{table}.{c}"] = run_query(f"SELECT COUNT(*) AS n FROM {table} WHERE substr({c}, 1, 1) = char(1)",
+                                                fetch=True, cache=False)[0]['n']
+    return result, columns
+
+
+def _chunks(run_query, table):
+    max_id = run_query(f"SELECT MAX(id) AS id FROM {table}", fetch=True, cache=False)[0]['id'] or 0
+    for start in range(0, max_id, CHUNK_IDS):
+        yield start, start + CHUNK_IDS
+
+
+def pack_existing(run_query, writer):
+    """按当前的 MIN_CHARS 把已有的大文本移到 text_blobs，返回移动的值的个数。"""
+    moved = 0
+    for table, cols in TEXT_COLUMNS.items():
+        for c in cols:
+            where = f"{should_move(c)} AND id > ? AND id <= ?"
+            for start, end in _chunks(run_query, table):
+                # 先写入内容 (同一批里相同的内容合并成一条)，再把列换成引用；换成引用的 UPDATE 不会再触发移动
+                results = writer.submit_all([
+                    (f"INSERT INTO text_blobs (hash, codec, data, size, refs) "
+                     f"SELECT blob_hash({c}), blob_codec(), blob_pack({c}), length({c}), COUNT(*) FROM {table} "
+                     f"WHERE {where} GROUP BY blob_hash({c}) "
+                     f"ON CONFLICT(hash) DO UPDATE SET refs = refs + excluded.refs", (start, end)),
+                    (f"UPDATE {table} SET {c} = blob_ref({c}) WHERE {where}", (start, end)),
+                ]).result()
+                moved += results[1].rowcount
+    return moved
+
+
+def unpack_existing(run_query, writer):
+    """把 text_blobs 里的内容全部移回原来的列 (触发器随之删除不再被引用的 blob)，返回移动的值的个数。"""
+    moved = 0
+    for table, cols in TEXT_COLUMNS.items():
+        for c in cols:
+            for start, end in _chunks(run_query, table):
+                moved += writer.submit(f"UPDATE {table} SET {c} = {resolved(c)} "
+                                       f"WHERE substr({c}, 1, 1) = char(1) AND id > ? AND id <= ?",
+                                       (start, end)).result().rowcount
+    return moved
+
+
+def main(argv=None):
+    import db
+
+    parser = argparse.ArgumentParser(description="大文本压缩存储 (text_blobs) 的统计与迁移")
+    parser.add_argument("action", choices=["stats", "pack", "unpack"])
+    parser.add_argument("--min-chars", type=int, default=MIN_CHARS or 4096, help="pack：超过多少个字符的文本移走")
+    parser.add_argument("--db", help="数据库文件 (默认 my_notion.db)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db.DB_FILE = args.db
+    # 触发器读的是 db 导入的 blobs 模块里的设置 (直接运行这个文件时它和 __main__ 不是同一个模块)；
+    # unpack 时不能再把移回来的文本移走
+    db.blobs.MIN_CHARS = args.min_chars if args.action == "pack" else 0
+    db.init_db()
+    if args.action == "pack":
+        print(f"移到 text_blobs：{pack_existing(db.run_query, db.get_writer())} 个值")
+    elif args.action == "unpack":
+        print(f"移回原来的列：{unpack_existing(db.run_query, db.get_writer())} 个值")
+    by_codec, columns = stats(db.run_query)
+    for row in by_codec:
+        print(f"{row['codec']}: {row['blobs']} 段内容 (被引用 {row['refs']} 次)，"
+              f"{row['chars']} 字符压缩为 {row['bytes'] / 1024:.0f} KB")
+    for name, count in columns.items():
+        print(f"{name}: {count} 行在 text_blobs 中")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+
+# ==========================================
+# 列表卡片的渲染缓存 (题目 / 资源 / 笔记本)
+# ==========================================
+# 列表页每次 rerun 都要为每一行解析标签 JSON、拼接卡片 HTML。这里按 (种类, id) 缓存渲染结果和渲染时的行版本 rev
+# (显示的列被修改时由触发器加 1，见 migrations._v12_row_revs)：rev 没变就直接返回缓存，变了才重新渲染并替换旧结果。
+# 渲染函数由各页面提供 (views/*.py)，负责对用户输入的文字做 html.escape。这个模块不依赖 streamlit。
+#
+# 用法：
+#   card = cards.cached("problems", p, _render_problem_card)
+
+MAX_ENTRIES = 5000  # 超出后按最近最少使用淘汰
+
+_entries = OrderedDict()  # (种类, id) -> (rev, 渲染结果)
+_lock = threading.Lock()
+hits = 0
+misses = 0
+
+
+def cached(kind, row, render):
+    """返回 render(row) 的结果；这一行的 rev 和上次渲染时相同则直接用缓存。row 需要包含 id 和 rev 两列。"""
+    global hits, misses
+    key = (kind, row['id'])
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == row['rev']:
+            _entries.move_to_end(key)
+            hits += 1
+            return entry[1]
+        misses += 1
+    value = render(row)
+    with _lock:
+        _entries[key] = (row['rev'], value)
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return value
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def stats():
+    with _lock:
+        return {"entries": len(_entries), "hits": hits, "misses": misses}
@@ -0,0 +1,645 @@
+import atexit
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict, namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import blobs
+import perf
+from migrations import migrate, sync_blob_triggers
+
+# ==========================================
+# 数据库管理 (Database Manager)
+# ==========================================
+# 这个模块不依赖 streamlit：Streamlit 每次 rerun 只会重新执行 app.py，
+# 已导入的模块会常驻在进程里，所以这里的连接池可以跨 rerun、跨会话复用。
+DB_FILE = 'my_notion.db'
+
+# 每个连接只在打开时执行一次的 PRAGMA
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",  # 读写互不阻塞，多用户同时访问时不再互相等待
+    "PRAGMA synchronous=NORMAL",  # WAL 模式下 NORMAL 已足够安全，提交时少一次 fsync
+    "PRAGMA busy_timeout=5000",  # 遇到写锁时最多等待 5 秒，而不是直接报 database is locked
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",  # 每个连接约 16MB 页缓存
+    "PRAGMA foreign_keys=ON",  # 外键默认不生效；打开后 ON DELETE CASCADE 才会执行
+)
+
+# 写入线程提交时的持久性：NORMAL 在断电时可能丢失最近几次提交 (但数据库不会损坏)，FULL 每次提交都 fsync
+WRITE_SYNCHRONOUS = os.environ.get("MY_NOTION_SYNCHRONOUS", "NORMAL").upper()
+# 有并发写入时 (上一批不止一个操作)，写入线程收到第一条写操作后再等这么久收集同一批的其他写操作；
+# 只有一个人在写时不等待，直接提交
+GROUP_COMMIT_MS = float(os.environ.get("MY_NOTION_GROUP_COMMIT_MS", 2))
+GROUP_COMMIT_MAX = 256
+
+# 中日韩字符：unicode61 分词器会把连续的汉字当成一个词，需要先拆开
+CJK_CHARS = '\u2e80-\u9fff\uf900-\ufaff\uac00-\ud7af'
+_CJK_BOUNDARY = re.compile(rf'(?<=[{CJK_CHARS}])(?=\S)|(?<=\S)(?=[{CJK_CHARS}])')
+# 零宽空格在 unicode61 中是分隔符，显示时去掉即可还原原文
+FTS_SEPARATOR = '\u200b'
+
+
+def fts_text(value):
+    """把文本转换成写入全文索引的形式：每个汉字单独成词，英文单词保持不变。"""
+    if not value:
+        return ''
+    return _CJK_BOUNDARY.sub(FTS_SEPARATOR, str(value))
+
+
+class ConnectionPool:
+    """
+    线程安全的 SQLite 连接池。
+    - 连接在打开时设置一次 WAL 和各项 PRAGMA，之后反复复用。
+    - 同一线程内嵌套调用 connection() 会拿到同一个连接。
+    - hits / misses 记录复用空闲连接与新建连接的次数。
+    """
+
+    def __init__(self, db_file, max_idle=8):
+        self.db_file = db_file
+        self.max_idle = max_idle
+        self.hits = 0
+        self.misses = 0
+        self._idle = []  # 后进先出，最近用过的连接页缓存更热
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _open(self):
+        # 连接会在不同线程之间借还，但同一时刻只被一个线程使用
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # 允许通过列名访问
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        blobs.register(conn)  # 大文本压缩存储 (text_blobs) 的触发器和 resolved() 用到的函数
+        return conn
+
+    def acquire(self):
+        """借出一个连接：优先复用空闲连接，没有时再新建。"""
+        with self._lock:
+            self._in_use += 1
+            if self._idle:
+                self.hits += 1
+                return self._idle.pop()
+            self.misses += 1
+        try:
+            return self._open()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+    def release(self, conn):
+        """归还连接；未提交的事务会被回滚，超出 max_idle 的连接直接关闭。"""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._in_use -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """在当前线程上借用一个连接，with 块结束后自动归还。"""
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is not None:
+            # 嵌套调用：复用当前线程已经借出的连接
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+
+        conn = self.acquire()
+        local.conn, local.depth = conn, 1
+        try:
+            yield conn
+        finally:
+            local.conn, local.depth = None, 0
+            self.release(conn)
+
+    def stats(self):
+        """返回连接池的命中统计，便于观察复用效果。"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+            }
+
+    def close_all(self):
+        """关闭所有空闲连接 (例如在替换数据库文件之前)。"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+# SQL 中引用到的表名 (FROM / JOIN / INTO / UPDATE 之后的标识符)
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+["`\[]?(\w+)', re.IGNORECASE)
+# 触发器体里被写入的表
+_TRIGGER_WRITE = re.compile(r'\b(?:INTO|UPDATE|DELETE\s+FROM)\s+["`\[]?(\w+)', re.IGNORECASE)
+# 结果不确定的查询不缓存
+_NON_DETERMINISTIC = re.compile(r"random\(|'now'|current_(?:date|time|timestamp)", re.IGNORECASE)
+
+
+def referenced_tables(query):
+    """返回 SQL 语句中引用到的表名集合 (小写)。"""
+    return {t.lower() for t in _TABLE_REF.findall(query)}
+
+
+class QueryCache:
+    """
+    run_query 读结果的 LRU 缓存。
+    - 键为 (SQL, 参数)，每条结果按其引用的表打标签。
+    - 写入某张表时只失效与这张表相关的结果；触发器和级联外键波及的表一并失效。
+    - 条目数和缓存的总行数都有上限，超出后按最近最少使用淘汰。
+    缓存的结果会直接返回给调用方，调用方不应修改其中的 dict。
+    """
+
+    def __init__(self, max_entries=512, max_rows=50000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # key -> (tables, rows)
+        self._by_table = defaultdict(set)  # table -> keys
+        self._generation = defaultdict(int)  # table -> 失效次数，用来丢弃读写交错产生的旧结果
+        self._dependents = None  # table -> 写入它时会连带改变的表 (init_db 推导之前为 None)
+        self._rows = 0
+        self._lock = threading.Lock()
+
+    def generation(self, tables):
+        with self._lock:
+            return tuple(self._generation[t] for t in sorted(tables))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, key, tables, rows, generation):
+        if len(rows) > self.max_rows // 4:
+            return  # 单个结果过大，缓存它会挤掉其他所有条目
+        with self._lock:
+            # 查询执行期间相关的表被写过，这个结果可能已经过期
+            if generation != tuple(self._generation[t] for t in sorted(tables)):
+                return
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (tables, rows)
+            self._rows += len(rows)
+            for t in tables:
+                self._by_table[t].add(key)
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _discard(self, key):
+        tables, rows = self._entries.pop(key)
+        self._rows -= len(rows)
+        for t in tables:
+            keys = self._by_table.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[t]
+
+    def has_dependents(self):
+        with self._lock:
+            return self._dependents is not None
+
+    def set_dependents(self, dependents):
+        with self._lock:
+            self._dependents = dependents
+
+    def invalidate(self, tables):
+        """失效与这些表 (及其触发器/级联外键波及的表) 相关的所有缓存结果。"""
+        with self._lock:
+            affected = set()
+            for t in tables:
+                t = t.lower()
+                affected.add(t)
+                affected |= (self._dependents or {}).get(t, set())
+            for t in affected:
+                self._generation[t] += 1
+                for key in list(self._by_table.get(t, ())):
+                    self._discard(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            for t in list(self._generation):
+                self._generation[t] += 1
+            self._entries.clear()
+            self._by_table.clear()
+            self._rows = 0
+
+    def stats(self):
+        """返回缓存命中统计，便于观察缓存效果。"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "rows": self._rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def table_dependents(conn):
+    """
+    从数据库结构推导写入依赖：写 A 表时触发器会写哪些表、级联外键会改哪些表。
+    返回 {表名: 传递闭包后的受影响表集合}。
+    """
+    direct = defaultdict(set)
+    for tbl, sql in conn.execute("SELECT tbl_name, sql FROM sqlite_master WHERE type='trigger'"):
+        body = sql[sql.upper().find('BEGIN'):]
+        direct[tbl.lower()] |= {t.lower() for t in _TRIGGER_WRITE.findall(body)}
+    tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+    for child in tables:
+        for fk in conn.execute(f'PRAGMA foreign_key_list("{child}")'):
+            # fk: (id, seq, table, from, to, on_update, on_delete, match)
+            if fk[5] != 'NO ACTION' or fk[6] != 'NO ACTION':
+                direct[fk[2].lower()].add(child.lower())
+
+    closure = {}
+    for table in direct:
+        seen, stack = set(), [table]
+        while stack:
+            for dep in direct.get(stack.pop(), ()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        closure[table] = seen
+    return closure
+
+
+WriteResult = namedtuple("WriteResult", ["lastrowid", "rowcount"])
+
+
+class WriteQueue:
+    """
+    单个后台写入线程：从队列里取出写操作，攒成一批后在一个事务里执行、一次提交 (group commit)。
+    - 所有写入都经过这一个线程和一个连接，多个会话同时写时不再互相争抢写锁、等到 database is locked。
+    - 每个操作在自己的 SAVEPOINT 里执行，某个操作出错只回滚它自己，同一批的其他操作照常提交。
+    - submit() 返回 Future：提交成功后结果为 WriteResult(lastrowid, rowcount)，失败时为对应的异常。
+      需要几条语句一起生效时用 submit_all()，它们作为同一个操作执行。
+      Future 完成时事务已经提交、相关的读缓存已经失效，调用方紧接着读就能读到新数据。
+    - 写入线程打不开连接 (或者意外退出) 时，队列里的操作全部以这个异常结束，不会一直等下去；
+      之后的 submit() 重新启动写入线程，问题还在时同样立即得到异常。
+    """
+
+    def __init__(self, pool, cache, synchronous=WRITE_SYNCHRONOUS, window_ms=GROUP_COMMIT_MS,
+                 max_batch=GROUP_COMMIT_MAX):
+        if synchronous not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"synchronous 只能是 OFF / NORMAL / FULL / EXTRA，而不是 {synchronous!r}")
+        self.pool = pool
+        self.cache = cache
+        self.synchronous = synchronous
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.batches = 0
+        self.ops = 0
+        self.largest_batch = 0
+        self._last_batch = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, query, params=(), many=False):
+        """
+        把一条写语句放进队列，立即返回 Future。
+        many=True 时 params 是多行参数，整批用一次 executemany 执行 (作为一个操作，要么全部写入要么全部回滚)。
+        """
+        return self._put([(query, params, many)], single=True)
+
+    def submit_all(self, statements):
+        """
+        把几条写语句 [(query, params), ...] 作为一个操作放进队列：按顺序执行，任何一条出错时全部回滚。
+        Future 的结果是每条语句的 WriteResult 列表。
+        """
+        return self._put([(query, params, False) for query, params in statements], single=False)
+
+    def _put(self, statements, single):
+        future = Future()
+        statements = [(query, [tuple(p) for p in params] if many else tuple(params), many)
+                      for query, params, many in statements]
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+            self._queue.put((statements, single, future))
+        return future
+
+    def _next_batch(self):
+        """阻塞到第一条操作，再收集后续操作 (有并发写入时最多等 window)。返回 (批次, 是否收到了关闭信号)。"""
+        op = self._queue.get()
+        if op is None:
+            return [], True
+        batch = [op]
+        deadline = time.monotonic() + (self.window if self._last_batch > 1 else 0)
+        while len(batch) < self.max_batch:
+            try:
+                op = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if op is None:
+                return batch, True
+            batch.append(op)
+        return batch, False
+
+    def _run(self):
+        batch = []
+        try:
+            conn = self.pool._open()
+            try:
+                conn.isolation_level = None  # 事务完全由这里的 BEGIN / SAVEPOINT / COMMIT 控制
+                conn.execute(f"PRAGMA synchronous={self.synchronous}")
+                while True:
+                    batch, stop = self._next_batch()
+                    if batch:
+                        self._commit(conn, batch)
+                    batch = []
+                    if stop:
+                        break
+            finally:
+                conn.close()
+        except Exception as e:
+            self._fail(batch, e)
+
+    def _fail(self, batch, error):
+        """写入线程无法继续：手上这一批和队列里剩下的操作都以 error 结束，下一次 submit() 重新启动线程。"""
+        with self._lock:
+            if self._thread is threading.current_thread():
+                self._thread = None
+            pending = list(batch)
+            while True:
+                try:
+                    op = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is not None:
+                    pending.append(op)
+        for *_, future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def _commit(self, conn, batch):
+        results = []  # (future, 结果或异常, 写入的表 / None 表示需要清空整个缓存)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # 只有一条语句时不需要 SAVEPOINT：出错的语句由 SQLite 自己撤销，事务里没有别的写入。
+            # executemany 中途出错、多条语句的操作后面几条出错时前面已经写入，仍然需要 SAVEPOINT 整体回滚
+            statements = batch[0][0]
+            use_savepoint = len(batch) > 1 or len(statements) > 1 or statements[0][2]
+            for statements, single, future in batch:
+                if use_savepoint:
+                    conn.execute("SAVEPOINT write_op")
+                op_results = []
+                tables = set()
+                try:
+                    for query, params, many in statements:
+                        c = conn.executemany(query, params) if many else conn.execute(query, params)
+                        op_results.append(WriteResult(c.lastrowid, c.rowcount))
+                        verb = query.lstrip()[:7].upper()
+                        if not verb.startswith(("INSERT", "UPDATE", "DELETE", "REPLACE")):
+                            tables = None  # DDL 等其他语句：无法判断影响范围
+                        elif tables is not None and c.rowcount != 0:
+                            tables |= referenced_tables(query)
+                except Exception as e:
+                    if use_savepoint:
+                        conn.execute("ROLLBACK TO write_op")
+                        conn.execute("RELEASE write_op")
+                    results.append((future, e, set()))
+                    continue
+                if use_savepoint:
+                    conn.execute("RELEASE write_op")
+                results.append((future, op_results[0] if single else op_results, tables))
+            conn.execute("COMMIT")
+        except Exception as e:
+            # BEGIN 或 COMMIT 本身失败 (例如磁盘已满)：整批都没有写入
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+
+        self._last_batch = len(batch)
+        with self._lock:
+            self.batches += 1
+            self.ops += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+        # 先失效缓存再通知调用方，避免调用方马上读到旧的缓存结果
+        written = set()
+        for _, _, tables in results:
+            if tables is None:
+                self.cache.clear()
+                written = set()
+                break
+            written |= tables
+        if written:
+            self.cache.invalidate(written)
+        for future, result, _ in results:
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "ops": self.ops,
+                "avg_batch": self.ops / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "queued": self._queue.qsize(),
+                "synchronous": self.synchronous,
+            }
+
+    def close(self):
+        """写完队列里已有的操作后停止线程 (进程退出时自动调用)。"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join()
+
+
+_pools = {}
+_caches = {}
+_writers = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_file=None):
+    """按数据库文件的绝对路径返回 (必要时创建) 进程内共享的连接池。"""
+    path = os.path.abspath(db_file or DB_FILE)
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ConnectionPool(path)
+        return pool
+
+
+def get_cache(db_file=None):
+    """返回与连接池对应的读缓存 (同样按数据库文件区分)。"""
+    path = os.path.abspath(db_file or DB_FILE)
+    with _pools_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = QueryCache()
+        return cache
+
+
+def get_writer(db_file=None):
+    """返回数据库文件对应的写入队列 (同样按数据库文件区分)，进程退出前会把队列写完。"""
+    path = os.path.abspath(db_file or DB_FILE)
+    pool, cache = get_pool(path), get_cache(path)
+    with _pools_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = WriteQueue(pool, cache)
+            atexit.register(writer.close)
+        return writer
+
+
+def submit_write(query, params=(), many=False):
+    """不等待提交，直接返回 Future (见 WriteQueue)；需要结果时调用 future.result()。"""
+    return get_writer().submit(query, params, many)
+
+
+def init_db():
+    """
+    初始化数据库：执行尚未应用的迁移 (见 migrations.py)，表结构变了 (或本进程第一次调用) 时刷新读缓存的写入依赖。
+    表结构没变时不动读缓存，重复调用是安全的；但每次仍要检查一遍迁移，页面里用 ui.init_db_once 每个进程只调用一次。
+    """
+    pool = get_pool()
+    with pool.connection() as conn:
+        applied = migrate(conn)
+        # 移动大文本的触发器只在打开存储时安装 (见 migrations.sync_blob_triggers)
+        triggers_changed = sync_blob_triggers(conn)
+
+        # 表结构变了：重新推导写入依赖，并丢弃所有旧缓存
+        cache = get_cache()
+        if applied or triggers_changed or not cache.has_dependents():
+            cache.set_dependents(table_dependents(conn))
+            cache.clear()
+
+    if applied or triggers_changed:
+        # 已打开的连接里缓存着按旧结构/旧统计信息准备的语句 (FTS5 的内部语句不会自动重新规划)，全部重新打开
+        pool.close_all()
+        get_writer().close()  # 写入线程的连接在下一次写入时重新打开
+
+
+# stream=True 时每次从游标取多少行
+STREAM_BATCH = 1000
+
+
+def _stream_rows(query, params, as_tuple, started):
+    """
+    逐批 fetchmany 并逐行产出，内存占用与结果总行数无关。
+    生成器在迭代期间占用当前线程的连接，应当迭代完 (或 close())；中途放弃时连接在生成器被回收时归还。
+    """
+    row_count = 0
+    with get_pool().connection() as conn:
+        c = conn.cursor()
+        if as_tuple:
+            c.row_factory = None  # 游标级别覆盖连接上的 sqlite3.Row
+        c.execute(query, params)
+        while True:
+            batch = c.fetchmany(STREAM_BATCH)
+            if not batch:
+                break
+            row_count += len(batch)
+            yield from batch
+    if started is not None:
+        # 耗时包括调用方处理这些行的时间
+        perf.record(query, params, started, row_count)
+
+
+def run_query(query, params=(), fetch=False, get_lastrowid=False, cache=True, stream=False, as_tuple=False):
+    """
+    执行SQL通用函数。
+    - fetch=True: 返回查询结果 (list of dict)。
+    - as_tuple=True: 读结果的每一行是 tuple (按 SELECT 的列顺序)，省去为每行构造 dict；适合只取少数几列的调用方。
+    - stream=True: 返回逐行产出的迭代器，不把整个结果读进内存，也不经过读缓存。
+      每行是 sqlite3.Row (可以用 row['列名'] 读取，但不是 dict)，as_tuple=True 时是 tuple。
+    - get_lastrowid=True: 如果是 INSERT 语句，返回新插入行的 ID。
+    - cache=False: 跳过读缓存 (例如需要读到其他进程刚写入的数据时)。
+    读语句的连接来自进程级连接池，不再为每条语句单独 connect/close。
+    写语句交给后台写入线程 (见 WriteQueue) 与其他写操作一起提交，这里等到提交完成才返回。
+    读结果会按 (SQL, 参数) 缓存；经由这里的 INSERT/UPDATE/DELETE 会失效相关表的缓存。
+    打开 perf 统计时 (见 perf.py) 记录每次调用的耗时、行数和调用位置。
+    """
+    started = time.perf_counter() if perf.enabled else None
+    params = tuple(params)
+    if stream:
+        return _stream_rows(query, params, as_tuple, started)
+    if not fetch:  # For INSERT, UPDATE, DELETE
+        result = get_writer().submit(query, params).result()
+        if started is not None:
+            perf.record(query, params, started, result.rowcount)
+        return result.lastrowid if get_lastrowid else None
+
+    query_cache = get_cache()
+    tables = referenced_tables(query)
+    verb = query.lstrip()[:7].upper()
+    cacheable = (cache and verb.startswith(("SELECT", "WITH"))
+                 and not _NON_DETERMINISTIC.search(query))
+
+    if cacheable:
+        key = (query, params, as_tuple)
+        rows = query_cache.get(key)
+        if rows is not None:
+            if started is not None:
+                perf.record(query, params, started, rows, cached=True)
+            return rows
+        generation = query_cache.generation(tables)
+
+    with get_pool().connection() as conn:
+        c = conn.cursor()
+        if as_tuple:
+            c.row_factory = None
+        c.execute(query, params)
+        data = c.fetchall()
+    rows = data if as_tuple else [dict(row) for row in data]
+    if cacheable:
+        query_cache.put(key, tables, rows, generation)
+    if started is not None:
+        perf.record(query, params, started, rows)
+    return rows
+
+
+def delete_by_ids(table, ids):
+    """
+    按 id 批量删除：一条 DELETE 语句、一次提交，子表的记录由 ON DELETE CASCADE 一并删除。
+    ids 作为一个 JSON 数组参数传入，不受 SQLite 绑定参数个数的限制。
+    table 必须是代码里写死的表名，不能来自用户输入。
+    """
+    ids = [int(i) for i in ids]
+    if ids:
+        run_query(f"DELETE FROM {table} WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(ids),))
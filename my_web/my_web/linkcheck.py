@@ -0,0 +1,362 @@
+import argparse
+import asyncio
+import datetime
+import hashlib
+import html
+import http.client
+import logging
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import namedtuple
+from contextlib import asynccontextmanager
+
+from db import get_writer, run_query
+
+# ==========================================
+# 资源链接检查与封面缓存
+# ==========================================
+# 后台线程里跑一个 asyncio 事件循环，检查从没检查过 (或超过 RECHECK_DAYS 天) 的资源：
+# - 请求 url，记下 link_status (ok / broken / error / invalid) 和状态码；HTML 页面顺便取出 <title> 和 og:image。
+# - 封面 (image_url，没有时用页面的 og:image) 下载到本地 THUMB_DIR，按图片地址的哈希命名，同一张图只下载一次。
+# 总并发不超过 CONCURRENCY；同一个站点同时最多 PER_HOST 个请求，相邻两次请求至少间隔 HOST_INTERVAL 秒。
+# 资源页只读数据库和本地文件，不再每次渲染都去外站拉图片，也不等检查完成。
+# 发请求的函数 (fetcher) 可以替换：默认用标准库 urllib (在线程池里执行)，测试时可以直接指向本地的 http.server。
+# 这个模块不依赖 streamlit，资源页 (views/resources.py) 调用 start_worker() / wake()。
+#
+# 用法 (在 my_web/my_web 目录下)：
+#   python linkcheck.py            # 检查到期的资源
+#   python linkcheck.py --all      # 全部重新检查
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+THUMB_DIR = os.environ.get("MY_NOTION_THUMB_DIR", os.path.join(APP_DIR, "thumbs"))
+ENABLED = os.environ.get("MY_NOTION_LINKCHECK", "1") != "0"  # 离线使用时设为 0，资源页不再启动后台检查
+
+CONCURRENCY = 8
+PER_HOST = 2
+HOST_INTERVAL = 1.0  # 秒
+TIMEOUT = 10  # 秒
+RECHECK_DAYS = 7
+BATCH = 50  # 每检查完这么多个资源写一次数据库
+IDLE_SECONDS = 600  # 没有到期的资源时，后台线程隔多久再看一次 (wake() 可以提前唤醒)
+PAGE_BYTES = 256 * 1024  # 页面只读前面这部分，<title> 和 og:image 都在 <head> 里
+THUMB_BYTES = 5 * 1024 * 1024
+USER_AGENT = "Mozilla/5.0 (compatible; my-notion-linkcheck)"
+logger = logging.getLogger(__name__)
+IMAGE_TYPES = {"image/png": ".png", "image/jpeg": ".jpg", "image/gif": ".gif", "image/webp": ".webp"}
+
+# fetcher(url, max_bytes) 是一个协程，返回 Response (HTTP 错误也是正常返回，status 为状态码)；
+# 连不上、超时等抛出 OSError / asyncio.TimeoutError / http.client.HTTPException
+Response = namedtuple("Response", ["status", "url", "content_type", "body"])
+FETCH_ERRORS = (OSError, asyncio.TimeoutError, http.client.HTTPException, ValueError)
+
+_TITLE = re.compile(rb"<title[^>]*>(.*?)</title", re.IGNORECASE | re.DOTALL)
+_META = re.compile(rb"<meta\s[^>]*>", re.IGNORECASE)
+_ATTR = re.compile(rb"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+_CHARSET = re.compile(r"charset=([\w-]+)", re.IGNORECASE)
+
+
+def _urllib_fetch(url, max_bytes):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    try:
+        with urllib.request.urlopen(request, timeout=TIMEOUT) as resp:
+            content_type = resp.headers.get("Content-Type", "")
+            return Response(resp.status, resp.geturl(), content_type, resp.read(max_bytes + 1))
+    except urllib.error.HTTPError as e:
+        return Response(e.code, url, e.headers.get("Content-Type", "") if e.headers else "", b"")
+
+
+async def urllib_fetch(url, max_bytes):
+    """默认的 fetcher：标准库 urllib 在线程池里执行，body 最多读 max_bytes + 1 字节 (调用方据此判断是否过大)。"""
+    return await asyncio.wait_for(asyncio.to_thread(_urllib_fetch, url, max_bytes), TIMEOUT * 2)
+
+
+class HostLimiter:
+    """按站点限制并发数和请求间隔 (只在一个事件循环里使用，不需要加锁)。"""
+
+    def __init__(self, per_host=PER_HOST, interval=HOST_INTERVAL):
+        self.per_host = per_host
+        self.interval = interval
+        self._semaphores = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, host):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            # 先占好这次请求的开始时间再等待，同一站点排队的请求依次错开 interval
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.interval
+            await asyncio.sleep(start - now)
+            yield
+
+
+def _is_http(url):
+    return urllib.parse.urlsplit(url).scheme in ("http", "https")
+
+
+def _media_type(content_type):
+    return content_type.split(";")[0].strip().lower()
+
+
+def _decode(data, content_type):
+    m = _CHARSET.search(content_type)
+    try:
+        return data.decode(m.group(1) if m else "utf-8", errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+
+def parse_page(body, content_type, base_url):
+    """从 HTML 里取出 (标题, og:image 的绝对地址)，没有时为 None。"""
+    title = image = None
+    m = _TITLE.search(body)
+    if m:
+        title = " ".join(html.unescape(_decode(m.group(1), content_type)).split())[:200] or None
+    for tag in _META.findall(body):
+        attrs = {k.lower(): v1 or v2 or v3 for k, v1, v2, v3 in _ATTR.findall(tag)}
+        if attrs.get(b"property", attrs.get(b"name", b"")).lower() in (b"og:image", b"twitter:image"):
+            content = html.unescape(_decode(attrs.get(b"content", b""), content_type)).strip()
+            if content:
+                image = urllib.parse.urljoin(base_url, content)
+                break
+    return title, image
+
+
+def thumb_name(image_url, content_type):
+    return hashlib.blake2b(image_url.encode("utf-8"), digest_size=16).hexdigest() + IMAGE_TYPES[content_type]
+
+
+def thumb_file(name, thumb_dir=None):
+    """数据库里的 thumb_path (文件名) 对应的本地路径；文件不存在时返回 None。"""
+    if not name:
+        return None
+    path = os.path.join(thumb_dir or THUMB_DIR, name)
+    return path if os.path.exists(path) else None
+
+
+def _cached_thumb(image_url, thumb_dir):
+    for content_type in IMAGE_TYPES:
+        name = thumb_name(image_url, content_type)
+        if os.path.exists(os.path.join(thumb_dir, name)):
+            return name
+    return None
+
+
+class Checker:
+    """一次检查用到的 fetcher、并发限制和封面目录。"""
+
+    def __init__(self, fetcher=None, concurrency=CONCURRENCY, limiter=None, thumb_dir=None):
+        self.fetcher = fetcher or urllib_fetch
+        self.concurrency = asyncio.Semaphore(concurrency)
+        self.limiter = limiter or HostLimiter()
+        self.thumb_dir = thumb_dir or THUMB_DIR
+        self._downloads = {}  # 图片地址 -> 正在下载它的任务，同时检查的几个资源用同一张图时只下载一次
+
+    async def fetch(self, url, max_bytes):
+        # 先排站点的队，再占总并发的名额：等同一个站点的请求不会占着名额让其他站点也等
+        async with self.limiter.slot(urllib.parse.urlsplit(url).hostname or ""):
+            async with self.concurrency:
+                return await self.fetcher(url, max_bytes)
+
+    async def thumbnail(self, image_url):
+        """下载封面到本地 (已经下载过就直接用)，返回文件名；不是图片、太大或下载失败时返回 None。"""
+        if not _is_http(image_url):
+            return None
+        name = _cached_thumb(image_url, self.thumb_dir)
+        if name:
+            return name
+        task = self._downloads.get(image_url)
+        if task is None:
+            task = self._downloads[image_url] = asyncio.ensure_future(self._download(image_url))
+            task.add_done_callback(lambda _: self._downloads.pop(image_url, None))
+        return await task
+
+    async def _download(self, image_url):
+        try:
+            resp = await self.fetch(image_url, THUMB_BYTES)
+        except FETCH_ERRORS:
+            return None
+        content_type = _media_type(resp.content_type)
+        if resp.status >= 400 or content_type not in IMAGE_TYPES or len(resp.body) > THUMB_BYTES or not resp.body:
+            return None
+        name = thumb_name(image_url, content_type)
+        os.makedirs(self.thumb_dir, exist_ok=True)
+        tmp = os.path.join(self.thumb_dir, f".{name}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(resp.body)
+        os.replace(tmp, os.path.join(self.thumb_dir, name))
+        return name
+
+    async def check(self, resource):
+        """
+        检查一个资源 (含 url / image_url)，返回 (link_status, http_status, page_title, thumb_path)。
+        没有 url 时只下载封面，link_status 为 None。
+        """
+        link_status = http_status = page_title = page_image = None
+        url = resource['url']
+        if url:
+            if not _is_http(url):
+                link_status = "invalid"
+            else:
+                try:
+                    resp = await self.fetch(url, PAGE_BYTES)
+                except FETCH_ERRORS:
+                    link_status = "error"
+                else:
+                    http_status = resp.status
+                    link_status = "ok" if resp.status < 400 else "broken"
+                    if resp.status < 400 and "html" in _media_type(resp.content_type):
+                        page_title, page_image = parse_page(resp.body[:PAGE_BYTES], resp.content_type, resp.url)
+        image_url = resource['image_url'] or page_image
+        thumb = await self.thumbnail(image_url) if image_url else None
+        return link_status, http_status, page_title, thumb
+
+
+# 只在资源的链接和封面地址仍是检查时的那个时才写回 (检查期间被修改过的，触发器已经把它标记为待检查)
+_SAVE = ("UPDATE resources SET link_status=?, http_status=?, page_title=?, thumb_path=?, checked_at=? "
+         "WHERE id=? AND url IS ? AND image_url IS ?")
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def due_resources(limit, before):
+    """从没检查过的在前，然后是上次检查早于 before 的 (最早检查的在前)。"""
+    return run_query("SELECT id, url, image_url FROM resources WHERE checked_at IS NULL OR checked_at < ? "
+                     "ORDER BY checked_at IS NOT NULL, checked_at LIMIT ?", (before, limit), fetch=True, cache=False)
+
+
+def count_unchecked():
+    return run_query("SELECT COUNT(*) AS n FROM resources WHERE checked_at IS NULL", fetch=True,
+                     cache=False)[0]['n']
+
+
+async def check_batch(resources, checker):
+    """并发检查一批资源并一次写回，返回写回的行数。"""
+    results = await asyncio.gather(*(checker.check(r) for r in resources))
+    checked_at = _now()
+    params = [(*result, checked_at, r['id'], r['url'], r['image_url']) for r, result in zip(resources, results)]
+    return (await asyncio.to_thread(get_writer().submit(_SAVE, params, many=True).result)).rowcount
+
+
+async def check_due(checker, recheck_days=RECHECK_DAYS):
+    """检查所有到期的资源 (每 BATCH 个写一次)，返回检查的个数。"""
+    # 截止时间只算一次：recheck_days=0 时这一轮刚检查过的不会再被选中
+    before = (datetime.datetime.now() - datetime.timedelta(days=recheck_days)).isoformat(timespec="seconds")
+    total = 0
+    while True:
+        resources = await asyncio.to_thread(due_resources, BATCH, before)
+        if not resources:
+            return total
+        await check_batch(resources, checker)
+        total += len(resources)
+
+
+def prune_thumbs(thumb_dir=None):
+    """删除不再被任何资源引用的封面文件，返回删除的个数。"""
+    thumb_dir = thumb_dir or THUMB_DIR
+    if not os.path.isdir(thumb_dir):
+        return 0
+    used = {r[0] for r in run_query("SELECT DISTINCT thumb_path FROM resources WHERE thumb_path IS NOT NULL",
+                                    fetch=True, cache=False, as_tuple=True)}
+    removed = 0
+    for name in os.listdir(thumb_dir):
+        if name not in used:
+            os.remove(os.path.join(thumb_dir, name))
+            removed += 1
+    return removed
+
+
+# --- 后台线程 ---
+class Worker:
+    """在自己的线程里跑事件循环，反复检查到期的资源；没有到期的就等 IDLE_SECONDS 或 wake()。"""
+
+    def __init__(self, fetcher=None):
+        self.fetcher = fetcher
+        self.checked = 0
+        self._loop = None
+        self._wake = None
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="linkcheck", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._started.wait()
+
+    def wake(self):
+        # 空闲时在事件循环里等待 asyncio.Event (而不是在线程池里阻塞等待，那样进程退出时要等它超时)
+        self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._started.set()
+        checker = Checker(self.fetcher)
+        await asyncio.to_thread(prune_thumbs)
+        while True:
+            self._wake.clear()
+            try:
+                self.checked += await check_due(checker)
+            except Exception:
+                # 数据库或磁盘出错时记下来，等下一轮再试，线程不退出
+                logger.exception("资源链接检查失败")
+            try:
+                await asyncio.wait_for(self._wake.wait(), IDLE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_worker(fetcher=None):
+    """启动 (每个进程只启动一次) 后台检查线程；ENABLED 为 False 时什么都不做。"""
+    global _worker
+    if not ENABLED:
+        return None
+    with _worker_lock:
+        if _worker is None:
+            _worker = Worker(fetcher)
+            _worker.start()
+        return _worker
+
+
+def wake():
+    """有新的待检查资源：让后台线程马上开始检查。"""
+    if _worker is not None:
+        _worker.wake()
+
+
+def main(argv=None):
+    import db
+
+    parser = argparse.ArgumentParser(description="检查资源链接并缓存封面")
+    parser.add_argument("--all", action="store_true", help="全部重新检查")
+    parser.add_argument("--db", help="数据库文件 (默认 my_notion.db)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db.DB_FILE = args.db
+    db.init_db()
+    started = time.perf_counter()
+    checked = asyncio.run(check_due(Checker(), recheck_days=0 if args.all else RECHECK_DAYS))
+    print(f"检查了 {checked} 个资源，用时 {time.perf_counter() - started:.1f} s")
+    for row in run_query("SELECT link_status, COUNT(*) AS n FROM resources GROUP BY link_status", fetch=True,
+                         cache=False):
+        print(f"  {row['link_status'] or '-'}: {row['n']}")
+    print(f"删除不再使用的封面：{prune_thumbs()} 个")
+
+
+if __name__ == "__main__":
+    main()
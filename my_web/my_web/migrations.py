@@ -0,0 +1,687 @@
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import blobs
+
+# ==========================================
+# 数据库迁移 (Schema Migrations)
+# ==========================================
+# 每个迁移是一个带版本号的函数，按顺序执行；已经执行到的版本记录在 PRAGMA user_version 中。
+# 迁移都写成幂等的 (IF NOT EXISTS / 先检查列是否存在)，所以旧版 app.py、Lyn.studio.py
+# 建出来的 my_notion.db，或者还没有版本号的库，都可以直接升级到同一套表结构。
+#
+# 命令行：python migrations.py [数据库文件] [--explain] [--dry-run]
+
+
+def _columns(c, table):
+    """返回表的列名集合。"""
+    return {row[1] for row in c.execute(f'PRAGMA table_info("{table}")')}
+
+
+def _v1_base_tables(c):
+    """基础表结构：题目、打卡日志、资源、笔记本、笔记。"""
+    # 题目表 (tags 字段改为 TEXT，存储 JSON 字符串)
+    c.execute('''CREATE TABLE IF NOT EXISTS problems (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        difficulty TEXT,
+        tags TEXT, -- 存储 JSON 字符串，例如 '["数组", "哈希表"]'
+        link TEXT,
+        description TEXT,
+        solution_code TEXT,
+        notes TEXT,
+        created_at DATE
+    )''')
+
+    # 刷题日志表 (用于日历显示)
+    c.execute('''CREATE TABLE IF NOT EXISTS logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        problem_id INTEGER,
+        log_date DATE,
+        status TEXT,
+        FOREIGN KEY(problem_id) REFERENCES problems(id)
+    )''')
+
+    # 资源表
+    c.execute('''CREATE TABLE IF NOT EXISTS resources (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT,
+        category TEXT,
+        url TEXT,
+        image_url TEXT,
+        status TEXT
+    )''')
+
+    # 笔记本表
+    c.execute('''CREATE TABLE IF NOT EXISTS notebooks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        created_at DATE
+    )''')
+
+    # 笔记表 (属于某个笔记本)
+    c.execute('''CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        notebook_id INTEGER,
+        title TEXT NOT NULL,
+        content TEXT,
+        created_at DATE,
+        updated_at DATE,
+        FOREIGN KEY(notebook_id) REFERENCES notebooks(id)
+    )''')
+
+    # Lyn.studio.py 建的库没有 resources.status，补上这一列
+    if 'status' not in _columns(c, 'resources'):
+        c.execute("ALTER TABLE resources ADD COLUMN status TEXT")
+
+
+def _v2_tag_index(c):
+    """
+    标签索引表：把 problems.tags 里的 JSON 数组拆成 (problem_id, tag) 行。
+    由触发器随 problems 的增删改自动同步，第一次建表时从现有 JSON 列回填。
+    """
+    exists = c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='problem_tags'").fetchone()
+
+    c.execute('''CREATE TABLE IF NOT EXISTS problem_tags (
+        problem_id INTEGER NOT NULL REFERENCES problems(id) ON DELETE CASCADE,
+        tag TEXT NOT NULL,
+        PRIMARY KEY (problem_id, tag)
+    ) WITHOUT ROWID''')
+    # 按标签筛选 / 列出所有标签都只走这一个索引
+    c.execute("CREATE INDEX IF NOT EXISTS idx_problem_tags_tag ON problem_tags(tag, problem_id)")
+
+    # 非法 JSON 视为没有标签，与页面上 json.loads 失败时的处理一致
+    c.execute('''CREATE TRIGGER IF NOT EXISTS problems_tags_ai AFTER INSERT ON problems BEGIN
+        INSERT OR IGNORE INTO problem_tags (problem_id, tag)
+        SELECT new.id, trim(value) FROM json_each(CASE WHEN json_valid(new.tags) THEN new.tags ELSE '[]' END)
+        WHERE trim(value) <> '';
+    END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS problems_tags_au AFTER UPDATE OF tags ON problems BEGIN
+        DELETE FROM problem_tags WHERE problem_id = old.id;
+        INSERT OR IGNORE INTO problem_tags (problem_id, tag)
+        SELECT new.id, trim(value) FROM json_each(CASE WHEN json_valid(new.tags) THEN new.tags ELSE '[]' END)
+        WHERE trim(value) <> '';
+    END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS problems_tags_ad AFTER DELETE ON problems BEGIN
+        DELETE FROM problem_tags WHERE problem_id = old.id;
+    END''')
+
+    if not exists:
+        # 自动迁移：从旧的 JSON 列回填
+        c.execute('''INSERT OR IGNORE INTO problem_tags (problem_id, tag)
+            SELECT p.id, trim(j.value)
+            FROM problems p, json_each(CASE WHEN json_valid(p.tags) THEN p.tags ELSE '[]' END) j
+            WHERE trim(j.value) <> ''
+        ''')
+
+
+def _v3_search_index(c):
+    """
+    全文索引 (FTS5)：题目 (标题/描述/笔记/代码) 与笔记 (标题/内容) 共用一张表。
+    rowid = 题目 id * 2 或 笔记 id * 2 + 1，触发器按 rowid 直接定位，不用扫描。
+    汉字要先拆开 (db.fts_text) 才能逐字检索，这一步在 Python 里做，表结构里不调用任何自定义函数：
+    sqlite3 命令行、DB Browser、Lyn.studio.py 这些没有注册函数的连接也能照常写入题目和笔记。
+    - 新增、修改的行由触发器记进 search_pending (排队期间每改一次 version 加 1)，删除的行直接从索引里删掉；
+    - 搜索之前 search.sync_index() 读出排队的行，分词后写进索引，只删除 version 没变的排队记录。
+    已有的数据在这里全部排队，第一次搜索 (或 db.init_db) 时建立索引。
+    """
+    exists = c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='search_index'").fetchone()
+
+    # prefix 索引让英文前缀查询 (如 "tw*") 不必展开整个词表
+    c.execute("CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(title, body, prefix='2 3')")
+    c.execute('''CREATE TABLE IF NOT EXISTS search_pending (
+        id INTEGER PRIMARY KEY, -- search_index 的 rowid
+        version INTEGER NOT NULL DEFAULT 1
+    )''')
+
+    for table, rowid, columns in (("problems", "{row}.id * 2", "title, description, notes, solution_code"),
+                                  ("notes", "{row}.id * 2 + 1", "title, content")):
+        enqueue = (f"INSERT INTO search_pending (id) VALUES ({rowid.format(row='new')}) "
+                   f"ON CONFLICT(id) DO UPDATE SET version = version + 1;")
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+            {enqueue}
+        END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE OF {columns} ON {table} BEGIN
+            {enqueue}
+        END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+            DELETE FROM search_index WHERE rowid = {rowid.format(row='old')};
+            DELETE FROM search_pending WHERE id = {rowid.format(row='old')};
+        END''')
+
+    if not exists:
+        # 标题命中的权重是正文的 10 倍；rank 配置会持久化在索引里
+        c.execute("INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+        # 自动迁移：已有的数据排队等待建立索引
+        c.execute("INSERT OR IGNORE INTO search_pending (id) SELECT id * 2 FROM problems")
+        c.execute("INSERT OR IGNORE INTO search_pending (id) SELECT id * 2 + 1 FROM notes")
+
+
+def _v4_stats(c):
+    """
+    仪表盘统计表，由触发器在写入时增量维护，主页只需读一行。
+    - stats：唯一一行 (id = 1)，已解决次数、资源数、笔记本数、各难度题目数。
+    - daily_solves：每天完成的打卡次数。
+    第一次建表时按现有数据完整计算一次。
+    """
+    exists = c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='stats'").fetchone()
+
+    c.execute('''CREATE TABLE IF NOT EXISTS stats (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        solved_count INTEGER NOT NULL DEFAULT 0, -- status = '已完成' 的打卡次数
+        resource_count INTEGER NOT NULL DEFAULT 0,
+        notebook_count INTEGER NOT NULL DEFAULT 0,
+        problem_count INTEGER NOT NULL DEFAULT 0,
+        easy_count INTEGER NOT NULL DEFAULT 0,
+        medium_count INTEGER NOT NULL DEFAULT 0,
+        hard_count INTEGER NOT NULL DEFAULT 0
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS daily_solves (
+        day DATE PRIMARY KEY,
+        solved INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''')
+
+    # 打卡：只统计已完成的记录
+    c.execute('''CREATE TRIGGER IF NOT EXISTS stats_logs_ai AFTER INSERT ON logs WHEN new.status = '已完成' BEGIN
+        UPDATE stats SET solved_count = solved_count + 1 WHERE id = 1;
+        INSERT INTO daily_solves (day, solved) SELECT new.log_date, 1 WHERE new.log_date IS NOT NULL
+            ON CONFLICT(day) DO UPDATE SET solved = solved + 1;
+    END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS stats_logs_ad AFTER DELETE ON logs WHEN old.status = '已完成' BEGIN
+        UPDATE stats SET solved_count = solved_count - 1 WHERE id = 1;
+        UPDATE daily_solves SET solved = solved - 1 WHERE day = old.log_date;
+    END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS stats_logs_au AFTER UPDATE OF status, log_date ON logs BEGIN
+        UPDATE stats SET solved_count = solved_count - (old.status IS '已完成') + (new.status IS '已完成') WHERE id = 1;
+        UPDATE daily_solves SET solved = solved - 1 WHERE day = old.log_date AND old.status IS '已完成';
+        INSERT INTO daily_solves (day, solved) SELECT new.log_date, 1
+            WHERE new.status IS '已完成' AND new.log_date IS NOT NULL
+            ON CONFLICT(day) DO UPDATE SET solved = solved + 1;
+    END''')
+
+    # 资源与笔记本：只记总数
+    for table, column in (("resources", "resource_count"), ("notebooks", "notebook_count")):
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS stats_{table}_ai AFTER INSERT ON {table} BEGIN
+            UPDATE stats SET {column} = {column} + 1 WHERE id = 1;
+        END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS stats_{table}_ad AFTER DELETE ON {table} BEGIN
+            UPDATE stats SET {column} = {column} - 1 WHERE id = 1;
+        END''')
+
+    # 题目：总数与各难度数量 (IS 比较在 difficulty 为 NULL 时也返回 0/1)
+    c.execute('''CREATE TRIGGER IF NOT EXISTS stats_problems_ai AFTER INSERT ON problems BEGIN
+        UPDATE stats SET problem_count = problem_count + 1,
+            easy_count = easy_count + (new.difficulty IS '简单'),
+            medium_count = medium_count + (new.difficulty IS '中等'),
+            hard_count = hard_count + (new.difficulty IS '困难')
+        WHERE id = 1;
+    END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS stats_problems_ad AFTER DELETE ON problems BEGIN
+        UPDATE stats SET problem_count = problem_count - 1,
+            easy_count = easy_count - (old.difficulty IS '简单'),
+            medium_count = medium_count - (old.difficulty IS '中等'),
+            hard_count = hard_count - (old.difficulty IS '困难')
+        WHERE id = 1;
+    END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS stats_problems_au AFTER UPDATE OF difficulty ON problems BEGIN
+        UPDATE stats SET
+            easy_count = easy_count - (old.difficulty IS '简单') + (new.difficulty IS '简单'),
+            medium_count = medium_count - (old.difficulty IS '中等') + (new.difficulty IS '中等'),
+            hard_count = hard_count - (old.difficulty IS '困难') + (new.difficulty IS '困难')
+        WHERE id = 1;
+    END''')
+
+    if not exists:
+        rebuild_stats(c)
+
+
+def rebuild_stats(c):
+    """按当前数据重新计算统计表 (建表时调用，也可用于修复)。"""
+    c.execute("DELETE FROM daily_solves")
+    c.execute('''INSERT OR REPLACE INTO stats (id, solved_count, resource_count, notebook_count,
+            problem_count, easy_count, medium_count, hard_count)
+        SELECT 1,
+            (SELECT COUNT(*) FROM logs WHERE status = '已完成'),
+            (SELECT COUNT(*) FROM resources),
+            (SELECT COUNT(*) FROM notebooks),
+            (SELECT COUNT(*) FROM problems),
+            (SELECT COUNT(*) FROM problems WHERE difficulty = '简单'),
+            (SELECT COUNT(*) FROM problems WHERE difficulty = '中等'),
+            (SELECT COUNT(*) FROM problems WHERE difficulty = '困难')''')
+    c.execute('''INSERT INTO daily_solves (day, solved)
+        SELECT log_date, COUNT(*) FROM logs WHERE status = '已完成' AND log_date IS NOT NULL GROUP BY log_date''')
+
+
+def _v5_indexes(c):
+    """
+    各页面筛选/排序所用列上的索引：
+    - logs(problem_id)：删除题目时删除其打卡记录、按题目查打卡。
+    - logs(log_date, problem_id)：日历按日期窗口查询、主页近期动态，JOIN 不必回表。
+    - notes(notebook_id, created_at) / notes(notebook_id, updated_at)：笔记本目录与“最新一篇笔记”。
+    - problems(difficulty, id)：题目列表按难度筛选后按 id 倒序分页。
+    """
+    c.execute("CREATE INDEX IF NOT EXISTS idx_logs_problem ON logs(problem_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_logs_date ON logs(log_date, problem_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_notes_notebook_created ON notes(notebook_id, created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_notes_notebook_updated ON notes(notebook_id, updated_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_problems_difficulty ON problems(difficulty, id)")
+    # 让查询规划器拿到新索引的统计信息。只统计这几张表：不带表名的 ANALYZE 也会统计全文索引的内部表
+    # (search_index_data 等)，新库上只统计到几行，之后 FTS5 的内部查询一直按 “表很小” 规划，数据越多写入越慢
+    for table in ("logs", "notes", "problems"):
+        c.execute(f"ANALYZE {table}")
+
+
+def _rebuild_table(c, table, create_sql):
+    """
+    按 SQLite 文档的“12 步”做法重建一张表 (改外键定义只能重建)：
+    建新表 -> 复制数据 -> 删旧表 -> 改名，再按 sqlite_master 里的原始 SQL 重建索引和触发器。
+    新表只复制两边都有的列，AUTOINCREMENT 的计数也保留，已删除的 id 不会被重新使用。
+    """
+    old_columns = _columns(c, table)
+    seq = c.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    extras = c.execute("SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') "
+                       "AND sql IS NOT NULL", (table,)).fetchall()
+
+    c.execute(create_sql.format(table=f"{table}_new"))
+    columns = ", ".join(col for col in _columns(c, f"{table}_new") if col in old_columns)
+    c.execute(f"INSERT INTO {table}_new ({columns}) SELECT {columns} FROM {table}")
+    c.execute(f"DROP TABLE {table}")  # 同时删掉旧表上的索引和触发器
+    c.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    if seq:
+        c.execute("UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = ?", (seq[0], table))
+    for (sql,) in extras:
+        c.execute(sql)
+
+
+def _has_cascade(c, table, parent):
+    return any(fk[2] == parent and fk[6] == 'CASCADE' for fk in c.execute(f'PRAGMA foreign_key_list("{table}")'))
+
+
+def _v6_cascade_deletes(c):
+    """
+    logs.problem_id、notes.notebook_id 改为 ON DELETE CASCADE：删除题目/笔记本时由数据库删除子记录，
+    不再需要先手动删 logs / notes。连接打开了 PRAGMA foreign_keys，重建前先清掉已有的孤儿记录
+    (旧版 Lyn.studio.py 删除题目、笔记本时不删子记录)。
+    """
+    if not _has_cascade(c, 'logs', 'problems'):
+        # 逐行删除会触发统计表和全文索引的触发器，计数保持正确
+        c.execute("DELETE FROM logs WHERE problem_id IS NOT NULL AND problem_id NOT IN (SELECT id FROM problems)")
+        _rebuild_table(c, 'logs', '''CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            problem_id INTEGER REFERENCES problems(id) ON DELETE CASCADE,
+            log_date DATE,
+            status TEXT
+        )''')
+    if not _has_cascade(c, 'notes', 'notebooks'):
+        c.execute("DELETE FROM notes WHERE notebook_id IS NOT NULL AND notebook_id NOT IN (SELECT id FROM notebooks)")
+        _rebuild_table(c, 'notes', '''CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            notebook_id INTEGER REFERENCES notebooks(id) ON DELETE CASCADE,
+            title TEXT NOT NULL,
+            content TEXT,
+            created_at DATE,
+            updated_at DATE
+        )''')
+
+
+# 内容变了而 content_hash 没有跟着更新时清空它；{changed} 是 “内容变了” 的条件
+_NOTES_CONTENT_HASH_AU = '''CREATE TRIGGER IF NOT EXISTS notes_content_hash_au AFTER UPDATE OF content ON notes
+        WHEN {changed} AND new.content_hash IS old.content_hash BEGIN
+        UPDATE notes SET content_hash = NULL WHERE id = new.id;
+    END'''
+
+
+def _v7_note_revisions(c):
+    """
+    笔记自动保存与历史版本 (见 revisions.py)：
+    - notes.content_hash：当前内容的哈希，内容没变时自动保存直接跳过，不再整篇重写。
+      不经过 revisions.py 修改内容 (导入、旧版 Lyn.studio.py) 时由触发器清空，之后按内容重新计算。
+    - note_revisions：每次保存的内容。每隔几版存一份完整内容 (关键帧)，其余只存相对上一版按行的差异，
+      都用 zlib 压缩；读取某一版时从它之前最近的关键帧开始依次应用差异。
+    """
+    if 'content_hash' not in _columns(c, 'notes'):
+        c.execute("ALTER TABLE notes ADD COLUMN content_hash TEXT")
+    c.execute(_NOTES_CONTENT_HASH_AU.format(changed="new.content IS NOT old.content"))
+    c.execute('''CREATE TABLE IF NOT EXISTS note_revisions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        note_id INTEGER NOT NULL REFERENCES notes(id) ON DELETE CASCADE,
+        rev INTEGER NOT NULL, -- 每篇笔记从 1 开始
+        keyframe INTEGER NOT NULL, -- 1: data 是完整内容；0: data 是相对上一版的差异
+        data BLOB NOT NULL, -- zlib 压缩
+        title TEXT,
+        content_hash TEXT,
+        size INTEGER, -- 这一版内容的字符数
+        created_at TEXT,
+        UNIQUE (note_id, rev)
+    )''')
+
+
+def _same_text(column):
+    """触发器里的条件：更新前后这一列的全文相同 (只是在列里的原文和 text_blobs 的引用之间移动)。"""
+    return f"(new.{column} IS old.{column} OR blob_ref(new.{column}) IS blob_ref(old.{column}))"
+
+
+def _blob_release(column):
+    """触发器语句：旧值是 text_blobs 的引用时减少引用次数，减到 0 时删掉这段内容。"""
+    return f'''
+            UPDATE text_blobs SET refs = refs - 1 WHERE substr(old.{column}, 1, 1) = char(1) AND hash = substr(old.{column}, 2);
+            DELETE FROM text_blobs WHERE substr(old.{column}, 1, 1) = char(1) AND hash = substr(old.{column}, 2) AND refs <= 0;'''
+
+
+def _v8_text_blobs(c):
+    """
+    大文本的压缩存储 text_blobs (见 blobs.py)。这里只建表和纯 SQL 的触发器：
+    列被改写或行被删除时减少旧内容的引用次数，减到 0 时删掉。
+    把大文本移进 text_blobs 的触发器要调用 blob_* 函数，只在打开存储时由 sync_blob_triggers() 安装。
+    """
+    c.execute('''CREATE TABLE IF NOT EXISTS text_blobs (
+        hash TEXT PRIMARY KEY,
+        codec TEXT NOT NULL, -- zlib / zstd
+        data BLOB NOT NULL,
+        size INTEGER, -- 原文的字符数
+        refs INTEGER NOT NULL -- 被多少个 (行, 列) 引用
+    ) WITHOUT ROWID''')
+
+    for table, columns in blobs.TEXT_COLUMNS.items():
+        c.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_blobs_ad AFTER DELETE ON {table} BEGIN"
+                  f"{''.join(_blob_release(col) for col in columns)}\n        END")
+        for col in columns:
+            c.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_{col}_blob_release_au AFTER UPDATE OF {col} ON {table}\n"
+                      f"        WHEN new.{col} IS NOT old.{col} BEGIN{_blob_release(col)}\n        END")
+
+
+def _blob_move_triggers():
+    """{触发器名: 建立语句}：写入超过 blob_min_chars() 的文本时把全文存进 text_blobs、列里换成引用。"""
+    triggers = {}
+    for table, columns in blobs.TEXT_COLUMNS.items():
+        for col in columns:
+            move = f'''
+            INSERT INTO text_blobs (hash, codec, data, size, refs)
+                SELECT blob_hash(new.{col}), blob_codec(), blob_pack(new.{col}), length(new.{col}), 1
+                WHERE {blobs.should_move(f"new.{col}")}
+                ON CONFLICT(hash) DO UPDATE SET refs = refs + 1;
+            UPDATE {table} SET {col} = blob_ref(new.{col}) WHERE id = new.id AND {blobs.should_move(f"new.{col}")};'''
+            triggers[f"{table}_{col}_blob_ai"] = f"CREATE TRIGGER {table}_{col}_blob_ai AFTER INSERT ON {table} BEGIN{move}\n        END"
+            triggers[f"{table}_{col}_blob_au"] = (f"CREATE TRIGGER {table}_{col}_blob_au AFTER UPDATE OF {col} ON {table}\n"
+                                                  f"        WHEN new.{col} IS NOT old.{col} BEGIN{move}\n        END")
+    return triggers
+
+
+def sync_blob_triggers(conn):
+    """
+    按 blobs.MIN_CHARS 安装或删除移动大文本的触发器 (db.init_db 每次调用)，返回是否改动了表结构。
+    - 打开存储时：安装 _blob_move_triggers()，content_hash 的触发器改为忽略只是把文本移进 / 移出 text_blobs 的更新。
+      这些触发器调用 blob_* 函数，之后只有注册了这些函数 (blobs.register) 的连接能写入题目和笔记。
+    - 关闭时 (默认)：删掉它们、恢复版本 7 的 content_hash 触发器，表结构里没有自定义函数，
+      sqlite3 命令行等普通连接也能写入；已经移走的内容照常读取，引用计数由版本 8 的触发器维护。
+    """
+    if current_version(conn) < 8:
+        return False
+    enabled = blobs.MIN_CHARS > 0
+    existing = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type='trigger'").fetchall())
+    statements = []
+    for name, sql in _blob_move_triggers().items():
+        if enabled and name not in existing:
+            statements.append(sql)
+        elif not enabled and name in existing:
+            statements.append(f"DROP TRIGGER {name}")
+    if enabled != ("blob_ref(" in existing.get("notes_content_hash_au", "")):
+        changed = f"NOT {_same_text('content')}" if enabled else "new.content IS NOT old.content"
+        statements += ["DROP TRIGGER IF EXISTS notes_content_hash_au", _NOTES_CONTENT_HASH_AU.format(changed=changed)]
+    if not statements:
+        return False
+    conn.execute("BEGIN")
+    try:
+        for sql in statements:
+            conn.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return True
+
+
+def _v9_review_schedule(c):
+    """
+    间隔复习 (见 review.py)：logs.quality 记录每次打卡的回忆质量 (0~5，旧记录为 NULL，按 4 计算)；
+    problems 上的 review_* 列是 SM-2 的复习状态，每次打卡时增量更新。
+    review_due 上的部分索引只包含打过卡的题，“今日复习” 按 review_due <= 今天 做一次范围扫描。
+    已有的打卡记录在这里按时间顺序重放一遍，算出每道题当前的复习状态。
+    """
+    # 迁移在 db 导入完成之后才执行，这时再导入 review (它依赖 db) 不会循环导入
+    from review import _HISTORY, _UPDATE_STATE, schedule_updates
+
+    if 'quality' not in _columns(c, 'logs'):
+        c.execute("ALTER TABLE logs ADD COLUMN quality INTEGER")
+    problem_columns = _columns(c, 'problems')
+    for column, column_type in (("review_ease", "REAL"), ("review_interval", "INTEGER"), ("review_reps", "INTEGER"),
+                                ("review_due", "DATE"), ("review_last", "DATE")):
+        if column not in problem_columns:
+            c.execute(f"ALTER TABLE problems ADD COLUMN {column} {column_type}")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_problems_review_due ON problems(review_due) WHERE review_due IS NOT NULL")
+    c.executemany(_UPDATE_STATE, list(schedule_updates(c.execute(_HISTORY))))
+
+
+def _v10_analytics_versions(c):
+    """
+    统计页面 (见 analytics.py) 的数据版本，由触发器在 stats 的唯一一行里计数：
+    - log_inserts：新增打卡记录的次数 (只有这个变了时只需读新增的行)。
+    - log_edits：删除打卡记录、改打卡的日期 / 状态 / 题目的次数。
+    - problem_edits：新增 / 删除题目、改难度、改标签的次数。
+    """
+    stats_columns = _columns(c, 'stats')
+    for column in ("log_inserts", "log_edits", "problem_edits"):
+        if column not in stats_columns:
+            c.execute(f"ALTER TABLE stats ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+
+    for name, event, column in (
+            ("logs_ai", "INSERT ON logs", "log_inserts"),
+            ("logs_ad", "DELETE ON logs", "log_edits"),
+            ("logs_au", "UPDATE OF log_date, status, problem_id ON logs", "log_edits"),
+            ("problems_ai", "INSERT ON problems", "problem_edits"),
+            ("problems_ad", "DELETE ON problems", "problem_edits"),
+            ("problems_au", "UPDATE OF difficulty ON problems", "problem_edits"),
+            ("problem_tags_ai", "INSERT ON problem_tags", "problem_edits"),
+            ("problem_tags_ad", "DELETE ON problem_tags", "problem_edits")):
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS analytics_{name} AFTER {event} BEGIN
+            UPDATE stats SET {column} = {column} + 1 WHERE id = 1;
+        END''')
+
+
+def _v11_resource_links(c):
+    """
+    资源的链接检查结果 (见 linkcheck.py)，由后台任务写入：
+    - link_status：ok / broken (HTTP 4xx、5xx) / error (连不上、超时) / invalid (不是 http 链接)；http_status 是状态码。
+    - page_title：链接页面的 <title>；thumb_path：下载到本地的封面文件名。
+    - checked_at：上次检查的时间，NULL 表示还没检查过；改了 url 或 image_url 时由触发器清空，等待重新检查。
+    status 列仍是用户自己的 “待看” 等状态，不用来记录链接状态。
+    """
+    resource_columns = _columns(c, 'resources')
+    for column, column_type in (("link_status", "TEXT"), ("http_status", "INTEGER"), ("page_title", "TEXT"),
+                                ("thumb_path", "TEXT"), ("checked_at", "TEXT")):
+        if column not in resource_columns:
+            c.execute(f"ALTER TABLE resources ADD COLUMN {column} {column_type}")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_resources_checked ON resources(checked_at)")
+    c.execute('''CREATE TRIGGER IF NOT EXISTS resources_links_au AFTER UPDATE OF url, image_url ON resources
+        WHEN new.url IS NOT old.url OR new.image_url IS NOT old.image_url BEGIN
+        UPDATE resources SET checked_at = NULL WHERE id = new.id;
+    END''')
+
+
+# 行版本 rev 只跟着这些列变：列表卡片 (cards.py) 和静态站点 (site_export.py) 显示的列。
+# 复习计划 (review_*)、content_hash 等不显示的列被更新时 rev 不变，缓存的卡片和生成的页面仍然有效。
+_ROW_REV_COLUMNS = {
+    "problems": ("title", "difficulty", "tags", "link", "created_at", "description", "notes", "solution_code"),
+    "resources": ("title", "category", "url", "image_url", "status", "link_status", "http_status", "page_title",
+                  "thumb_path", "checked_at"),
+    "notebooks": ("name", "created_at"),
+    "notes": ("notebook_id", "title", "content", "created_at", "updated_at"),
+}
+
+
+def _v12_row_revs(c):
+    """
+    题目、资源、笔记本的行版本 rev：显示出来的列 (_ROW_REV_COLUMNS) 被修改时由触发器加 1 (新行从 0 开始)。
+    列表卡片的 HTML 按 (种类, id, rev) 缓存 (见 cards.py)，rev 没变的卡片直接用缓存。
+    触发器只在这次修改没有自己设置 rev、并且至少有一列的值真的变了时生效 (重新导入相同的行不改 rev)；
+    SQLite 默认不递归触发，触发器里的 UPDATE 不会再触发自己。
+    """
+    for table in ("problems", "resources", "notebooks"):
+        _add_row_rev(c, table)
+
+
+def _add_row_rev(c, table):
+    if 'rev' not in _columns(c, table):
+        c.execute(f"ALTER TABLE {table} ADD COLUMN rev INTEGER NOT NULL DEFAULT 0")
+    columns = _ROW_REV_COLUMNS[table]
+    changed = " OR ".join(f"old.{col} IS NOT new.{col}" for col in columns)
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_rev_au AFTER UPDATE OF {", ".join(columns)} ON {table}
+        WHEN new.rev IS old.rev AND ({changed}) BEGIN
+        UPDATE {table} SET rev = old.rev + 1 WHERE id = new.id;
+    END''')
+
+
+def _v13_note_revs(c):
+    """笔记的行版本 rev (同版本 12)。静态站点导出 (见 site_export.py) 按各行的 rev 判断哪些页面需要重新生成。"""
+    _add_row_rev(c, "notes")
+
+
+def _v14_problem_tests(c):
+    """
+    题解的本地测试 (见 runner.py)：
+    - problem_tests：题目的测试用例，args 是调用参数的 JSON 数组，expected 是期望返回值的 JSON。
+    - logs.runtime_ms：打卡时运行全部测试用例的总用时 (毫秒)，测试没有全部通过或没有测试用例时为 NULL。
+    """
+    c.execute('''CREATE TABLE IF NOT EXISTS problem_tests (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        problem_id INTEGER NOT NULL REFERENCES problems(id) ON DELETE CASCADE,
+        args TEXT NOT NULL, -- JSON 数组，例如 '[[2, 7, 11, 15], 9]'
+        expected TEXT, -- JSON，例如 '[0, 1]'
+        created_at DATE
+    )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_problem_tests_problem ON problem_tests(problem_id)")
+    if 'runtime_ms' not in _columns(c, 'logs'):
+        c.execute("ALTER TABLE logs ADD COLUMN runtime_ms REAL")
+
+
+# (版本号, 说明, 迁移函数)，只能在末尾追加，不要修改已发布的迁移
+MIGRATIONS = [
+    (1, "基础表结构", _v1_base_tables),
+    (2, "标签索引表 problem_tags", _v2_tag_index),
+    (3, "全文索引 search_index", _v3_search_index),
+    (4, "统计表 stats / daily_solves", _v4_stats),
+    (5, "常用查询的索引", _v5_indexes),
+    (6, "删除题目/笔记本时级联删除子记录", _v6_cascade_deletes),
+    (7, "笔记内容哈希与历史版本 note_revisions", _v7_note_revisions),
+    (8, "大文本的压缩存储 text_blobs", _v8_text_blobs),
+    (9, "间隔复习：logs.quality 与题目的复习计划", _v9_review_schedule),
+    (10, "统计页面的数据版本计数", _v10_analytics_versions),
+    (11, "资源的链接检查结果与本地封面", _v11_resource_links),
+    (12, "题目/资源/笔记本的行版本 rev", _v12_row_revs),
+    (13, "笔记的行版本 rev", _v13_note_revs),
+    (14, "题解的测试用例 problem_tests 与打卡用时", _v14_problem_tests),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target=None):
+    """
+    把数据库升级到 target 版本 (默认最新)。
+    每个迁移和它的版本号在同一个事务里提交，中途失败不会留下半升级的库。
+    返回本次执行的 [(版本号, 说明)]。
+    """
+    applied = []
+    version = current_version(conn)
+    for number, description, step in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+        conn.execute("BEGIN")
+        try:
+            step(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append((number, description))
+    return applied
+
+
+# 各页面的关键查询，用来对比迁移前后的查询计划
+KEY_QUERIES = {
+    "主页统计": ("SELECT * FROM stats WHERE id = 1", ()),
+    "主页近期动态": ("SELECT logs.log_date, problems.title FROM logs JOIN problems ON logs.problem_id = problems.id "
+                "ORDER BY logs.log_date DESC LIMIT 5", ()),
+    "标签列表": ("SELECT DISTINCT tag FROM problem_tags ORDER BY tag", ()),
+    "题目列表 (按难度)": ("SELECT id, title, difficulty, tags, created_at FROM problems WHERE 1=1 AND difficulty = ? "
+                    "ORDER BY id DESC LIMIT ?", ("简单", 20)),
+    "日历窗口": ("SELECT logs.id, logs.log_date, problems.title, problems.id as pid, problems.difficulty FROM logs "
+             "JOIN problems ON logs.problem_id = problems.id WHERE logs.log_date >= ? AND logs.log_date < ? "
+             "ORDER BY logs.log_date DESC", ("2025-01-01", "2025-02-15")),
+    "笔记本目录": ("SELECT id, title FROM notes WHERE notebook_id=? ORDER BY created_at DESC", (1,)),
+    "最新笔记": ("SELECT id FROM notes WHERE notebook_id=? ORDER BY updated_at DESC LIMIT 1", (1,)),
+    "题目的打卡记录": ("SELECT id FROM logs WHERE problem_id = ?", (1,)),
+}
+
+
+def query_plans(conn):
+    """返回 {查询名: EXPLAIN QUERY PLAN 的各行}；表还不存在时返回错误信息。"""
+    plans = {}
+    for name, (query, params) in KEY_QUERIES.items():
+        try:
+            plans[name] = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+        except sqlite3.OperationalError as e:
+            plans[name] = [f"(无法执行: {e})"]
+    return plans
+
+
+def _print_plans(title, plans):
+    print(f"\n== {title} ==")
+    for name, lines in plans.items():
+        print(f"[{name}]")
+        for line in lines:
+            print(f"    {line}")
+
+
+def main(argv=None):
+    # 连接由连接池打开，这样大文本存储的触发器需要的函数 (blobs.register) 也会注册好
+    from db import DB_FILE, get_pool
+
+    parser = argparse.ArgumentParser(description="把 my_notion.db 升级到最新的表结构")
+    parser.add_argument("db_file", nargs="?", default=DB_FILE)
+    parser.add_argument("--explain", action="store_true", help="打印迁移前后关键查询的查询计划")
+    parser.add_argument("--dry-run", action="store_true", help="在临时副本上执行，不修改原文件")
+    args = parser.parse_args(argv)
+
+    db_file = args.db_file
+    if args.dry_run:
+        tmp_dir = tempfile.mkdtemp()
+        db_file = os.path.join(tmp_dir, os.path.basename(args.db_file))
+        shutil.copyfile(args.db_file, db_file)
+
+    with get_pool(db_file).connection() as conn:
+        print(f"{args.db_file}: 当前版本 {current_version(conn)}，最新版本 {LATEST_VERSION}")
+        if args.explain:
+            _print_plans("迁移前", query_plans(conn))
+        for number, description in migrate(conn):
+            print(f"已执行迁移 {number}: {description}")
+        if sync_blob_triggers(conn):
+            print("已按 MY_NOTION_BLOB_MIN_CHARS 更新大文本存储的触发器")
+        print(f"升级完成，当前版本 {current_version(conn)}")
+        if args.explain:
+            _print_plans("迁移后", query_plans(conn))
+
+    if args.dry_run:
+        get_pool(db_file).close_all()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
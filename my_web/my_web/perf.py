@@ -0,0 +1,194 @@
+import functools
+import logging
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+# ==========================================
+# run_query 的性能统计与慢查询日志
+# ==========================================
+# 默认关闭 (关闭时 run_query 只多一次布尔判断)。设置环境变量 MY_NOTION_PERF=1，或在 ?page=_perf 页面里打开。
+# 打开后每次 run_query 记录调用位置、规范化后的 SQL、耗时、返回行数和结果占用的内存 (估算)：
+# - 按 (调用位置, SQL) 汇总次数、总耗时、p50/p99、行数、字节数。
+# - 耗时超过 slow_query_ms 的语句写入 logs/slow_queries.log (按大小轮转)。
+# - app.py 每次 rerun 的全部查询记为一条 trace，_perf 页面据此画出火焰图。
+# 这个模块不依赖 streamlit，也不导入 db，db.py 可以直接调用它。
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SLOW_LOG_FILE = os.path.join(APP_DIR, "logs", "slow_queries.log")
+SAMPLES_PER_KEY = 1000  # 每个 (调用位置, SQL) 最多保留最近多少个耗时样本，用来算分位数
+MAX_TRACES = 30
+
+enabled = os.environ.get("MY_NOTION_PERF") == "1"
+slow_query_ms = float(os.environ.get("MY_NOTION_SLOW_MS", 100))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(query):
+    """去掉字面量和多余空白，IN (?, ?, ...) 合并成一项，同一条语句的不同参数/列表长度归为一类。"""
+    sql = _STRING.sub("?", query)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?, ...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _call_stack():
+    """
+    run_query 在本应用里的调用链 (由外到内)，例如 ["app.py:<module>", "views/problems.py:render_list",
+    "queries.py:get_problem_page"]；另返回最内层的调用位置 "queries.py:59 get_problem_page"。
+    """
+    stack = []
+    site = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(APP_DIR) and not path.endswith(("db.py", "perf.py")):
+            name = os.path.relpath(path, APP_DIR)
+            stack.append(f"{name}:{frame.f_code.co_name}")
+            if site is None:
+                site = f"{name}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    stack.reverse()
+    return stack, site or "?"
+
+
+def _result_bytes(rows):
+    """结果在 Python 里占用的内存 (每行的 dict 或 tuple 加上各个值)。"""
+    return sum(sys.getsizeof(row) + sum(sys.getsizeof(v) for v in (row.values() if isinstance(row, dict) else row))
+               for row in rows)
+
+
+class QueryStats:
+    """按 (调用位置, 规范化 SQL) 汇总的查询统计。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def add(self, site, sql, ms, rows, size, cached):
+        with self._lock:
+            s = self._stats.get((site, sql))
+            if s is None:
+                s = self._stats[(site, sql)] = {"count": 0, "cached": 0, "total_ms": 0.0, "rows": 0, "bytes": 0,
+                                                "samples": deque(maxlen=SAMPLES_PER_KEY)}
+            s["count"] += 1
+            s["cached"] += cached
+            s["total_ms"] += ms
+            s["rows"] += rows
+            s["bytes"] += size
+            s["samples"].append(ms)
+
+    def snapshot(self):
+        """返回按总耗时从高到低排列的汇总 (list of dict)。"""
+        with self._lock:
+            items = [(key, dict(s), sorted(s["samples"])) for key, s in self._stats.items()]
+        result = []
+        for (site, sql), s, samples in items:
+            result.append({
+                "site": site,
+                "sql": sql,
+                "count": s["count"],
+                "cached": s["cached"],
+                "total_ms": round(s["total_ms"], 2),
+                "p50_ms": round(statistics.median(samples), 3),
+                "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+                "rows": s["rows"],
+                "bytes": s["bytes"],
+            })
+        result.sort(key=lambda r: r["total_ms"], reverse=True)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+stats = QueryStats()
+traces = deque(maxlen=MAX_TRACES)  # 最近几次 rerun 的 trace，新的在右边
+_local = threading.local()
+_slow_logger = None
+_slow_logger_lock = threading.Lock()
+
+
+def enable(flag=True):
+    global enabled
+    enabled = flag
+
+
+def set_slow_query_ms(ms):
+    global slow_query_ms
+    slow_query_ms = float(ms)
+
+
+def _get_slow_logger():
+    """慢查询日志：第一次用到时才创建 logs/ 目录和文件，单个文件 1MB，保留 3 个旧文件。"""
+    global _slow_logger
+    with _slow_logger_lock:
+        if _slow_logger is None:
+            os.makedirs(os.path.dirname(SLOW_LOG_FILE), exist_ok=True)
+            handler = RotatingFileHandler(SLOW_LOG_FILE, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger = logging.getLogger("my_notion.slow_query")
+            logger.setLevel(logging.INFO)
+            logger.addHandler(handler)
+            logger.propagate = False
+            _slow_logger = logger
+        return _slow_logger
+
+
+def record(query, params, started, rows, cached=False):
+    """
+    记录一次 run_query 调用 (由 db.run_query 在 enabled 时调用)。
+    rows 为读查询返回的列表 (每行是 dict 或 tuple)，或行数 (写语句影响的行数、stream=True 读出的行数)。
+    """
+    ms = (time.perf_counter() - started) * 1000
+    stack, site = _call_stack()
+    sql = normalize_sql(query)
+    if isinstance(rows, list):
+        row_count, size = len(rows), _result_bytes(rows)
+    else:
+        row_count, size = max(rows or 0, 0), 0
+    stats.add(site, sql, ms, row_count, size, cached)
+
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace["queries"].append({"stack": stack, "site": site, "sql": sql, "ms": ms, "rows": row_count,
+                                 "cached": cached})
+
+    if ms >= slow_query_ms and not cached:
+        _get_slow_logger().info("%.1f ms rows=%d site=%s sql=%s params=%.200r", ms, row_count, site, sql,
+                                tuple(params))
+
+
+@contextmanager
+def trace(page):
+    """
+    把 with 块里 (当前线程) 的所有查询记成一次 rerun 的 trace。
+    块里抛出异常 (包括 st.rerun() 打断本次运行) 时同样记录。以 _ 开头的内部页面不记录，免得刷新时冲掉其他记录。
+    """
+    if not enabled or page.startswith("_"):
+        yield
+        return
+    current = {"page": page, "at": time.strftime("%H:%M:%S"), "queries": [], "interrupted": False}
+    _local.trace = current
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        current["interrupted"] = True
+        raise
+    finally:
+        _local.trace = None
+        current["wall_ms"] = (time.perf_counter() - started) * 1000
+        traces.append(current)
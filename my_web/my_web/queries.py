@@ -0,0 +1,149 @@
+import datetime
+
+import blobs
+from db import run_query
+
+# ==========================================
+# 各页面读取数据的查询 (不依赖 streamlit)
+# ==========================================
+# 页面模块 (views/) 和基准测试 (bench/) 调用的是同一批函数，测出来的就是页面实际执行的查询。
+# 写入语句仍然直接写在各页面里。
+
+
+def expand_blobs(table, row):
+    """详情页用：把移到 text_blobs 的列 (见 blobs.py) 换回全文。返回新的 dict，不修改缓存里的结果。"""
+    refs = {c: row[c][1:] for c in blobs.TEXT_COLUMNS[table] if blobs.is_ref(row[c])}
+    if not refs:
+        return row
+    placeholders = ", ".join("?" * len(refs))
+    stored = {r['hash']: blobs.unpack(r['codec'], r['data']) for r in run_query(
+        f"SELECT hash, codec, data FROM text_blobs WHERE hash IN ({placeholders})", tuple(refs.values()), fetch=True)}
+    row = dict(row)
+    for column, digest in refs.items():
+        row[column] = stored.get(digest)
+    return row
+
+
+# --- 🏠 仪表盘 ---
+def get_dashboard_stats():
+    """返回 (stats 表的唯一一行, 今日完成的打卡次数)。"""
+    stats = run_query("SELECT * FROM stats WHERE id = 1", fetch=True)[0]
+    today_solved = run_query("SELECT solved FROM daily_solves WHERE day = ?",
+                             (datetime.date.today().isoformat(),), fetch=True)
+    return stats, today_solved[0]['solved'] if today_solved else 0
+
+
+def get_recent_activity(limit=5):
+    return run_query("""
+        SELECT logs.log_date, problems.title FROM logs JOIN problems ON logs.problem_id = problems.id
+        ORDER BY logs.log_date DESC LIMIT ?
+    """, (limit,), fetch=True)
+
+
+# --- 💻 刷题本 ---
+def get_all_tags():
+    """所有标签 (直接读标签索引表，不再逐行解析 JSON；只有一列，按 tuple 读取)。"""
+    rows = run_query("SELECT DISTINCT tag FROM problem_tags ORDER BY tag", fetch=True, as_tuple=True)
+    return [tag for (tag,) in rows]
+
+
+def _problem_filter(difficulty, tags):
+    """难度与标签筛选条件 (difficulty 为 "所有" 或 None 时不筛选)。"""
+    where_sql = " WHERE 1=1"
+    where_params = []
+
+    if difficulty and difficulty != "所有":
+        where_sql += " AND difficulty = ?"
+        where_params.append(difficulty)
+
+    if tags:
+        # 题目的任何标签在 tags 中即命中
+        where_sql += f" AND id IN (SELECT problem_id FROM problem_tags WHERE tag IN ({','.join('?' * len(tags))}))"
+        where_params.extend(tags)
+    return where_sql, where_params
+
+
+def get_problem_page(difficulty, tags, page_size, after_id=None):
+    """
+    题目列表按 id 倒序分页，只取卡片需要的列 (不读 description / solution_code 等大字段)。
+    after_id 为 None 时返回第一页，否则返回 id < after_id 的下一页 (“加载更多” 传入已显示的最后一条的 id)。
+    多取一行判断之后是否还有，返回 (题目列表, 之后是否还有更多题目)。
+    """
+    where_sql, where_params = _problem_filter(difficulty, tags)
+    if after_id is not None:
+        where_sql += " AND id < ?"
+        where_params.append(after_id)
+    rows = run_query(
+        f"SELECT id, title, difficulty, tags, created_at, rev FROM problems{where_sql} ORDER BY id DESC LIMIT ?",
+        where_params + [page_size + 1], fetch=True)
+    return rows[:page_size], len(rows) > page_size
+
+
+def get_problem(problem_id):
+    rows = run_query("SELECT * FROM problems WHERE id=?", (problem_id,), fetch=True)
+    return expand_blobs("problems", rows[0]) if rows else None
+
+
+# --- 📅 日历行程 ---
+def iter_calendar_logs(window_start, window_end):
+    """
+    逐行产出 [window_start, window_end) 内的打卡记录 (走 logs.log_date 索引)。
+    每行是 (log_date, title, pid, difficulty) 的 tuple，调用方边读边生成日历事件，不会先把整个窗口读进内存。
+    """
+    return run_query("""
+        SELECT logs.log_date, problems.title, problems.id, problems.difficulty
+        FROM logs
+        JOIN problems ON logs.problem_id = problems.id
+        WHERE logs.log_date >= ? AND logs.log_date < ?
+        ORDER BY logs.log_date DESC
+    """, (window_start.isoformat(), window_end.isoformat()), fetch=True, stream=True, as_tuple=True)
+
+
+# --- 🧠 今日复习 ---
+def get_due_reviews(day, limit):
+    """review_due <= day 的题目，最早到期的在前 (走 review_due 的部分索引，一次范围扫描)。"""
+    return run_query("""
+        SELECT id, title, difficulty, review_due, review_interval, review_reps FROM problems
+        WHERE review_due <= ? ORDER BY review_due, id LIMIT ?
+    """, (day.isoformat(), limit), fetch=True)
+
+
+def count_due_reviews(day, days_ahead=7):
+    """(day 当天及之前到期的题数, 之后 days_ahead 天内到期的题数)。"""
+    end = (day + datetime.timedelta(days=days_ahead)).isoformat()
+    rows = run_query("SELECT SUM(review_due <= ?) AS due, SUM(review_due > ?) AS upcoming FROM problems "
+                     "WHERE review_due <= ?", (day.isoformat(), day.isoformat(), end), fetch=True)
+    return rows[0]['due'] or 0, rows[0]['upcoming'] or 0
+
+
+# --- 📦 资源库 ---
+def get_resources():
+    return run_query("SELECT * FROM resources ORDER BY id DESC", fetch=True)
+
+
+# --- 📓 笔记本 ---
+def get_notebooks():
+    return run_query("SELECT * FROM notebooks ORDER BY created_at DESC", fetch=True)
+
+
+def get_notebook(notebook_id):
+    rows = run_query("SELECT * FROM notebooks WHERE id=?", (notebook_id,), fetch=True)
+    return rows[0] if rows else None
+
+
+def get_notebook_toc(notebook_id):
+    """侧边栏的笔记目录：只取 id 和标题。"""
+    return run_query("SELECT id, title FROM notes WHERE notebook_id=? ORDER BY created_at DESC",
+                     (notebook_id,), fetch=True)
+
+
+def get_latest_note_id(notebook_id):
+    """笔记本中最近更新的笔记 id，没有笔记时返回 None。"""
+    rows = run_query("SELECT id FROM notes WHERE notebook_id=? ORDER BY updated_at DESC LIMIT 1",
+                     (notebook_id,), fetch=True)
+    return rows[0]['id'] if rows else None
+
+
+def get_note(note_id, notebook_id):
+    rows = run_query("SELECT * FROM notes WHERE id=? AND notebook_id=?", (note_id, notebook_id), fetch=True)
+    return expand_blobs("notes", rows[0]) if rows else None
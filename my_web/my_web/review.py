@@ -0,0 +1,153 @@
+import argparse
+import datetime
+from collections import namedtuple
+
+from db import get_writer, run_query
+
+# ==========================================
+# 间隔复习 (SM-2)：根据打卡记录安排每道题的下次复习日期
+# ==========================================
+# 每次打卡带一个回忆质量 (0~5)，按 SM-2 算法从题目当前的复习状态算出下一次的状态，和打卡记录在同一个事务里写入。
+# 状态存在 problems 的 review_* 列 (迁移版本 9)，review_due 上有索引，“今日复习” 只需要一次索引范围扫描。
+# 补打以前日期的卡时按这道题的全部打卡记录重新计算。导入打卡记录后用 rebuild() 全部重算 (transfer.py 会自动调用)。
+# 这个模块不依赖 streamlit，题目详情页和 “今日复习” 页面 (views/review_view.py) 调用它。
+#
+# 用法 (在 my_web/my_web 目录下)：
+#   python review.py rebuild
+
+# 回忆质量：0~2 没想出来 (从头开始)，3~5 做出来了 (间隔变长)
+QUALITY_LABELS = {
+    1: "😵 没做出来",
+    3: "😓 很吃力",
+    4: "🙂 有点犹豫",
+    5: "😎 轻松",
+}
+DEFAULT_QUALITY = 4  # 没有记录质量的旧打卡记录
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+ReviewState = namedtuple("ReviewState", ["ease", "interval", "reps", "due", "last"])
+NEW_STATE = ReviewState(INITIAL_EASE, 0, 0, None, None)
+
+
+def _as_date(value):
+    return value if isinstance(value, datetime.date) else datetime.date.fromisoformat(str(value)[:10])
+
+
+def sm2_step(state, quality, review_date):
+    """按 SM-2 从 state 和这次的回忆质量算出下一个状态。同一天重复打卡且做出来了时不再拉长间隔。"""
+    review_date = _as_date(review_date)
+    quality = DEFAULT_QUALITY if quality is None else quality
+    if quality >= 3 and state.last is not None and _as_date(state.last) == review_date:
+        return state
+    if quality < 3:
+        reps, interval = 0, 1
+    else:
+        reps = state.reps + 1
+        interval = 1 if reps == 1 else 6 if reps == 2 else round(state.interval * state.ease)
+    ease = max(MIN_EASE, state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return ReviewState(round(ease, 3), interval, reps, (review_date + datetime.timedelta(days=interval)).isoformat(),
+                       review_date.isoformat())
+
+
+def replay(history):
+    """从头按打卡记录 [(log_date, quality), ...] (按日期排好序) 算出最终状态。"""
+    state = NEW_STATE
+    for log_date, quality in history:
+        if log_date:
+            state = sm2_step(state, quality, log_date)
+    return state
+
+
+def _state(problem_id):
+    rows = run_query("SELECT review_ease, review_interval, review_reps, review_due, review_last FROM problems "
+                     "WHERE id=?", (problem_id,), fetch=True, cache=False, as_tuple=True)
+    if not rows:
+        raise ValueError(f"题目 {problem_id} 不存在")
+    ease, interval, reps, due, last = rows[0]
+    return ReviewState(INITIAL_EASE if ease is None else ease, interval or 0, reps or 0, due, last)
+
+
+_UPDATE_STATE = ("UPDATE problems SET review_ease=?, review_interval=?, review_reps=?, review_due=?, review_last=? "
+                 "WHERE id=?")
+
+
+def check_in(problem_id, log_date, quality, status="已完成", runtime_ms=None):
+    """
+    打卡并更新复习计划：插入打卡记录和更新题目的复习状态在同一个事务里完成。返回新的 ReviewState。
+    复习状态在读取之后被另一次打卡改过时 (两个会话同时打卡) 重新读取再算。
+    runtime_ms 是这次运行测试用例的总用时 (见 runner.py)，记在打卡记录上。
+    """
+    log_date = _as_date(log_date)
+    for _ in range(3):
+        state = _state(problem_id)
+        if state.last is not None and log_date < _as_date(state.last):
+            # 补打以前的卡：按全部打卡记录重新计算
+            history = run_query("SELECT log_date, quality FROM logs WHERE problem_id=? ORDER BY log_date, id",
+                                (problem_id,), fetch=True, cache=False, as_tuple=True)
+            new_state = replay(sorted(history + [(log_date.isoformat(), quality)], key=lambda h: str(h[0])))
+        else:
+            new_state = sm2_step(state, quality, log_date)
+        # 复习状态仍是读到的那个时才更新；打卡记录只在更新成功时插入
+        results = get_writer().submit_all([
+            (_UPDATE_STATE + " AND review_due IS ? AND review_last IS ?", (*new_state, problem_id, state.due, state.last)),
+            ("INSERT INTO logs (problem_id, log_date, status, quality, runtime_ms) SELECT ?, ?, ?, ?, ? "
+             "WHERE changes() > 0", (problem_id, log_date.isoformat(), status, quality, runtime_ms)),
+        ]).result()
+        if results[1].rowcount:
+            return new_state
+    raise RuntimeError(f"题目 {problem_id} 的复习状态一直在变化，打卡没有写入")
+
+
+def schedule_updates(rows):
+    """
+    rows 是按 (problem_id, log_date, id) 排好序的 (problem_id, log_date, quality)，
+    逐道题产出 _UPDATE_STATE 的参数 (复习状态..., problem_id)。一次只保留一道题的打卡记录。
+    """
+    current, history = None, []
+    for problem_id, log_date, quality in rows:
+        if problem_id != current:
+            if history:
+                yield (*replay(history), current)
+            current, history = problem_id, []
+        history.append((log_date, quality))
+    if history:
+        yield (*replay(history), current)
+
+
+_HISTORY = ("SELECT problem_id, log_date, quality FROM logs WHERE problem_id IS NOT NULL "
+            "ORDER BY problem_id, log_date, id")
+_RESET_WITHOUT_LOGS = ("UPDATE problems SET review_ease=NULL, review_interval=NULL, review_reps=NULL, "
+                       "review_due=NULL, review_last=NULL WHERE review_last IS NOT NULL "
+                       "AND id NOT IN (SELECT problem_id FROM logs WHERE problem_id IS NOT NULL)")
+
+
+def rebuild():
+    """按全部打卡记录重算所有题目的复习状态 (导入打卡记录之后调用)，返回有打卡记录的题目数。"""
+    rows = run_query(_HISTORY, fetch=True, stream=True, as_tuple=True)
+    try:
+        updates = list(schedule_updates(rows))
+    finally:
+        rows.close()
+    writer = get_writer()
+    writer.submit(_UPDATE_STATE, updates, many=True).result()
+    writer.submit(_RESET_WITHOUT_LOGS).result()
+    return len(updates)
+
+
+def main(argv=None):
+    import db
+
+    parser = argparse.ArgumentParser(description="间隔复习计划")
+    parser.add_argument("action", choices=["rebuild"])
+    parser.add_argument("--db", help="数据库文件 (默认 my_notion.db)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db.DB_FILE = args.db
+    db.init_db()
+    print(f"已重算 {rebuild()} 道题的复习计划")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import datetime
+import difflib
+import hashlib
+import json
+import zlib
+
+import blobs
+from db import get_writer, run_query
+
+# ==========================================
+# 笔记的自动保存与历史版本
+# ==========================================
+# 保存前先比较内容哈希 (notes.content_hash)：内容没变就不写数据库。内容变了才更新 notes，
+# 同时在 note_revisions 里追加一版：每 KEYFRAME_EVERY 版存一份完整内容 (关键帧)，其余只存相对上一版按行的差异，
+# 长笔记改几行只多存几行。读取某一版时从它之前最近的关键帧开始依次应用差异。
+# 这个模块不依赖 streamlit，笔记编辑页 (views/notebooks.py) 调用它。
+
+KEYFRAME_EVERY = 20
+
+
+class NoteConflict(Exception):
+    """保存时发现笔记在读取之后已被其他地方修改；这次什么都没有写入，重新读取后再保存即可。"""
+
+
+def content_hash(text):
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(data):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def make_delta(old, new):
+    """
+    old -> new 按行的差异：正数 n 表示照抄旧内容的 n 行，负数 -n 表示跳过旧内容的 n 行，
+    字符串列表表示插入这些新行。
+    """
+    old_lines, new_lines = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    delta = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old_lines, new_lines).get_opcodes():
+        if tag == "equal":
+            delta.append(i2 - i1)
+            continue
+        if tag in ("delete", "replace"):
+            delta.append(i1 - i2)
+        if tag in ("insert", "replace"):
+            delta.append(new_lines[j1:j2])
+    return delta
+
+
+def apply_delta(old, delta):
+    old_lines = old.splitlines(keepends=True)
+    lines = []
+    pos = 0
+    for op in delta:
+        if isinstance(op, list):
+            lines.extend(op)
+        elif op > 0:
+            lines.extend(old_lines[pos:pos + op])
+            pos += op
+        else:
+            pos -= op
+    return "".join(lines)
+
+
+def _revision_insert(note_id, rev, keyframe, data, title, content, digest, created_at):
+    """插入一版的语句；WHERE changes() > 0：只在前一条语句 (更新笔记 / 插入上一版) 确实写入了时才插入。"""
+    return ("INSERT INTO note_revisions (note_id, rev, keyframe, data, title, content_hash, size, created_at) "
+            "SELECT ?, ?, ?, ?, ?, ?, ?, ? WHERE changes() > 0",
+            (note_id, rev, int(keyframe), data, title, digest, len(content), created_at))
+
+
+def save_note(note_id, title, content, base):
+    """
+    保存笔记。base 是开始编辑时 (或上次保存成功时) 的笔记 (含 title / content / content_hash)，作为冲突检查的基准。
+    返回是否写入了数据库：标题和内容都没变时返回 False。
+    内容变了时追加一版历史；笔记在读取 base 之后被别处改过时抛出 NoteConflict。
+    """
+    digest = content_hash(content)
+    base_content = base['content'] or ""
+    base_digest = base['content_hash'] or content_hash(base_content)
+    if digest == base_digest:
+        if title == base['title']:
+            return False
+        run_query("UPDATE notes SET title=?, updated_at=? WHERE id=?", (title, datetime.date.today(), note_id))
+        return True
+
+    # 只在笔记仍是读到的那个版本时才更新；哈希还没算过的旧笔记直接比较内容 (或它在 text_blobs 里的引用)
+    statements = [("UPDATE notes SET title=?, content=?, content_hash=?, updated_at=? WHERE id=? "
+                   "AND (content_hash = ? OR (content_hash IS NULL AND (content IS ? OR content = ?)))",
+                   (title, content, digest, datetime.date.today(), note_id, base_digest, base['content'],
+                    blobs.ref(base_content)))]
+    last = run_query("SELECT rev, content_hash FROM note_revisions WHERE note_id=? "
+                     "ORDER BY rev DESC LIMIT 1", (note_id,), fetch=True, cache=False)
+    last_keyframe = run_query("SELECT MAX(rev) AS rev FROM note_revisions WHERE note_id=? AND keyframe=1",
+                              (note_id,), fetch=True, cache=False)[0]['rev']
+    rev = last[0]['rev'] if last else 0
+    created_at = datetime.datetime.now().isoformat(timespec="seconds")
+    if (last[0]['content_hash'] if last else content_hash("")) != base_digest:
+        # 历史的最后一版不是当前内容 (还没有历史的旧笔记，或者被导入等方式改过)：先把当前内容存成一个关键帧，
+        # 这样新的一版可以只存差异，之前的内容也不会丢
+        rev += 1
+        last_keyframe = rev
+        statements.append(_revision_insert(note_id, rev, True, _pack(base_content), base['title'], base_content,
+                                           base_digest, created_at))
+
+    rev += 1
+    full = _pack(content)
+    keyframe = last_keyframe is None or rev - last_keyframe >= KEYFRAME_EVERY
+    data = full
+    if not keyframe:
+        delta = _pack(make_delta(base_content, content))
+        if len(delta) < len(full):
+            data = delta
+        else:
+            keyframe = True  # 几乎整篇都改了，差异不比完整内容小
+    statements.append(_revision_insert(note_id, rev, keyframe, data, title, content, digest, created_at))
+
+    results = get_writer().submit_all(statements).result()
+    if results[0].rowcount == 0:
+        raise NoteConflict(f"笔记 {note_id} 已在其他地方修改")
+    return True
+
+
+def list_revisions(note_id):
+    """笔记的所有历史版本 (新的在前)，不含内容；bytes 是这一版压缩后占用的空间。"""
+    return run_query("SELECT rev, keyframe, title, size, LENGTH(data) AS bytes, created_at FROM note_revisions "
+                     "WHERE note_id=? ORDER BY rev DESC", (note_id,), fetch=True)
+
+
+def get_revision(note_id, rev):
+    """还原第 rev 版的内容 (从它之前最近的关键帧开始依次应用差异)。"""
+    rows = run_query("SELECT keyframe, data FROM note_revisions WHERE note_id=? AND rev <= ? AND rev >= "
+                     "(SELECT MAX(rev) FROM note_revisions WHERE note_id=? AND rev <= ? AND keyframe=1) "
+                     "ORDER BY rev", (note_id, rev, note_id, rev), fetch=True, cache=False, as_tuple=True)
+    content = None
+    for keyframe, data in rows:
+        value = _unpack(data)
+        content = value if keyframe else apply_delta(content, value)
+    return content
@@ -0,0 +1,322 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import blobs
+from db import init_db, run_query
+
+# ==========================================
+# 题解的本地测试：用保存的测试用例运行题目的 class Solution
+# ==========================================
+# 测试用例存在 problem_tests 表 (迁移版本 14)：args 是调用参数的 JSON 数组，expected 是期望返回值的 JSON。
+# 每次运行启动一个单独的 Python 子进程 (工作目录是临时目录，不继承环境变量)，子进程先给自己设上资源限制再执行题解：
+# - 内存上限 MEMORY_MB (RLIMIT_AS)，写文件的大小上限为 0 (RLIMIT_FSIZE)，CPU 时间上限按用例数计算 (RLIMIT_CPU)；
+# - 每个用例单独计时，超过 TIMEOUT 秒就中断这个用例，接着运行下一个；
+# - 父进程另有一个总的超时，子进程卡死 (例如在 C 代码里) 时直接结束它，没跑完的用例记为超时。
+# 用例的用时只算调用题解方法的时间，不含启动解释器。resource 模块只有 Linux / macOS 有，其他系统上只有超时限制。
+# 这只是防止题解跑飞 (死循环、内存爆掉) 的资源限制，不是安全沙箱：题解仍然可以读文件、联网、启动其他进程，
+# 所以只用来运行自己写的题解，不要运行来历不明的代码。
+# 批量运行时每道题一个子进程，由线程池同时运行 WORKERS 个 (子进程各占一个核)。
+# 打卡时运行一遍测试，全部通过时把总用时记到 logs.runtime_ms，题目详情页按打卡日期画出用时的变化。
+# 这个模块不依赖 streamlit。
+#
+# 用法 (在 my_web/my_web 目录下)：
+#   python runner.py 12            # 运行第 12 题的测试
+#   python runner.py --all         # 重新运行所有有测试用例的题解
+
+TIMEOUT = 2.0  # 每个用例的时间上限 (秒)
+MEMORY_MB = 256
+STARTUP_SECONDS = 5  # 父进程的总超时在用例时间之外多给的时间 (启动解释器、导入模块)
+OUTPUT_CHARS = 2000  # 返回值的 JSON 超过这个长度时截断 (只用来显示，比较在子进程外用完整的值)
+FLOAT_TOLERANCE = 1e-5  # 浮点数按相对/绝对误差比较，和 LeetCode 一样
+WORKERS = os.cpu_count() or 4
+
+STATUS_LABELS = {
+    "passed": "✅ 通过",
+    "failed": "❌ 答案错误",
+    "error": "💥 运行出错",
+    "timeout": "⏱️ 超时",
+    "memory": "🧠 内存超限",
+}
+
+CaseResult = namedtuple("CaseResult", ["test_id", "status", "output", "runtime_ms", "error"])
+# cases: [CaseResult]；runtime_ms：全部通过时的总用时，否则 None；error：题解本身无法运行时的错误信息
+RunResult = namedtuple("RunResult", ["problem_id", "cases", "runtime_ms", "error"])
+
+# 子进程执行的脚本：从 stdin 读入 {code, method, cases, timeout, limits}，每跑完一个用例往 stdout 输出一行 JSON。
+# 执行题解之前先把 stdout (文件描述符 1 和 sys.stdout) 换成 stderr，题解自己 print 的内容不会混进结果。
+# 没有指定 method 时按参数个数找要调用的方法：能接受测试用例参数个数的公开方法必须正好一个。
+# 题解按 LeetCode 的习惯可以不写 import 直接用 List、defaultdict、heapq 等，这里先导入好。
+_HARNESS = r'''
+import inspect, json, os, signal, sys, time
+job = json.loads(sys.stdin.read())
+results = os.fdopen(os.dup(1), "w", encoding="utf-8")
+os.dup2(2, 1)
+sys.stdout = sys.stderr
+try:
+    import resource
+    memory, cpu = job["limits"]
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+except (ImportError, ValueError, OSError):
+    pass
+
+class CaseTimeout(BaseException):
+    pass
+
+def on_alarm(signum, frame):
+    raise CaseTimeout()
+
+def emit(**result):
+    print(json.dumps(result, default=repr), file=results, flush=True)
+
+def jsonable(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    raise TypeError
+
+can_alarm = hasattr(signal, "setitimer")
+if can_alarm:
+    signal.signal(signal.SIGALRM, on_alarm)
+
+namespace = {"__name__": "solution"}
+exec("from typing import *\nimport bisect, collections, functools, heapq, itertools, math, re, string\n"
+     "from bisect import *\nfrom collections import *\nfrom functools import *\nfrom heapq import *\n"
+     "from itertools import *\nfrom math import *", namespace)
+try:
+    exec(compile(job["code"], "solution.py", "exec"), namespace)
+except BaseException as e:
+    emit(fatal=f"{type(e).__name__}: {e}")
+    sys.exit()
+solution_class = namespace.get("Solution")
+if not isinstance(solution_class, type):
+    emit(fatal="题解里没有 class Solution")
+    sys.exit()
+def accepts(name, counts):
+    value = vars(solution_class)[name]
+    prefix = () if isinstance(value, (staticmethod, classmethod)) else (None,)
+    try:
+        signature = inspect.signature(getattr(solution_class, name))
+    except (TypeError, ValueError):
+        return True
+    for count in counts:
+        try:
+            signature.bind(*prefix, *[None] * count)
+        except TypeError:
+            return False
+    return True
+
+method = job["method"]
+if not method:
+    public = [name for name, value in vars(solution_class).items()
+              if not name.startswith("_") and (callable(value) or isinstance(value, (staticmethod, classmethod)))]
+    counts = {len(args) for _, args in job["cases"]}
+    matches = [name for name in public if accepts(name, counts)]
+    arity = "、".join(map(str, sorted(counts)))
+    if not public:
+        emit(fatal="class Solution 里没有公开的方法")
+        sys.exit()
+    if not matches:
+        emit(fatal=f"class Solution 里没有能接受 {arity} 个参数的公开方法 (有：{'、'.join(public)})")
+        sys.exit()
+    if len(matches) > 1:
+        emit(fatal=f"class Solution 里有多个公开方法能接受 {arity} 个参数：{'、'.join(matches)}，"
+                   "无法确定要测试哪一个；把辅助方法改成以 _ 开头的名字")
+        sys.exit()
+    method = matches[0]
+elif not callable(getattr(solution_class, method, None)):
+    emit(fatal=f"class Solution 里没有方法 {method}")
+    sys.exit()
+
+for test_id, args in job["cases"]:
+    try:
+        function = getattr(solution_class(), method)
+        if can_alarm:
+            signal.setitimer(signal.ITIMER_REAL, job["timeout"])
+        started = time.perf_counter()
+        try:
+            value = function(*args)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            if can_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        emit(id=test_id, status="ok", output=json.dumps(value, default=jsonable), ms=elapsed)
+    except CaseTimeout:
+        emit(id=test_id, status="timeout", ms=job["timeout"] * 1000)
+    except MemoryError:
+        emit(id=test_id, status="memory")
+    except Exception as e:
+        emit(id=test_id, status="error", error=f"{type(e).__name__}: {e}")
+'''
+
+
+# --- 测试用例 ---
+def get_tests(problem_id):
+    return run_query("SELECT id, args, expected FROM problem_tests WHERE problem_id=? ORDER BY id", (problem_id,),
+                     fetch=True)
+
+
+def parse_case(args_text, expected_text):
+    """检查用户输入的参数和期望输出都是合法的 JSON，返回规范化后的 (args, expected) 文本；不合法时抛出 ValueError。"""
+    try:
+        args = json.loads(args_text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"参数不是合法的 JSON：{e}") from e
+    if not isinstance(args, list):
+        raise ValueError("参数要写成 JSON 数组，每个元素是一个参数，例如 [[2, 7, 11, 15], 9]")
+    try:
+        expected = json.loads(expected_text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"期望输出不是合法的 JSON：{e}") from e
+    return json.dumps(args, ensure_ascii=False), json.dumps(expected, ensure_ascii=False)
+
+
+def add_test(problem_id, args_text, expected_text):
+    args, expected = parse_case(args_text, expected_text)
+    run_query("INSERT INTO problem_tests (problem_id, args, expected, created_at) VALUES (?, ?, ?, ?)",
+              (problem_id, args, expected, datetime.date.today()))
+
+
+def delete_test(test_id):
+    run_query("DELETE FROM problem_tests WHERE id=?", (test_id,))
+
+
+# --- 运行 ---
+def same_value(actual, expected):
+    """返回值和期望输出是否相同：浮点数允许 FLOAT_TOLERANCE 的误差，元组和列表看作一样 (JSON 里都是数组)。"""
+    if isinstance(actual, float) or isinstance(expected, float):
+        return (isinstance(actual, (int, float)) and isinstance(expected, (int, float))
+                and not isinstance(actual, bool) and not isinstance(expected, bool)
+                and math.isclose(actual, expected, rel_tol=FLOAT_TOLERANCE, abs_tol=FLOAT_TOLERANCE))
+    if isinstance(actual, list) and isinstance(expected, list):
+        return len(actual) == len(expected) and all(map(same_value, actual, expected))
+    if isinstance(actual, dict) and isinstance(expected, dict):
+        return actual.keys() == expected.keys() and all(same_value(actual[k], expected[k]) for k in actual)
+    return type(actual) is type(expected) and actual == expected
+
+
+def _case_result(test, line):
+    if line["status"] != "ok":
+        return CaseResult(test['id'], line["status"], None, line.get("ms"), line.get("error"))
+    output = line["output"]
+    passed = same_value(json.loads(output), json.loads(test['expected']) if test['expected'] else None)
+    return CaseResult(test['id'], "passed" if passed else "failed", output[:OUTPUT_CHARS], line["ms"], None)
+
+
+def run_solution(code, tests, method=None, timeout=TIMEOUT, memory_mb=MEMORY_MB, problem_id=None):
+    """
+    在子进程里用 tests (含 id、args、expected 的行) 运行 code 里的 class Solution，返回 RunResult。
+    method 为 None 时按测试用例的参数个数找方法 (见 _HARNESS)，找不到或不止一个时返回带 error 的 RunResult。
+    """
+    if not tests:
+        return RunResult(problem_id, [], None, "没有测试用例")
+    if not (code or "").strip():
+        return RunResult(problem_id, [], None, "还没有写题解代码")
+    cpu_seconds = math.ceil(timeout * len(tests) + STARTUP_SECONDS)
+    job = json.dumps({
+        "code": code, "method": method, "timeout": timeout,
+        "cases": [[test['id'], json.loads(test['args'])] for test in tests],
+        "limits": [memory_mb * 1024 * 1024, cpu_seconds],
+    })
+    with tempfile.TemporaryDirectory(prefix="my-notion-run-") as workdir:
+        try:
+            process = subprocess.run([sys.executable, "-I", "-X", "utf8", "-c", _HARNESS], input=job.encode("utf-8"),
+                                     capture_output=True, cwd=workdir, env={}, timeout=cpu_seconds)
+            stdout, stderr, timed_out = process.stdout, process.stderr, False
+        except subprocess.TimeoutExpired as e:
+            stdout, stderr, timed_out = e.stdout or b"", e.stderr or b"", True
+
+    lines = {}
+    for raw in stdout.decode("utf-8", "replace").splitlines():
+        try:
+            line = json.loads(raw)
+        except json.JSONDecodeError:
+            continue  # 子进程写到一半被结束时的最后一行
+        if not isinstance(line, dict):
+            continue
+        if "fatal" in line:
+            return RunResult(problem_id, [], None, line["fatal"])
+        if "id" in line and "status" in line:
+            lines[line["id"]] = line
+
+    # 子进程中途退出 (超时被结束、超出 CPU 时间、内存不够导致解释器崩溃) 时，没跑完的用例
+    stderr_tail = stderr.decode("utf-8", "replace").strip().splitlines()[-1:] or [None]
+    unfinished = {"status": "timeout"} if timed_out else {"status": "error", "error": stderr_tail[0] or "子进程异常退出"}
+    cases = [_case_result(test, lines.get(test['id'], unfinished)) for test in tests]
+    passed = all(case.status == "passed" for case in cases)
+    return RunResult(problem_id, cases, round(sum(case.runtime_ms for case in cases), 3) if passed else None, None)
+
+
+def run_problem(problem_id, **kwargs):
+    """用题目保存的题解代码和测试用例运行一遍。"""
+    rows = run_query(f"SELECT {blobs.select_list('problems', ('solution_code',))} FROM problems WHERE id=?",
+                     (problem_id,), fetch=True, cache=False)
+    if not rows:
+        return RunResult(problem_id, [], None, "找不到这道题")
+    return run_solution(rows[0]['solution_code'], get_tests(problem_id), problem_id=problem_id, **kwargs)
+
+
+def run_all(problem_ids=None, workers=WORKERS, progress=None, **kwargs):
+    """
+    并行运行多道题的测试 (默认所有有测试用例的题)，返回 {problem_id: RunResult}。
+    progress(已完成的题数, 总题数) 每跑完一道题调用一次。
+    """
+    if problem_ids is None:
+        problem_ids = [row[0] for row in run_query("SELECT DISTINCT problem_id FROM problem_tests ORDER BY problem_id",
+                                                   fetch=True, cache=False, as_tuple=True)]
+    results = {}
+    with ThreadPoolExecutor(max(1, workers)) as pool:
+        futures = [pool.submit(run_problem, problem_id, **kwargs) for problem_id in problem_ids]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result.problem_id] = result
+            if progress:
+                progress(len(results), len(problem_ids))
+    return results
+
+
+def summary(result):
+    """一次运行结果的简短说明，例如 “3/4 通过”。"""
+    if result.error:
+        return result.error
+    passed = sum(case.status == "passed" for case in result.cases)
+    text = f"{passed}/{len(result.cases)} 通过"
+    return f"{text}，用时 {result.runtime_ms:.1f} ms" if result.runtime_ms is not None else text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用保存的测试用例运行题解")
+    parser.add_argument("problem_ids", nargs="*", type=int)
+    parser.add_argument("--all", action="store_true", help="运行所有有测试用例的题")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="每个用例的时间上限 (秒)")
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_MB)
+    args = parser.parse_args(argv)
+    if not args.all and not args.problem_ids:
+        parser.error("需要指定题目 id，或者 --all")
+
+    init_db()
+    results = run_all(None if args.all else args.problem_ids, args.workers, timeout=args.timeout,
+                      memory_mb=args.memory_mb)
+    failed = 0
+    for problem_id in sorted(results):
+        result = results[problem_id]
+        failed += result.runtime_ms is None
+        print(f"#{problem_id}: {summary(result)}")
+        for case in result.cases:
+            if case.status != "passed":
+                print(f"    用例 {case.test_id}: {STATUS_LABELS[case.status]} {case.error or case.output or ''}")
+    print(f"共 {len(results)} 道题，{len(results) - failed} 道全部通过")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import html
+import json
+import re
+
+import blobs
+from db import CJK_CHARS, FTS_SEPARATOR, fts_text, get_writer, run_query
+
+# ==========================================
+# 全文搜索 (基于 migrations.py 建立的 search_index FTS5 表)
+# ==========================================
+# 题目和笔记的增删改由触发器记进 search_pending，搜索之前 sync_index() 把它们分词后写进索引。
+# snippet() 的高亮标记先用私有区字符占位，转义 HTML 之后再换成 <mark>
+_MARK_OPEN, _MARK_CLOSE = '\ue000', '\ue001'
+_HAS_CJK = re.compile(f'[{CJK_CHARS}]')
+
+KIND_PROBLEM = "problem"
+KIND_NOTE = "note"
+
+# 关键词非常常见时 (命中几万行)，只对最新的 RANK_WINDOW 条命中计算 bm25，
+# 否则排序本身就要几百毫秒；命中数少于这个值时对全部结果排序。
+RANK_WINDOW = 1000
+
+# sync_index 每批处理的文档数
+SYNC_BATCH = 500
+
+_SOURCES = (
+    # (rowid 的余数, 表, 正文列)
+    (0, "problems", ("description", "notes", "solution_code")),
+    (1, "notes", ("content",)),
+)
+
+
+def _documents(pending):
+    """读出排队文档的标题和正文 (列里是 text_blobs 引用时取回全文)：{rowid: (title, body)}，已删除的行不在结果里。"""
+    documents = {}
+    for remainder, table, columns in _SOURCES:
+        ids = [rowid // 2 for rowid in pending if rowid % 2 == remainder]
+        if not ids:
+            continue
+        rows = run_query(f"SELECT id, title, {blobs.select_list(table, columns)} FROM {table} "
+                         f"WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(ids),), fetch=True, cache=False)
+        for r in rows:
+            body = "\n".join(r[c] or "" for c in columns)
+            documents[r['id'] * 2 + remainder] = (fts_text(r['title'] or ""), fts_text(body))
+    return documents
+
+
+def sync_index():
+    """
+    把 search_pending 里排队的题目 / 笔记写进全文索引，返回处理的文档数。
+    每批在写入队列里作为一个操作执行；只删除 version 没变的排队记录，
+    读取之后又被修改的文档留在队列里，下一轮再处理。
+    """
+    done = 0
+    while True:
+        pending = run_query("SELECT id, version FROM search_pending ORDER BY id LIMIT ?", (SYNC_BATCH,),
+                            fetch=True, cache=False, as_tuple=True)
+        if not pending:
+            return done
+        documents = _documents([rowid for rowid, _ in pending])
+        statements = []
+        for rowid, version in pending:
+            statements.append(("DELETE FROM search_index WHERE rowid = ?", (rowid,)))
+            if rowid in documents:
+                statements.append(("INSERT INTO search_index (rowid, title, body) VALUES (?, ?, ?)",
+                                   (rowid, *documents[rowid])))
+            statements.append(("DELETE FROM search_pending WHERE id = ? AND version = ?", (rowid, version)))
+        get_writer().submit_all(statements).result()
+        done += len(pending)
+
+
+def build_match_query(text):
+    """
+    把用户输入转换成安全的 FTS5 MATCH 表达式 (各关键词之间为 AND)。
+    - 含汉字的词作为短语匹配 (每个字相邻出现)。
+    - 英文/数字词按前缀匹配，例如 "tw" 可以命中 "two_sum"。
+    返回 None 表示没有可搜索的内容。
+    """
+    terms = []
+    for word in text.split():
+        word = word.replace('"', '""')  # 引号内的双引号需要转义
+        if _HAS_CJK.search(word):
+            terms.append(f'"{fts_text(word)}"')
+        else:
+            terms.append(f'"{word}"*')
+    return " ".join(terms) or None
+
+
+def _highlight(fragment):
+    """去掉分词用的零宽空格，转义 HTML，并把命中的部分包进 <mark>。"""
+    fragment = html.escape((fragment or "").replace(FTS_SEPARATOR, ""))
+    return fragment.replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+def search(text, kind=None, limit=20):
+    """
+    搜索题目和笔记，按 bm25 相关度排序 (标题权重更高)。
+    kind: None 表示全部，或 KIND_PROBLEM / KIND_NOTE。
+    返回 list of dict：kind, id, notebook_id (仅笔记), title_html, snippet_html。
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+    sync_index()
+
+    # 先找出最新的 RANK_WINDOW 条命中的 rowid 下界 (只走倒排列表，不计算相关度)
+    floor = run_query("SELECT rowid FROM search_index WHERE search_index MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+                      (match, RANK_WINDOW - 1), fetch=True)
+
+    query = """
+        SELECT rowid,
+               snippet(search_index, 0, ?, ?, '…', 24) AS title_hl,
+               snippet(search_index, 1, ?, ?, '…', 24) AS body_hl
+        FROM search_index WHERE search_index MATCH ?
+    """
+    params = [_MARK_OPEN, _MARK_CLOSE, _MARK_OPEN, _MARK_CLOSE, match]
+    if floor:
+        query += " AND rowid >= ?"
+        params.append(floor[0]['rowid'])
+    if kind == KIND_PROBLEM:
+        query += " AND rowid % 2 = 0"
+    elif kind == KIND_NOTE:
+        query += " AND rowid % 2 = 1"
+    query += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+    rows = run_query(query, params, fetch=True)
+
+    # 笔记跳转需要所属笔记本，用一次 IN 查询补齐
+    note_ids = [r['rowid'] // 2 for r in rows if r['rowid'] % 2 == 1]
+    notebook_of = {}
+    if note_ids:
+        notebook_of = {n['id']: n['notebook_id'] for n in run_query(
+            f"SELECT id, notebook_id FROM notes WHERE id IN ({','.join('?' * len(note_ids))})", note_ids, fetch=True)}
+
+    results = []
+    for r in rows:
+        item_id, is_note = divmod(r['rowid'], 2)
+        results.append({
+            "kind": KIND_NOTE if is_note else KIND_PROBLEM,
+            "id": item_id,
+            "notebook_id": notebook_of.get(item_id) if is_note else None,
+            "title_html": _highlight(r['title_hl']),
+            "snippet_html": _highlight(r['body_hl']),
+        })
+    return results
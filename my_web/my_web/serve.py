@@ -0,0 +1,38 @@
+import os
+
+import streamlit as st
+from starlette.middleware import Middleware
+
+import assets
+
+# ==========================================
+# 带缓存头的启动方式：streamlit run serve.py
+# ==========================================
+# 和 streamlit run app.py 是同一个应用，只是在外面包一层 ASGI 中间件：
+# app/static/ 下文件名带内容哈希的样式表和字体 (见 assets.py) 返回一年的 Cache-Control: immutable，
+# 浏览器之后直接用缓存，不再发请求确认是否过期。Streamlit 自带的静态文件服务不设置这个头。
+
+CACHE_CONTROL = b"public, max-age=31536000, immutable"
+
+
+class ImmutableStaticAssets:
+    """给带内容哈希的静态文件加上长期缓存头，其余请求原样转发。"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "/app/static/" not in scope["path"] or not assets.is_hashed(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache_control(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"cache-control"]
+                message = {**message, "headers": headers + [(b"cache-control", CACHE_CONTROL)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
+
+
+app = st.App(os.path.join(assets.APP_DIR, "app.py"), middleware=[Middleware(ImmutableStaticAssets)])
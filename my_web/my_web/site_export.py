@@ -0,0 +1,360 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import shutil
+import sqlite3
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import assets
+import blobs
+import db
+import linkcheck
+from migrations import migrate
+
+# ==========================================
+# 静态站点导出：把题目、笔记本、笔记、资源生成为 HTML 页面
+# ==========================================
+# 生成到 OUT_DIR (默认 site/)，样式是 assets/site.css (Notion 风格，和仓库里手写的那些 .html 页面一致)。增量生成：
+# - 每个页面有一个版本：详情页是这一行的 rev (迁移版本 12、13，行被修改时由触发器加 1)，
+#   列表页是页面上各行 (id, rev) 的签名。上次生成时各页面的版本记在 OUT_DIR/manifest.json，版本没变的页面跳过。
+# - 列表页按 id 分段 (每段 BUCKET 个 id)，新增、删除一行只影响它所在的那一段和分段目录。
+# - 数据库里已经删除的行，对应的页面也一并删除。
+# - 需要生成的页面每 BATCH 个一批，交给多个进程并行生成 (每个进程只读打开数据库)。
+# 改了页面模板时增加 TEMPLATE_VERSION；样式文件变了也会全部重新生成。这个模块不依赖 streamlit。
+#
+# 用法 (在 my_web/my_web 目录下)：
+#   python site_export.py                          # 增量生成到 site/
+#   python site_export.py --full                   # 全部重新生成
+#   python site_export.py --out /tmp/site --workers 4
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+OUT_DIR = os.path.join(APP_DIR, "site")
+MANIFEST = "manifest.json"
+TEMPLATE_VERSION = 1
+BUCKET = 500  # 列表页每段的 id 个数
+BATCH = 500  # 每个任务生成的页面数
+WORKERS = os.cpu_count() or 4
+
+
+# --- 页面版本 (主进程) ---
+def _signature(items):
+    return hashlib.blake2b(repr(items).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _bucketed(rows, kind, pages):
+    """rows 是按 id 排好序的 (id, rev)：每段一个列表页，再加一个分段目录。"""
+    buckets = defaultdict(list)
+    for row_id, rev in rows:
+        buckets[row_id // BUCKET].append((row_id, rev))
+    for bucket, items in buckets.items():
+        pages[f"{kind}/page-{bucket}.html"] = (_signature(items), f"{kind}_page", bucket)
+    pages[f"{kind}/index.html"] = (_signature(sorted((b, len(items)) for b, items in buckets.items())),
+                                   f"{kind}_index", None)
+
+
+def site_pages(conn):
+    """当前数据库应该生成的全部页面：{相对路径: (版本, 页面种类, 参数)}。"""
+    pages = {}
+    problems = conn.execute("SELECT id, rev FROM problems ORDER BY id").fetchall()
+    for problem_id, rev in problems:
+        pages[f"problems/{problem_id}.html"] = (str(rev), "problem", problem_id)
+    _bucketed(problems, "problems", pages)
+
+    resources = conn.execute("SELECT id, rev FROM resources ORDER BY id").fetchall()
+    _bucketed(resources, "resources", pages)
+
+    # 笔记本页上有各篇笔记的标题，所以带上笔记的 rev；笔记页不显示笔记本的名字，改名不用重新生成它的所有笔记
+    notebooks = {nb_id: (rev, []) for nb_id, rev in conn.execute("SELECT id, rev FROM notebooks ORDER BY id")}
+    notes = conn.execute("SELECT id, rev, notebook_id FROM notes ORDER BY id").fetchall()
+    for note_id, rev, notebook_id in notes:
+        if notebook_id in notebooks:
+            notebooks[notebook_id][1].append((note_id, rev))
+            pages[f"notes/{note_id}.html"] = (str(rev), "note", note_id)
+    for nb_id, (rev, items) in notebooks.items():
+        pages[f"notebooks/{nb_id}.html"] = (_signature((rev, items)), "notebook", nb_id)
+    pages["notebooks/index.html"] = (
+        _signature([(nb_id, rev, len(items)) for nb_id, (rev, items) in notebooks.items()]), "notebook_index", None)
+
+    counts = (len(problems), len(resources), len(notebooks), len(notes))
+    pages["index.html"] = (_signature(counts), "home", counts)
+    return pages
+
+
+# --- 页面模板 (工作进程) ---
+_worker = {}  # 每个工作进程一份：只读连接、输出目录、样式文件名
+
+
+def _init_worker(db_file, out_dir, stylesheet):
+    conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    blobs.register(conn)  # resolved() 读 text_blobs 里的大文本要用到
+    _worker.update(conn=conn, out_dir=out_dir, stylesheet=stylesheet)
+
+
+def _e(value):
+    return html.escape("" if value is None else str(value))
+
+
+def _tags(tags_json):
+    try:
+        tags = json.loads(tags_json) if tags_json else []
+    except (json.JSONDecodeError, TypeError):
+        tags = []
+    return "".join(f"<span class='tag tag-custom'>{_e(tag)}</span>" for tag in tags)
+
+
+def _difficulty(difficulty):
+    return f"<span class='tag tag-{_e(difficulty)}'>{_e(difficulty)}</span>"
+
+
+def _page(path, title, body, crumbs=()):
+    """一个完整的页面；crumbs 是面包屑导航 [(标题, 相对站点根目录的地址)]。"""
+    root = "../" * path.count("/")
+    nav = f"<a href='{root}index.html'>🏠 首页</a>" + "".join(
+        f"<span class='sep'>/</span><a href='{root}{href}'>{_e(label)}</a>" for label, href in crumbs)
+    return (f"<!DOCTYPE html>\n<html lang='zh-CN'>\n<head>\n<meta charset='UTF-8'>\n"
+            f"<meta name='viewport' content='width=device-width, initial-scale=1.0'>\n<title>{_e(title)}</title>\n"
+            f"<link rel='stylesheet' href='{root}{_worker['stylesheet']}'>\n</head>\n<body>\n"
+            f"<div class='navbar'>{nav}</div>\n<div class='container'>\n<h1>{_e(title)}</h1>\n{body}\n</div>\n"
+            f"</body>\n</html>\n")
+
+
+def _write(path, content):
+    full_path = os.path.join(_worker['out_dir'], path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    tmp_path = f"{full_path}.tmp{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, full_path)
+    return len(content)
+
+
+def _rows(query, ids):
+    return _worker['conn'].execute(query.format(ids=",".join("?" * len(ids))), list(ids)).fetchall()
+
+
+def _render_problems(ids):
+    size = 0
+    for p in _rows(f"SELECT id, title, difficulty, tags, link, created_at, "
+                   f"{blobs.select_list('problems', ('description', 'notes', 'solution_code'))} "
+                   f"FROM problems WHERE id IN ({{ids}})", ids):
+        body = f"<div class='meta'>{_difficulty(p['difficulty'])}{_tags(p['tags'])} 📅 创建于 {_e(p['created_at'])}</div>"
+        if p['link']:
+            body += f"<p>🔗 <a href='{_e(p['link'])}'>{_e(p['link'])}</a></p>"
+        for heading, column in (("📄 题目描述", "description"), ("💡 思考与笔记", "notes")):
+            if p[column]:
+                body += f"<h2>{heading}</h2>\n<div class='text'>{_e(p[column])}</div>"
+        if p['solution_code']:
+            body += f"<h2>💻 代码解答</h2>\n<pre><code>{_e(p['solution_code'])}</code></pre>"
+        path = f"problems/{p['id']}.html"
+        size += _write(path, _page(path, p['title'], body, [("💻 题目", "problems/index.html")]))
+    return size
+
+
+def _render_notes(ids):
+    size = 0
+    for n in _rows(f"SELECT id, title, updated_at, notebook_id, {blobs.resolved('content')} AS content "
+                   f"FROM notes WHERE id IN ({{ids}})", ids):
+        body = (f"<div class='meta'>最后更新于 {_e(n['updated_at'])}</div>\n"
+                f"<div class='text'>{_e(n['content'])}</div>")
+        path = f"notes/{n['id']}.html"
+        size += _write(path, _page(path, n['title'], body, [
+            ("📓 笔记本", "notebooks/index.html"), ("📒 所在笔记本", f"notebooks/{n['notebook_id']}.html")]))
+    return size
+
+
+def _render_notebooks(ids):
+    size = 0
+    notes = defaultdict(list)
+    for n in _rows("SELECT id, title, updated_at, notebook_id FROM notes WHERE notebook_id IN ({ids}) "
+                   "ORDER BY created_at DESC", ids):
+        notes[n['notebook_id']].append(n)
+    for nb in _rows("SELECT id, name, created_at FROM notebooks WHERE id IN ({ids})", ids):
+        items = "".join(f"<li><a class='grow' href='../notes/{n['id']}.html'>{_e(n['title'])}</a>"
+                        f"<span class='meta'>{_e(n['updated_at'])}</span></li>" for n in notes[nb['id']])
+        body = (f"<div class='meta'>创建于 {_e(nb['created_at'])} · {len(notes[nb['id']])} 篇笔记</div>\n"
+                f"<ul class='list'>{items}</ul>")
+        path = f"notebooks/{nb['id']}.html"
+        size += _write(path, _page(path, nb['name'], body, [("📓 笔记本", "notebooks/index.html")]))
+    return size
+
+
+def _render_notebook_index(_):
+    notebooks = _worker['conn'].execute(
+        "SELECT notebooks.id, notebooks.name, notebooks.created_at, COUNT(notes.id) AS notes FROM notebooks "
+        "LEFT JOIN notes ON notes.notebook_id = notebooks.id GROUP BY notebooks.id ORDER BY notebooks.created_at DESC")
+    items = "".join(f"<div class='card'><a href='{nb['id']}.html'><b>{_e(nb['name'])}</b></a>"
+                    f"<div class='meta'>创建于 {_e(nb['created_at'])} · {nb['notes']} 篇笔记</div></div>"
+                    for nb in notebooks)
+    path = "notebooks/index.html"
+    return _write(path, _page(path, "📓 笔记本", f"<div class='grid'>{items}</div>"))
+
+
+def _bucket_rows(query, buckets):
+    for bucket in buckets:
+        yield bucket, _worker['conn'].execute(query, (bucket * BUCKET, (bucket + 1) * BUCKET)).fetchall()
+
+
+def _bucket_index(kind, title):
+    buckets = _worker['conn'].execute(f"SELECT id / {BUCKET} AS bucket, COUNT(*) AS n, MIN(id) AS first, "
+                                      f"MAX(id) AS last FROM {kind} GROUP BY bucket ORDER BY bucket DESC").fetchall()
+    items = "".join(f"<li><a class='grow' href='page-{b['bucket']}.html'>#{b['first']} ~ #{b['last']}</a>"
+                    f"<span class='meta'>{b['n']} 条</span></li>" for b in buckets)
+    total = sum(b['n'] for b in buckets)
+    path = f"{kind}/index.html"
+    return _write(path, _page(path, title, f"<div class='meta'>共 {total} 条，按编号分段，新的在前</div>\n"
+                                          f"<ul class='list'>{items}</ul>"))
+
+
+def _bucket_page(kind, title, bucket, body):
+    path = f"{kind}/page-{bucket}.html"
+    return _write(path, _page(path, f"{title} #{bucket * BUCKET} ~ #{(bucket + 1) * BUCKET - 1}", body,
+                              [(title, f"{kind}/index.html")]))
+
+
+def _render_problem_pages(buckets):
+    size = 0
+    for bucket, rows in _bucket_rows("SELECT id, title, difficulty, tags, created_at FROM problems "
+                                     "WHERE id >= ? AND id < ? ORDER BY id DESC", buckets):
+        items = "".join(f"<li><a class='grow' href='{p['id']}.html'>{_e(p['title'])}</a>{_difficulty(p['difficulty'])}"
+                        f"<span>{_tags(p['tags'])}</span><span class='meta'>{_e(p['created_at'])}</span></li>"
+                        for p in rows)
+        size += _bucket_page("problems", "💻 题目", bucket, f"<ul class='list'>{items}</ul>")
+    return size
+
+
+def _copy_thumb(thumb_path):
+    """资源的本地封面复制到站点的 thumbs/ 下 (按内容哈希命名，已有的不再复制)。"""
+    source = linkcheck.thumb_file(thumb_path)
+    if not source:
+        return None
+    target = os.path.join(_worker['out_dir'], "thumbs", thumb_path)
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+    return f"../thumbs/{thumb_path}"
+
+
+def _render_resource_pages(buckets):
+    size = 0
+    for bucket, rows in _bucket_rows("SELECT id, title, category, url, status, page_title, thumb_path FROM resources "
+                                     "WHERE id >= ? AND id < ? ORDER BY id DESC", buckets):
+        cards = []
+        for r in rows:
+            thumb = _copy_thumb(r['thumb_path'])
+            title = f"<a href='{_e(r['url'])}'><b>{_e(r['title'])}</b></a>" if r['url'] else f"<b>{_e(r['title'])}</b>"
+            image = f"<img src='{_e(thumb)}' alt=''>" if thumb else ""
+            cards.append(f"<div class='card'>{image}{title}"
+                         f"<div class='meta'>🏷️ {_e(r['category'])} · {_e(r['status'])}</div>"
+                         + (f"<div class='meta'>📄 {_e(r['page_title'])}</div>"
+                            if r['page_title'] and r['page_title'] != r['title'] else "") + "</div>")
+        size += _bucket_page("resources", "📦 资源", bucket, f"<div class='grid'>{''.join(cards)}</div>")
+    return size
+
+
+def _render_home(counts):
+    labels = [("💻 题目", "problems/index.html"), ("📦 资源", "resources/index.html"),
+              ("📓 笔记本", "notebooks/index.html"), ("📝 笔记", "notebooks/index.html")]
+    stats = "".join(f"<a class='stat' href='{href}'><b>{count}</b>{label}</a>"
+                    for (label, href), count in zip(labels, counts))
+    return _write("index.html", _page("index.html", "Lyn的个人空间", f"<div class='stats'>{stats}</div>"))
+
+
+RENDERERS = {
+    "problem": _render_problems,
+    "note": _render_notes,
+    "notebook": _render_notebooks,
+    "notebook_index": _render_notebook_index,
+    "problems_page": _render_problem_pages,
+    "problems_index": lambda _: _bucket_index("problems", "💻 题目"),
+    "resources_page": _render_resource_pages,
+    "resources_index": lambda _: _bucket_index("resources", "📦 资源"),
+    "home": lambda args: _render_home(args[0]),
+}
+
+
+def _render_batch(kind, args):
+    """工作进程里生成一批同种类的页面，返回写入的字符数。"""
+    return RENDERERS[kind](args)
+
+
+# --- 导出 ---
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def export(db_file=None, out_dir=OUT_DIR, workers=WORKERS, full=False):
+    """
+    把数据库增量生成为静态站点，返回 {"rendered": 生成的页面数, "removed": 删除的页面数, "bytes": 写入的字符数}。
+    manifest.json 在全部页面生成之后才写入，中途失败时下次会重新生成这些页面。
+    """
+    db_file = os.path.abspath(db_file or db.DB_FILE)
+    os.makedirs(out_dir, exist_ok=True)
+    stylesheet = assets.publish("site", assets.SOURCE_DIR, out_dir)
+    template = f"{TEMPLATE_VERSION}:{stylesheet}"
+
+    manifest = {} if full else _load_manifest(out_dir)
+    if manifest.get("template") != template:
+        manifest = {}
+    old_pages = manifest.get("pages", {})
+
+    with db.get_pool(db_file).connection() as conn:
+        pages = site_pages(conn)
+
+    # 要生成的页面按种类分组，每 BATCH 个一个任务
+    todo = defaultdict(list)
+    for path, (version, kind, args) in pages.items():
+        if old_pages.get(path) != version:
+            todo[kind].append(args)
+    tasks = [(kind, args[i:i + BATCH]) for kind, args in todo.items() for i in range(0, len(args), BATCH)]
+
+    written = 0
+    if len(tasks) <= 1 or workers <= 1:
+        _init_worker(db_file, out_dir, stylesheet)
+        written = sum(_render_batch(kind, args) for kind, args in tasks)
+    else:
+        with ProcessPoolExecutor(min(workers, len(tasks)), initializer=_init_worker,
+                                 initargs=(db_file, out_dir, stylesheet)) as pool:
+            written = sum(pool.map(_render_batch, *zip(*tasks)))
+
+    removed = [path for path in old_pages if path not in pages]
+    for path in removed:
+        try:
+            os.remove(os.path.join(out_dir, path))
+        except FileNotFoundError:
+            pass
+
+    manifest = {"template": template, "pages": {path: version for path, (version, _, _) in pages.items()}}
+    tmp_path = os.path.join(out_dir, f"{MANIFEST}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST))
+    return {"rendered": sum(len(args) for args in todo.values()), "removed": len(removed), "bytes": written}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把数据库增量生成为静态站点")
+    parser.add_argument("--db", default=db.DB_FILE)
+    parser.add_argument("--out", default=OUT_DIR)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--full", action="store_true", help="忽略 manifest.json，全部重新生成")
+    args = parser.parse_args(argv)
+
+    with db.get_pool(args.db).connection() as conn:
+        migrate(conn)  # 需要 rev 列 (迁移版本 12、13)
+    started = time.perf_counter()
+    result = export(args.db, args.out, args.workers, args.full)
+    print(f"生成 {result['rendered']} 个页面 ({result['bytes'] / 1024 / 1024:.1f} MB)，删除 {result['removed']} 个，"
+          f"用时 {time.perf_counter() - started:.1f} 秒，输出到 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
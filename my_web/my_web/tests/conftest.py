@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# ==========================================
+# 测试共用：把 my_web/my_web 加进导入路径，在临时数据库上运行
+# ==========================================
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import db  # noqa: E402
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """在空的临时数据库上执行全部迁移，db.DB_FILE 指向它；测试结束后关闭写入线程和连接。"""
+    path = str(tmp_path / "test.db")
+    monkeypatch.setattr(db, "DB_FILE", path)
+    db.init_db()
+    yield path
+    db.get_writer(path).close()
+    db.get_pool(path).close_all()
@@ -0,0 +1,87 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+import db
+from conftest import APP_DIR
+
+# ==========================================
+# run_query 的读缓存：命中、按表失效，以及 rerun 之间缓存保留
+# ==========================================
+
+COUNT = "SELECT COUNT(*) AS n FROM problems"
+
+
+def _add_problem(title="两数之和", tags='["数组"]'):
+    return db.run_query("INSERT INTO problems (title, difficulty, tags) VALUES (?, 'Easy', ?)",
+                        (title, tags), get_lastrowid=True)
+
+
+def test_second_read_is_a_hit(fresh_db):
+    cache = db.get_cache()
+    assert db.run_query(COUNT, fetch=True) == [{"n": 0}]
+    before = cache.stats()
+    assert db.run_query(COUNT, fetch=True) == [{"n": 0}]
+    after = cache.stats()
+    assert (after["hits"] - before["hits"], after["misses"] - before["misses"]) == (1, 0)
+
+
+def test_cache_false_skips_cache(fresh_db):
+    cache = db.get_cache()
+    db.run_query(COUNT, fetch=True)
+    before = cache.stats()
+    db.run_query(COUNT, fetch=True, cache=False)
+    assert cache.stats()["hits"] == before["hits"]
+
+
+def test_write_invalidates_table_and_dependents(fresh_db):
+    db.run_query(COUNT, fetch=True)
+    tag_query = "SELECT tag FROM problem_tags ORDER BY tag"
+    assert db.run_query(tag_query, fetch=True) == []
+    resources = db.run_query("SELECT COUNT(*) AS n FROM resources", fetch=True)
+
+    _add_problem()
+    assert db.run_query(COUNT, fetch=True) == [{"n": 1}]
+    # problem_tags 由 problems 上的触发器写入，写 problems 时一并失效
+    assert db.run_query(tag_query, fetch=True) == [{"tag": "数组"}]
+    # 无关的表保留缓存
+    before = db.get_cache().stats()["hits"]
+    assert db.run_query("SELECT COUNT(*) AS n FROM resources", fetch=True) == resources
+    assert db.get_cache().stats()["hits"] == before + 1
+
+
+def test_cascade_delete_invalidates_child(fresh_db):
+    problem_id = _add_problem()
+    db.run_query("INSERT INTO logs (problem_id, log_date, status) VALUES (?, '2024-01-01', '已完成')", (problem_id,))
+    logs = "SELECT COUNT(*) AS n FROM logs"
+    assert db.run_query(logs, fetch=True) == [{"n": 1}]
+    db.delete_by_ids("problems", [problem_id])
+    assert db.run_query(logs, fetch=True) == [{"n": 0}]
+
+
+def test_init_db_again_keeps_cache(fresh_db):
+    cache = db.get_cache()
+    db.run_query(COUNT, fetch=True)
+    generation = cache.generation(("problems",))
+    db.init_db()  # 表结构没变
+    assert cache.generation(("problems",)) == generation
+    before = cache.stats()["hits"]
+    db.run_query(COUNT, fetch=True)
+    assert cache.stats()["hits"] == before + 1
+
+
+def test_app_rerun_reads_from_cache(fresh_db):
+    _add_problem()
+    at = AppTest.from_file(os.path.join(APP_DIR, "app.py"), default_timeout=60)
+    at.run()
+    assert not at.exception
+    cache = db.get_cache()
+    generation = cache.generation(("problems", "logs", "stats"))
+    before = cache.stats()
+    at.run()
+    assert not at.exception
+    after = cache.stats()
+    # 第二次运行同一页面：表结构和数据都没变，读取全部命中缓存
+    assert cache.generation(("problems", "logs", "stats")) == generation
+    assert after["hits"] > before["hits"]
+    assert after["misses"] == before["misses"]
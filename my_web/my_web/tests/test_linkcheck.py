@@ -0,0 +1,149 @@
+import asyncio
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# ==========================================
+# linkcheck.Checker：对着本机的 http.server 检查链接、取标题、下载封面
+# ==========================================
+# 用标准库 urllib 的默认 fetcher 发真实的 HTTP 请求，只连 127.0.0.1，不需要外网。
+#
+# 用法 (在 my_web/my_web 目录下)：python -m pytest tests
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import linkcheck  # noqa: E402
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+PAGES = {
+    "/page": (200, "text/html; charset=utf-8",
+              "<html><head><title> Hello &amp;\n World </title>"
+              "<meta property='og:image' content='/cover.png'></head><body>正文</body></html>".encode("utf-8")),
+    "/gbk": (200, "text/html; charset=gbk", "<title>中文标题</title>".encode("gbk")),
+    "/cover.png": (200, "image/png", PNG),
+    "/not-image": (200, "text/plain", b"hello"),
+    "/missing": (404, "text/html", b"<title>Not Found</title>"),
+    "/boom": (500, "text/plain", b""),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/page")
+            self.end_headers()
+            return
+        status, content_type, body = PAGES.get(self.path.split("?")[0], (404, "text/plain", b""))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_proxy(monkeypatch):
+    # urllib 默认走环境变量里的代理，本机的请求要直连
+    for name in ("http_proxy", "https_proxy", "HTTP_PROXY", "HTTPS_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("no_proxy", "*")
+
+
+def _url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def _check(tmp_path, *resources):
+    async def run():
+        checker = linkcheck.Checker(limiter=linkcheck.HostLimiter(interval=0), thumb_dir=str(tmp_path))
+        return await asyncio.gather(*(checker.check(r) for r in resources))
+    return asyncio.run(run())
+
+
+def _resource(url, image_url=None):
+    return {"url": url, "image_url": image_url}
+
+
+def test_ok_page_title_and_og_image(server, tmp_path):
+    [(status, code, title, thumb)] = _check(tmp_path, _resource(_url(server, "/page")))
+    assert (status, code, title) == ("ok", 200, "Hello & World")
+    assert thumb == linkcheck.thumb_name(_url(server, "/cover.png"), "image/png")
+    with open(tmp_path / thumb, "rb") as f:
+        assert f.read() == PNG
+
+
+def test_title_uses_declared_charset(server, tmp_path):
+    [(status, _, title, thumb)] = _check(tmp_path, _resource(_url(server, "/gbk")))
+    assert (status, title, thumb) == ("ok", "中文标题", None)
+
+
+def test_redirect_resolves_og_image_against_final_url(server, tmp_path):
+    [(status, code, title, thumb)] = _check(tmp_path, _resource(_url(server, "/moved")))
+    assert (status, code, title) == ("ok", 200, "Hello & World")
+    assert thumb == linkcheck.thumb_name(_url(server, "/cover.png"), "image/png")
+
+
+@pytest.mark.parametrize("path, code", [("/missing", 404), ("/boom", 500)])
+def test_http_errors_are_broken(server, tmp_path, path, code):
+    [(status, http_status, title, thumb)] = _check(tmp_path, _resource(_url(server, path)))
+    assert (status, http_status, title, thumb) == ("broken", code, None, None)
+
+
+def test_unreachable_host_is_error(tmp_path):
+    # 占一个端口再关掉，连接会被拒绝
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    [(status, http_status, _, _)] = _check(tmp_path, _resource(f"http://127.0.0.1:{port}/"))
+    assert (status, http_status) == ("error", None)
+
+
+def test_non_http_url_is_invalid_without_request(server, tmp_path):
+    before = len(server.requests)
+    [(status, http_status, _, _)] = _check(tmp_path, _resource("ftp://127.0.0.1/file"))
+    assert (status, http_status) == ("invalid", None)
+    assert len(server.requests) == before
+
+
+def test_image_url_without_link(server, tmp_path):
+    [(status, _, _, thumb)] = _check(tmp_path, _resource(None, _url(server, "/cover.png")))
+    assert status is None
+    assert thumb == linkcheck.thumb_name(_url(server, "/cover.png"), "image/png")
+
+
+def test_non_image_cover_is_skipped(server, tmp_path):
+    [(_, _, _, thumb)] = _check(tmp_path, _resource(None, _url(server, "/not-image")))
+    assert thumb is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_shared_cover_downloaded_once(server, tmp_path):
+    image = _url(server, "/cover.png?shared")
+    before = server.requests.count("/cover.png?shared")
+    results = _check(tmp_path, *[_resource(None, image) for _ in range(5)])
+    assert {thumb for *_, thumb in results} == {linkcheck.thumb_name(image, "image/png")}
+    assert server.requests.count("/cover.png?shared") - before == 1
+    # 已经下载过的封面直接用本地文件
+    _check(tmp_path, _resource(None, image))
+    assert server.requests.count("/cover.png?shared") - before == 1
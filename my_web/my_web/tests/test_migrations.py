@@ -0,0 +1,117 @@
+import sqlite3
+
+import pytest
+
+import db
+import migrations
+
+# ==========================================
+# migrations.py：按 PRAGMA user_version 依次执行迁移，以及命令行的 --dry-run
+# ==========================================
+
+
+def _version(path):
+    with sqlite3.connect(path) as conn:
+        return migrations.current_version(conn)
+
+
+def _v1_db(path):
+    """只有版本 1 的基础表、带几行数据的旧库 (和 Lyn.studio.py 以前建的库一样)。"""
+    conn = sqlite3.connect(path)
+    migrations.migrate(conn, target=1)
+    conn.execute("INSERT INTO problems (title, difficulty, tags) VALUES ('两数之和', '简单', '[\"数组\", \"哈希表\"]')")
+    conn.execute("INSERT INTO logs (problem_id, log_date, status) VALUES (1, '2024-01-01', '已完成')")
+    conn.execute("INSERT INTO notebooks (name) VALUES ('算法')")
+    conn.execute("INSERT INTO notes (notebook_id, title, content) VALUES (1, '双指针', '左右两个指针')")
+    conn.commit()
+    conn.close()
+
+
+def test_versions_are_consecutive():
+    assert [number for number, _, _ in migrations.MIGRATIONS] == list(range(1, migrations.LATEST_VERSION + 1))
+
+
+def test_fresh_db_reaches_latest(tmp_path):
+    path = str(tmp_path / "new.db")
+    conn = sqlite3.connect(path)
+    applied = migrations.migrate(conn)
+    assert [number for number, _ in applied] == list(range(1, migrations.LATEST_VERSION + 1))
+    assert migrations.current_version(conn) == migrations.LATEST_VERSION
+    # 已是最新版本时什么都不做
+    assert migrations.migrate(conn) == []
+    conn.close()
+
+
+def test_target_stops_early(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "t.db"))
+    assert [number for number, _ in migrations.migrate(conn, target=3)] == [1, 2, 3]
+    assert migrations.current_version(conn) == 3
+    assert [number for number, _ in migrations.migrate(conn)][0] == 4
+    conn.close()
+
+
+def test_failed_step_rolls_back(tmp_path, monkeypatch):
+    conn = sqlite3.connect(str(tmp_path / "t.db"), isolation_level=None)
+    migrations.migrate(conn, target=1)
+
+    def broken(c):
+        c.execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:1] + [(2, "坏的迁移", broken)])
+    with pytest.raises(RuntimeError):
+        migrations.migrate(conn)
+    assert migrations.current_version(conn) == 1
+    assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'half_done'").fetchall()
+    conn.close()
+
+
+def test_upgrade_keeps_data_and_fills_derived_tables(tmp_path):
+    path = str(tmp_path / "old.db")
+    _v1_db(path)
+    conn = sqlite3.connect(path)
+    migrations.migrate(conn)
+    assert conn.execute("SELECT title FROM problems").fetchall() == [("两数之和",)]
+    assert conn.execute("SELECT tag FROM problem_tags ORDER BY tag").fetchall() == [("哈希表",), ("数组",)]
+    assert conn.execute("SELECT solved_count, problem_count FROM stats").fetchall() == [(1, 1)]
+    # 级联删除：删掉题目时打卡记录一起删除
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("DELETE FROM problems WHERE id = 1")
+    assert conn.execute("SELECT COUNT(*) FROM logs").fetchone() == (0,)
+    conn.close()
+
+
+def test_plain_sqlite_can_write_after_upgrade(tmp_path):
+    # 默认的表结构里没有调用应用内函数的触发器，不经过连接池的连接 (其他工具) 也能写入
+    path = str(tmp_path / "old.db")
+    _v1_db(path)
+    with sqlite3.connect(path) as conn:
+        migrations.migrate(conn)
+        migrations.sync_blob_triggers(conn)
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO problems (title, description) VALUES ('三数之和', '排序后双指针')")
+        conn.execute("UPDATE notes SET content = '改过的内容' WHERE id = 1")
+        assert conn.execute("SELECT COUNT(*) FROM search_pending").fetchone()[0] >= 2
+
+
+def test_cli_dry_run_leaves_file_untouched(tmp_path, capsys):
+    path = str(tmp_path / "old.db")
+    _v1_db(path)
+    with open(path, "rb") as f:
+        before = f.read()
+    migrations.main([path, "--dry-run"])
+    assert f"升级完成，当前版本 {migrations.LATEST_VERSION}" in capsys.readouterr().out
+    with open(path, "rb") as f:
+        assert f.read() == before
+    assert _version(path) == 1
+
+
+def test_cli_upgrades_file(tmp_path, capsys):
+    path = str(tmp_path / "old.db")
+    _v1_db(path)
+    try:
+        migrations.main([path])
+    finally:
+        db.get_pool(path).close_all()
+    assert "已执行迁移 2" in capsys.readouterr().out
+    assert _version(path) == migrations.LATEST_VERSION
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import db
+import queries
+from conftest import APP_DIR
+
+# ==========================================
+# 题目列表的 “加载更多”：只读下一页，之后的 rerun 不再重新读已加载的题目
+# ==========================================
+
+
+@pytest.fixture
+def page_calls(fresh_db, monkeypatch):
+    """300 道题；记录每次 get_problem_page 的 (page_size, after_id)。"""
+    for i in range(300):
+        db.run_query("INSERT INTO problems (title, difficulty, tags) VALUES (?, '简单', '[]')", (f"题目{i}",))
+    calls = []
+    original = queries.get_problem_page
+
+    def counting(difficulty, tags, page_size, after_id=None):
+        calls.append((page_size, after_id))
+        return original(difficulty, tags, page_size, after_id)
+
+    monkeypatch.setattr(queries, "get_problem_page", counting)
+    return calls
+
+
+def _problems_page():
+    at = AppTest.from_file(os.path.join(APP_DIR, "app.py"), default_timeout=60)
+    at.query_params["page"] = "code_problems"
+    at.run()
+    assert not at.exception
+    return at
+
+
+def _load_more(at):
+    [button] = [b for b in at.button if b.label == "⬇️ 加载更多"]
+    button.click().run()
+    assert not at.exception
+
+
+def test_load_more_reads_next_page_only(page_calls):
+    at = _problems_page()
+    assert page_calls == [(20, None)]
+    _load_more(at)
+    assert page_calls[1:] == [(20, 281)]
+    assert at.caption[-1].value == "已显示 40 道题目"
+
+
+def test_rerun_after_load_more_issues_no_list_queries(page_calls):
+    at = _problems_page()
+    _load_more(at)
+    del page_calls[:]
+    misses = db.get_cache().stats()["misses"]
+    at.run()
+    at.run()
+    assert not at.exception
+    assert page_calls == []
+    assert db.get_cache().stats()["misses"] == misses
+    assert at.caption[-1].value == "已显示 40 道题目"
+
+
+def test_write_reloads_loaded_rows(page_calls):
+    at = _problems_page()
+    _load_more(at)
+    db.run_query("UPDATE problems SET title = '改过的题目' WHERE id = 300")
+    del page_calls[:]
+    at.run()
+    assert page_calls == [(40, None)]
+    assert at.caption[-1].value == "已显示 40 道题目"
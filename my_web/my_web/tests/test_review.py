@@ -0,0 +1,75 @@
+import datetime
+
+import pytest
+
+import db
+import review
+
+# ==========================================
+# review.py：SM-2 的间隔计算、打卡和按全部打卡记录重算
+# ==========================================
+
+DAY = datetime.date(2024, 1, 1)
+
+
+def _days(n):
+    return DAY + datetime.timedelta(days=n)
+
+
+def test_first_reviews_use_fixed_intervals():
+    first = review.sm2_step(review.NEW_STATE, 4, DAY)
+    assert first == review.ReviewState(2.5, 1, 1, "2024-01-02", "2024-01-01")
+    second = review.sm2_step(first, 4, _days(1))
+    assert (second.interval, second.reps, second.due) == (6, 2, "2024-01-08")
+    third = review.sm2_step(second, 4, _days(7))
+    assert (third.interval, third.reps) == (15, 3)  # round(6 * 2.5)
+
+
+@pytest.mark.parametrize("quality, ease", [(5, 2.6), (4, 2.5), (3, 2.36), (1, 1.96)])
+def test_ease_follows_quality(quality, ease):
+    assert review.sm2_step(review.NEW_STATE, quality, DAY).ease == pytest.approx(ease)
+
+
+def test_failure_resets_interval():
+    state = review.replay([(DAY, 5), (_days(1), 5), (_days(7), 5)])
+    assert state.reps == 3
+    failed = review.sm2_step(state, 1, _days(30))
+    assert (failed.interval, failed.reps, failed.due) == (1, 0, "2024-02-01")
+    assert failed.ease < state.ease
+
+
+def test_ease_has_a_floor():
+    state = review.NEW_STATE
+    for n in range(10):
+        state = review.sm2_step(state, 1, _days(n))
+    assert state.ease == review.MIN_EASE
+
+
+def test_same_day_success_does_not_extend():
+    first = review.sm2_step(review.NEW_STATE, 5, DAY)
+    assert review.sm2_step(first, 5, DAY) == first
+    # 同一天没做出来仍然重置
+    assert review.sm2_step(first, 1, DAY).reps == 0
+
+
+def test_missing_quality_counts_as_default():
+    assert review.sm2_step(review.NEW_STATE, None, DAY) == review.sm2_step(review.NEW_STATE, review.DEFAULT_QUALITY, DAY)
+
+
+def _schedule(problem_id):
+    return db.run_query("SELECT review_ease, review_interval, review_reps, review_due, review_last FROM problems "
+                        "WHERE id=?", (problem_id,), fetch=True, cache=False, as_tuple=True)[0]
+
+
+def test_check_in_matches_rebuild(fresh_db):
+    problem_id = db.run_query("INSERT INTO problems (title) VALUES ('两数之和')", get_lastrowid=True)
+    review.check_in(problem_id, _days(0), 4)
+    review.check_in(problem_id, _days(1), 5)
+    # 补打更早的一次：按全部打卡记录重新计算
+    state = review.check_in(problem_id, _days(-3), 1)
+    assert tuple(state) == _schedule(problem_id)
+    assert state == review.replay([(_days(-3), 1), (_days(0), 4), (_days(1), 5)])
+
+    assert review.rebuild() == 1
+    assert _schedule(problem_id) == tuple(state)
+    assert db.run_query("SELECT COUNT(*) AS n FROM logs", fetch=True, cache=False) == [{"n": 3}]
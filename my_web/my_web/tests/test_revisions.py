@@ -0,0 +1,85 @@
+import pytest
+
+import db
+import revisions
+
+# ==========================================
+# revisions.py：按行差异、关键帧/差异的历史版本，以及保存时的冲突检查
+# ==========================================
+
+
+@pytest.mark.parametrize("old, new", [
+    ("", "第一行\n"),
+    ("a\nb\nc\n", "a\nB\nc\nd\n"),
+    ("a\nb\nc", "c\nb\na"),
+    ("没有换行结尾", "没有换行结尾\n多了一行"),
+    ("x\n" * 50, ""),
+])
+def test_delta_round_trip(old, new):
+    assert revisions.apply_delta(old, revisions.make_delta(old, new)) == new
+
+
+def _note(content="第一版\n"):
+    db.run_query("INSERT INTO notebooks (name) VALUES ('笔记本')")
+    return db.run_query("INSERT INTO notes (notebook_id, title, content) VALUES (1, '标题', ?)", (content,),
+                        get_lastrowid=True)
+
+
+def _read(note_id):
+    return db.run_query("SELECT title, content, content_hash FROM notes WHERE id=?", (note_id,),
+                        fetch=True, cache=False)[0]
+
+
+def test_every_revision_restores(fresh_db):
+    lines = "".join(f"第 {n} 行\n" for n in range(40))
+    note_id = _note(lines)
+    versions = [lines]
+    for i in range(revisions.KEYFRAME_EVERY + 5):
+        content = lines + f"改动 {i}\n"
+        assert revisions.save_note(note_id, "标题", content, _read(note_id))
+        versions.append(content)
+    history = revisions.list_revisions(note_id)
+    # 第 1 版是保存前已有的内容，之后每次保存追加一版
+    assert [r['rev'] for r in history] == list(range(len(versions), 0, -1))
+    # 每次只改一行，除了每 KEYFRAME_EVERY 版的关键帧都只存差异
+    keyframes = sorted(r['rev'] for r in history if r['keyframe'])
+    assert keyframes == [1, 1 + revisions.KEYFRAME_EVERY]
+    for rev, content in enumerate(versions, start=1):
+        assert revisions.get_revision(note_id, rev) == content
+
+
+def test_unchanged_content_writes_nothing(fresh_db):
+    note_id = _note()
+    base = _read(note_id)
+    assert revisions.save_note(note_id, "标题", base['content'], base) is False
+    assert revisions.list_revisions(note_id) == []
+    # 只改标题：更新笔记，不追加历史
+    assert revisions.save_note(note_id, "新标题", base['content'], base) is True
+    assert _read(note_id)['title'] == "新标题"
+    assert revisions.list_revisions(note_id) == []
+
+
+def test_stale_base_conflicts_and_writes_nothing(fresh_db):
+    note_id = _note()
+    base = _read(note_id)
+    assert revisions.save_note(note_id, "标题", "另一个会话保存的内容\n", base)
+    history = revisions.list_revisions(note_id)
+
+    with pytest.raises(revisions.NoteConflict):
+        revisions.save_note(note_id, "标题", "按旧内容改的\n", base)
+    assert _read(note_id)['content'] == "另一个会话保存的内容\n"
+    assert revisions.list_revisions(note_id) == history
+
+    # 按最新内容重新保存就可以了
+    assert revisions.save_note(note_id, "标题", "按新内容改的\n", _read(note_id))
+    assert revisions.get_revision(note_id, history[0]['rev'] + 1) == "按新内容改的\n"
+
+
+def test_external_edit_is_kept_as_keyframe(fresh_db):
+    note_id = _note()
+    assert revisions.save_note(note_id, "标题", "第二版\n", _read(note_id))
+    # 不经过 save_note 改内容 (例如导入)：下次保存前先把它存成一版
+    db.run_query("UPDATE notes SET content = '导入的内容\n' WHERE id = ?", (note_id,))
+    assert revisions.save_note(note_id, "标题", "导入的内容\n第三版\n", _read(note_id))
+    assert [revisions.get_revision(note_id, rev) for rev in (1, 2, 3, 4)] == [
+        "第一版\n", "第二版\n", "导入的内容\n", "导入的内容\n第三版\n"]
@@ -0,0 +1,67 @@
+import pytest
+
+import runner
+
+# ==========================================
+# runner.py：在子进程里运行题解，每个用例的时间和内存有上限
+# ==========================================
+
+CASES = [{"id": 1, "args": "[[2, 7, 11, 15], 9]", "expected": "[0, 1]"},
+         {"id": 2, "args": "[[3, 3], 6]", "expected": "[0, 1]"}]
+
+TWO_SUM = '''
+class Solution:
+    def twoSum(self, nums: List[int], target: int) -> List[int]:
+        print("调试输出不影响结果")
+        seen = {}
+        for i, n in enumerate(nums):
+            if target - n in seen:
+                return [seen[target - n], i]
+            seen[n] = i
+
+    def _helper(self, a, b):
+        return None
+'''
+
+
+def _solution(body):
+    return f"class Solution:\n    def solve(self, nums, target):\n        {body}\n"
+
+
+def test_passing_solution():
+    result = runner.run_solution(TWO_SUM, CASES)
+    assert result.error is None
+    assert [(case.status, case.output) for case in result.cases] == [("passed", "[0, 1]"), ("passed", "[0, 1]")]
+    assert result.runtime_ms is not None
+
+
+def test_wrong_answer_and_exception():
+    result = runner.run_solution(_solution("return [1, 0] if target == 6 else nums[target]"), CASES)
+    assert [case.status for case in result.cases] == ["error", "failed"]
+    assert "IndexError" in result.cases[0].error
+    assert result.runtime_ms is None
+
+
+def test_time_limit_per_case():
+    result = runner.run_solution(_solution("while True: pass"), CASES[:1], timeout=0.3)
+    assert [case.status for case in result.cases] == ["timeout"]
+
+
+def test_memory_limit():
+    result = runner.run_solution(_solution("return len(bytearray(512 * 1024 * 1024))"), CASES[:1], memory_mb=128)
+    assert [case.status for case in result.cases] == ["memory"]
+
+
+@pytest.mark.parametrize("code, message", [
+    ("class Solution:\n    def a(self, x, y):\n        pass\n    def b(self, x, y):\n        pass\n", "多个公开方法"),
+    ("class Solution:\n    def a(self, x):\n        pass\n", "没有"),
+    ("def solve(nums, target):\n    pass\n", "Solution"),
+])
+def test_entry_method_must_be_unambiguous(code, message):
+    result = runner.run_solution(code, CASES[:1])
+    assert result.cases == [] and message in result.error
+
+
+def test_no_tests_or_code():
+    assert runner.run_solution(TWO_SUM, []).error == "没有测试用例"
+    assert runner.run_solution("  ", CASES).error == "还没有写题解代码"
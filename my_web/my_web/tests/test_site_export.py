@@ -0,0 +1,43 @@
+import os
+
+import db
+import site_export
+
+# ==========================================
+# site_export.py：增量生成，只重新生成改动过的页面
+# ==========================================
+
+
+def _export(fresh_db, out_dir, **kwargs):
+    return site_export.export(fresh_db, str(out_dir), workers=1, **kwargs)
+
+
+def test_incremental_export(fresh_db, tmp_path):
+    out_dir = tmp_path / "site"
+    for i in range(3):
+        db.run_query("INSERT INTO problems (title, difficulty) VALUES (?, '简单')", (f"题目{i}",))
+    first = _export(fresh_db, out_dir)
+    assert first["rendered"] > 3 and first["removed"] == 0
+
+    # 什么都没改：一个页面都不生成
+    assert _export(fresh_db, out_dir) == {"rendered": 0, "removed": 0, "bytes": 0}
+
+    # 只改复习计划 (不显示在页面上的列)：同样不生成
+    db.run_query("UPDATE problems SET review_due = '2030-01-01' WHERE id = 1")
+    assert _export(fresh_db, out_dir)["rendered"] == 0
+
+    # 改一道题的标题：这道题的页面和包含它的列表页重新生成，其他题不动
+    other = os.stat(out_dir / "problems" / "2.html").st_mtime_ns
+    db.run_query("UPDATE problems SET title = '改过的标题' WHERE id = 1")
+    changed = _export(fresh_db, out_dir)
+    assert 1 <= changed["rendered"] < first["rendered"]
+    assert "改过的标题" in (out_dir / "problems" / "1.html").read_text(encoding="utf-8")
+    assert os.stat(out_dir / "problems" / "2.html").st_mtime_ns == other
+
+    # 删除一道题：删掉它的页面
+    db.delete_by_ids("problems", [3])
+    assert _export(fresh_db, out_dir)["removed"] == 1
+    assert not (out_dir / "problems" / "3.html").exists()
+
+    # --full 全部重新生成
+    assert _export(fresh_db, out_dir, full=True)["rendered"] == first["rendered"] - 1
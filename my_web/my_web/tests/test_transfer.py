@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+import db
+import transfer
+
+# ==========================================
+# transfer.py：导入导出
+# ==========================================
+
+
+def _revs(table):
+    return {r['id']: r['rev'] for r in db.run_query(f"SELECT id, rev FROM {table}", fetch=True, cache=False)}
+
+
+def test_reimport_identical_rows_keeps_rev(fresh_db, tmp_path):
+    db.run_query("INSERT INTO problems (title, difficulty, tags) VALUES ('两数之和', '简单', '[\"数组\"]')")
+    db.run_query("INSERT INTO problems (title, difficulty) VALUES ('三数之和', '中等')")
+    path = str(tmp_path / "problems.jsonl")
+    transfer.export_rows("problems", path)
+    before = _revs("problems")
+
+    assert transfer.import_rows("problems", path) == 2
+    assert _revs("problems") == before
+
+    db.run_query("UPDATE problems SET title = '两数之和 II' WHERE id = 1")
+    assert _revs("problems") == {1: before[1] + 1, 2: before[2]}
+
+
+def _problems():
+    return db.run_query("SELECT id, title, difficulty, tags, description, created_at FROM problems ORDER BY id",
+                        fetch=True, cache=False)
+
+
+@pytest.mark.parametrize("ext", [".jsonl", ".csv", ".parquet"])
+def test_round_trip(fresh_db, tmp_path, ext):
+    if ext == ".parquet":
+        pytest.importorskip("pyarrow")
+    db.run_query("INSERT INTO problems (title, difficulty, tags, description, created_at) "
+                 "VALUES ('两数之和', '简单', '[\"数组\"]', '第一行\n第二行, 带逗号和 \"引号\"', '2024-01-01')")
+    db.run_query("INSERT INTO problems (title, difficulty) VALUES ('三数之和', NULL)")
+    path = str(tmp_path / f"problems{ext}")
+    assert transfer.export_rows("problems", path) == 2
+    exported = _problems()
+
+    db.delete_by_ids("problems", [row['id'] for row in exported])
+    assert transfer.import_rows("problems", path) == 2
+    if ext == ".csv":
+        # CSV 分不出空字符串和 NULL：文本列的 NULL 导回来是空字符串
+        exported = [{k: "" if v is None else v for k, v in row.items()} for row in exported]
+    assert _problems() == exported
+    # 标签索引由触发器一起建好
+    assert db.run_query("SELECT problem_id, tag FROM problem_tags", fetch=True, cache=False) == [
+        {"problem_id": 1, "tag": "数组"}]
+
+
+def test_import_normalizes_leetcode_rows(fresh_db, tmp_path):
+    path = tmp_path / "leetcode.jsonl"
+    path.write_text(json.dumps({"title": "Two Sum", "difficulty": "Easy", "frontendId": "1",
+                                "tags": [{"name": "数组", "slug": "array"}, "哈希表"]}) + "\n", encoding="utf-8")
+    assert transfer.import_rows("problems", str(path)) == 1
+    [row] = _problems()
+    assert (row['title'], row['difficulty'], json.loads(row['tags'])) == ("Two Sum", "简单", ["数组", "哈希表"])
+
+
+def test_id_only_file_is_rejected(fresh_db, tmp_path):
+    path = tmp_path / "ids.csv"
+    path.write_text("id\n1\n2\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="除了 id"):
+        transfer.import_rows("problems", str(path))
+    assert _problems() == []
+
+
+def test_unknown_table_is_rejected(fresh_db, tmp_path):
+    with pytest.raises(ValueError):
+        transfer.export_rows("stats", str(tmp_path / "stats.jsonl"))
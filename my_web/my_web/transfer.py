@@ -0,0 +1,304 @@
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import sys
+
+import blobs
+import db
+import review
+from db import get_writer, init_db, run_query
+
+# ==========================================
+# 批量导入 / 导出 (题目、打卡记录、笔记本、笔记、资源)
+# ==========================================
+# 文件逐行读取，每 CHUNK_ROWS 行交给写入线程用一次 executemany 写入 (一个事务)；
+# 导出时用 run_query(stream=True) 逐行读出、逐行写入文件。内存占用只和 CHUNK_ROWS 有关，与文件大小无关。
+# 格式由扩展名决定：.jsonl / .csv / .parquet (Parquet 需要 pyarrow，只在用到时导入)。
+# 这个模块不依赖 streamlit，命令行和 “导入导出” 页面 (views/transfer_view.py) 共用。
+#
+# 用法 (在 my_web/my_web 目录下)：
+#   python transfer.py export problems problems.jsonl
+#   python transfer.py import problems leetcode.csv
+
+CHUNK_ROWS = 5000
+
+# 可以导入导出的表和列。顺序即依赖顺序：先导入笔记本再导入笔记，先导入题目再导入打卡记录
+TABLES = {
+    "notebooks": ("id", "name", "created_at"),
+    "notes": ("id", "notebook_id", "title", "content", "created_at", "updated_at"),
+    "problems": ("id", "title", "difficulty", "tags", "link", "description", "solution_code", "notes", "created_at"),
+    "problem_tests": ("id", "problem_id", "args", "expected", "created_at"),
+    "logs": ("id", "problem_id", "log_date", "status", "quality", "runtime_ms"),
+    "resources": ("id", "title", "category", "url", "image_url", "status"),
+}
+INTEGER_COLUMNS = {"id", "notebook_id", "problem_id", "quality"}
+REAL_COLUMNS = {"runtime_ms"}
+FORMATS = (".jsonl", ".csv", ".parquet")
+
+# 常见题库导出文件 (如 LeetCode) 里的英文难度
+DIFFICULTY_ALIASES = {"easy": "简单", "medium": "中等", "hard": "困难"}
+
+
+def file_format(name):
+    """根据文件名的扩展名返回格式 (.jsonl / .csv / .parquet)。"""
+    ext = os.path.splitext(name)[1].lower()
+    if ext == ".json":
+        ext = ".jsonl"
+    if ext not in FORMATS:
+        raise ValueError(f"不支持的文件格式 {ext or name!r}，只支持 {' / '.join(FORMATS)}")
+    return ext
+
+
+def _check_table(table):
+    if table not in TABLES:
+        raise ValueError(f"未知的表 {table!r}，只能是 {' / '.join(TABLES)}")
+
+
+class TransferError(Exception):
+    """某一批数据写入失败；之前的批次已经提交。"""
+
+    def __init__(self, message, imported):
+        super().__init__(message)
+        self.imported = imported
+
+
+# --- 读取 ---
+def _open_binary(source):
+    """source 可以是文件路径，也可以是已经打开的二进制文件对象 (例如 streamlit 上传的文件)。"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb"), True
+    return source, False
+
+
+def _iter_text_rows(binary, fmt):
+    """逐行产出 (dict, 已读取的比例)。比例按底层文件已读的字节数估算。"""
+    binary.seek(0, io.SEEK_END)
+    size = binary.tell() or 1
+    binary.seek(0)
+    text = io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == ".csv":
+            for row in csv.DictReader(text):
+                # CSV 分不出空字符串和 NULL：id、用时一类的数字列为空时当作没有填写
+                row = {k: (None if v == "" and (k in INTEGER_COLUMNS or k in REAL_COLUMNS) else v)
+                       for k, v in row.items()}
+                yield row, binary.tell() / size
+        else:
+            for line in text:
+                if line.strip():
+                    yield json.loads(line), binary.tell() / size
+    finally:
+        text.detach()  # 不随 TextIOWrapper 一起关闭底层文件
+
+
+def _iter_parquet_rows(binary):
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(binary)
+    total = parquet.metadata.num_rows or 1
+    done = 0
+    for batch in parquet.iter_batches(batch_size=CHUNK_ROWS):
+        for row in batch.to_pylist():
+            done += 1
+            yield row, done / total
+
+
+def iter_rows(source, fmt):
+    """逐行读取导入文件，产出 (dict, 已读取的比例)。"""
+    binary, owned = _open_binary(source)
+    try:
+        if fmt == ".parquet":
+            yield from _iter_parquet_rows(binary)
+        else:
+            yield from _iter_text_rows(binary, fmt)
+    finally:
+        if owned:
+            binary.close()
+
+
+def _normalize(table, row):
+    """把导入的一行整理成表里的存储形式：列表/字典存成 JSON、日期存成字符串、英文难度换成中文。"""
+    row = dict(row)
+    if table == "problems":
+        difficulty = row.get("difficulty")
+        if isinstance(difficulty, str):
+            row["difficulty"] = DIFFICULTY_ALIASES.get(difficulty.strip().lower(), difficulty.strip())
+        tags = row.get("tags")
+        if isinstance(tags, list):
+            # LeetCode 的 topicTags 是 [{"name": ..., "slug": ...}, ...]
+            row["tags"] = [t.get("name") if isinstance(t, dict) else t for t in tags]
+    for key, value in row.items():
+        if isinstance(value, (list, dict)):
+            row[key] = json.dumps(value, ensure_ascii=False)
+        elif isinstance(value, (datetime.date, datetime.datetime)):
+            row[key] = value.isoformat()
+    return row
+
+
+def _insert_query(table, columns):
+    """
+    带 id 的行按 id 覆盖已有记录 (UPSERT，不会像 REPLACE 那样先删除、触发级联删除)，否则新增。
+    columns 除了 id 至少还要有一列，否则抛出 ValueError。
+    """
+    updates = ", ".join(f"{c}=excluded.{c}" for c in columns if c != "id")
+    if not updates:
+        raise ValueError(f"文件里除了 id 没有 {table} 表的其他列 ({', '.join(TABLES[table])})")
+    placeholders = ", ".join("?" * len(columns))
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    if "id" in columns:
+        query += f" ON CONFLICT(id) DO UPDATE SET {updates}"
+    return query
+
+
+# --- 导入 ---
+def import_rows(table, source, fmt=None, progress=None):
+    """
+    把 source (文件路径或二进制文件对象) 里的行导入 table，返回导入的行数。
+    - 列以第一行为准，只取 TABLES 里列出的列，其他字段忽略；之后的行缺少的列写入 NULL。
+    - 有 id 列时按 id 覆盖已有记录，否则新增。
+    - progress(已导入行数, 已读取的比例) 在每批提交后调用。
+    一批写入失败时抛出 TransferError，它之前的批次已经提交。
+    """
+    _check_table(table)
+    fmt = fmt or file_format(source if isinstance(source, (str, os.PathLike)) else source.name)
+    writer = get_writer()
+    columns = query = None
+    chunk = []
+    imported = 0
+    pending = None  # 上一批的 Future：读下一批的同时写入线程在提交上一批，最多同时持有两批
+
+    def wait_pending():
+        nonlocal imported
+        if pending is None:
+            return
+        future, rows, fraction = pending
+        try:
+            future.result()
+        except Exception as e:
+            raise TransferError(f"第 {imported + 1} ~ {imported + rows} 行写入失败：{e}", imported) from e
+        imported += rows
+        if progress:
+            progress(imported, fraction)
+
+    fraction = 0.0
+    for row, fraction in iter_rows(source, fmt):
+        row = _normalize(table, row)
+        if columns is None:
+            columns = [c for c in TABLES[table] if c in row]
+            query = _insert_query(table, columns)  # 只有 id 或一列都没有时抛出 ValueError
+        chunk.append(tuple(row.get(c) for c in columns))
+        if len(chunk) >= CHUNK_ROWS:
+            wait_pending()
+            pending = (writer.submit(query, chunk, many=True), len(chunk), fraction)
+            chunk = []
+    wait_pending()
+    pending = None
+    if chunk:
+        pending = (writer.submit(query, chunk, many=True), len(chunk), 1.0)
+        wait_pending()
+    if table == "logs" and imported:
+        review.rebuild()  # 导入的打卡记录没有经过 review.check_in，按全部记录重算复习计划
+    return imported
+
+
+# --- 导出 ---
+def _parquet_schema(table):
+    import pyarrow as pa
+
+    return pa.schema([(c, pa.int64() if c in INTEGER_COLUMNS else pa.float64() if c in REAL_COLUMNS else pa.string())
+                      for c in TABLES[table]])
+
+
+def export_rows(table, dest, fmt=None, progress=None):
+    """
+    把 table 按 id 顺序逐行导出到 dest (文件路径或二进制文件对象)，返回导出的行数。
+    progress(已导出行数, 比例) 每 CHUNK_ROWS 行调用一次。
+    """
+    _check_table(table)
+    fmt = fmt or file_format(dest if isinstance(dest, (str, os.PathLike)) else dest.name)
+    columns = TABLES[table]
+    total = run_query(f"SELECT COUNT(*) AS n FROM {table}", fetch=True, cache=False)[0]['n'] or 1
+    # 移到 text_blobs 的大文本 (见 blobs.py) 在 SQL 里换回全文
+    rows = run_query(f"SELECT {blobs.select_list(table, columns)} FROM {table} ORDER BY id", fetch=True, stream=True,
+                     as_tuple=True)
+
+    owned = isinstance(dest, (str, os.PathLike))
+    binary = open(dest, "wb") if owned else dest
+    exported = 0
+    try:
+        if fmt == ".parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = _parquet_schema(table)
+            with pq.ParquetWriter(binary, schema) as parquet:
+                chunk = []
+                for row in rows:
+                    chunk.append(dict(zip(columns, row)))
+                    if len(chunk) >= CHUNK_ROWS:
+                        parquet.write_table(pa.Table.from_pylist(chunk, schema))  # 每批一个 row group
+                        exported += len(chunk)
+                        chunk = []
+                        if progress:
+                            progress(exported, exported / total)
+                if chunk:
+                    parquet.write_table(pa.Table.from_pylist(chunk, schema))
+                    exported += len(chunk)
+        else:
+            text = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+            try:
+                if fmt == ".csv":
+                    out = csv.writer(text)
+                    out.writerow(columns)
+                    write = out.writerow
+                else:
+                    def write(row):
+                        text.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+                for row in rows:
+                    write(row)
+                    exported += 1
+                    if progress and exported % CHUNK_ROWS == 0:
+                        progress(exported, exported / total)
+            finally:
+                text.flush()
+                text.detach()
+    finally:
+        rows.close()
+        if owned:
+            binary.close()
+    if progress:
+        progress(exported, 1.0)
+    return exported
+
+
+def _print_progress(done, fraction):
+    print(f"\r  {done} 行 ({fraction:.0%})", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量导入 / 导出数据 (.jsonl / .csv / .parquet)")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("table", choices=list(TABLES))
+    parser.add_argument("path", help="导入的文件或导出的目标文件，格式由扩展名决定")
+    parser.add_argument("--db", help="数据库文件 (默认 my_notion.db)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db.DB_FILE = args.db
+    init_db()
+    try:
+        if args.action == "import":
+            count = import_rows(args.table, args.path, progress=_print_progress)
+        else:
+            count = export_rows(args.table, args.path, progress=_print_progress)
+    except TransferError as e:
+        print(f"\n{e} (已导入 {e.imported} 行)", file=sys.stderr)
+        sys.exit(1)
+    print(f"\n{'导入' if args.action == 'import' else '导出'} {count} 行", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
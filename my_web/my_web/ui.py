@@ -0,0 +1,108 @@
+import streamlit as st
+
+import db
+from db import delete_by_ids
+
+# ==========================================
+# 页面之间共用的辅助函数 (初始化数据库、跳转、单行删除、批量删除栏)
+# ==========================================
+
+
+@st.cache_resource(show_spinner=False)
+def init_db_once(db_file):
+    """每个进程 (每个数据库文件) 只执行一次 db.init_db，之后的 rerun 直接跳过，不再检查迁移。"""
+    db.init_db()
+    return db_file
+
+
+def navigate_to(page_name, **kwargs):
+    """辅助函数：更新 URL 参数以实现跳转 (在 fragment 里调用时同样整页重新运行)"""
+    # 确保清空所有旧参数，只设置新参数
+    st.query_params.clear()
+    st.query_params["page"] = page_name
+    for key, value in kwargs.items():
+        st.query_params[key] = value
+    st.rerun()
+
+
+def go_back(target_page_default="code_problems"):
+    """返回上一页"""
+    # 智能判断返回页面
+    if st.session_state.get('prev_page_on_detail') in ('calendar', 'search', 'review'):
+        navigate_to(st.session_state['prev_page_on_detail'])
+    else:
+        navigate_to(target_page_default)
+
+
+# --- 单行删除 ---
+# 列表的每一行放在各自的 @st.fragment 里：点删除 / 确认 / 取消只重新运行这一行，不重新运行整页。
+# 删除后这一行只显示删除提示，等下次整页运行时才从列表里消失 (id 都是 AUTOINCREMENT，不会被新行复用)。
+def confirm_delete_key(table, item_id):
+    """这一行是否在等待确认删除。"""
+    return f"confirm_delete_{table}_{item_id}"
+
+
+def deleted_message(table, item_id):
+    """这一行在本页删除过时返回删除提示，否则返回 None。"""
+    return st.session_state.get(f"deleted_{table}_{item_id}")
+
+
+def set_confirm_delete(table, item_id, value):
+    st.session_state[confirm_delete_key(table, item_id)] = value
+
+
+def delete_row(table, item_id, message):
+    # 子记录由外键 ON DELETE CASCADE 在同一事务里删除。
+    # 提示由这一行的 fragment 显示 (fragment 重新运行时，回调里不能显示 toast 之类的元素)
+    delete_by_ids(table, [item_id])
+    st.session_state.pop(confirm_delete_key(table, item_id), None)
+    st.session_state[f"deleted_{table}_{item_id}"] = message
+
+
+def selection_key(table, item_id):
+    """列表中每一行勾选框的 key。"""
+    return f"select_{table}_{item_id}"
+
+
+def _set_selection(table, item_ids, value):
+    for item_id in item_ids:
+        st.session_state[selection_key(table, item_id)] = value
+
+
+def _delete_selected(table, selected_ids, label):
+    # 一条 DELETE 删除全部选中项 (子记录由外键级联删除)
+    delete_by_ids(table, selected_ids)
+    _set_selection(table, selected_ids, False)
+    st.session_state[f"confirm_bulk_delete_{table}"] = False
+    st.toast(f"✅ 已删除 {len(selected_ids)} 个{label}")
+
+
+def bulk_delete_bar(table, item_ids, label):
+    """
+    批量删除栏：全选/清空当前列表，并在确认后一次删除所有勾选的行。
+    按钮都用 on_click 回调修改勾选状态，因为此时各行的勾选框已经渲染过了。
+    各行的勾选框要放在行 fragment 外面，勾选时整页重新运行，这里的计数才会跟着变。
+    """
+    selected_ids = [i for i in item_ids if st.session_state.get(selection_key(table, i))]
+    confirm_key = f"confirm_bulk_delete_{table}"
+
+    col_select_all, col_clear, col_delete = st.columns([1, 1, 2])
+    col_select_all.button("☑️ 全选", key=f"bulk_select_all_{table}", use_container_width=True,
+                          on_click=_set_selection, args=(table, item_ids, True))
+    col_clear.button("清空选择", key=f"bulk_clear_{table}", use_container_width=True, disabled=not selected_ids,
+                     on_click=_set_selection, args=(table, item_ids, False))
+    if not st.session_state.get(confirm_key):
+        if col_delete.button(f"🗑️ 删除所选 ({len(selected_ids)})", key=f"bulk_delete_{table}",
+                             disabled=not selected_ids, use_container_width=True):
+            st.session_state[confirm_key] = True
+            st.rerun()
+    elif selected_ids:
+        st.warning(f"确定删除选中的 {len(selected_ids)} 个{label}吗？相关的子记录会一并删除，此操作无法撤销！")
+        col_confirm, col_cancel = st.columns(2)
+        col_confirm.button("✅ 确认删除", key=f"bulk_confirm_{table}", use_container_width=True,
+                           on_click=_delete_selected, args=(table, selected_ids, label))
+        if col_cancel.button("❌ 取消", key=f"bulk_cancel_{table}", use_container_width=True):
+            st.session_state[confirm_key] = False
+            st.rerun()
+    else:
+        st.session_state[confirm_key] = False
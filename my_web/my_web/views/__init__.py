@@ -0,0 +1,29 @@
+import importlib
+
+# ==========================================
+# 页面注册表
+# ==========================================
+# 页面 ID -> (模块, 渲染函数)。页面模块在第一次打开该页面时才导入，冷启动只需导入 streamlit 和 db，
+# 日历组件等较重的依赖只在用到它们的页面里导入。导入过的模块常驻进程，之后的 rerun 不会重复导入。
+# 注意：目录不能叫 pages/，Streamlit 会把它当成多页面应用。
+PAGES = {
+    "dashboard": ("views.dashboard", "render"),
+    "code_problems": ("views.problems", "render_list"),
+    "problem_detail": ("views.problems", "render_detail"),
+    "review": ("views.review_view", "render"),
+    "analytics": ("views.analytics_view", "render"),
+    "calendar": ("views.calendar_view", "render"),
+    "resources": ("views.resources", "render"),
+    "notebook": ("views.notebooks", "render_list"),
+    "notebook_detail": ("views.notebooks", "render_detail"),
+    "search": ("views.search_view", "render"),
+    "transfer": ("views.transfer_view", "render"),
+    # 不在侧边栏导航里，直接访问 ?page=_perf
+    "_perf": ("views.perf_view", "render"),
+}
+
+
+def render(page):
+    """导入页面所在的模块并渲染它。"""
+    module_name, function_name = PAGES[page]
+    getattr(importlib.import_module(module_name), function_name)()
@@ -0,0 +1,90 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+import analytics
+
+# ==========================================
+# 统计分析 (Analytics)：打卡热力图、趋势和连续打卡
+# plotly / pandas 只有这个页面用到，只在这里导入 (页面模块在第一次打开时才导入)
+# ==========================================
+# 统计在 analytics.py 里按数据版本缓存，数据没变时这里只负责画图。
+query_params = st.query_params
+
+DIFFICULTY_COLORS = {"简单": "#0ca678", "中等": "#f59f00", "困难": "#fa5252"}
+HEATMAP_COLORS = [[0.0, "#ebedf0"], [0.25, "#9be9a8"], [0.5, "#40c463"], [0.75, "#30a14e"], [1.0, "#216e39"]]
+WEEKDAYS = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+
+
+def _heatmap_figure(heatmap):
+    """GitHub 风格的年度热力图：每列一周 (周一在上)，今天之后的格子留空。"""
+    weeks = analytics.HEATMAP_WEEKS
+    counts = np.full(weeks * 7, np.nan)
+    counts[:len(heatmap)] = heatmap.to_numpy()
+    dates = pd.date_range(heatmap.index[0], periods=weeks * 7, freq="D")
+    labels = np.asarray(dates.strftime("%Y-%m-%d"), dtype=object)
+    fig = go.Figure(go.Heatmap(
+        z=counts.reshape(weeks, 7).T, x=dates[::7], y=WEEKDAYS,
+        customdata=labels.reshape(weeks, 7).T, hovertemplate="%{customdata}：完成 %{z} 题<extra></extra>",
+        colorscale=HEATMAP_COLORS, showscale=False, xgap=3, ygap=3,
+    ))
+    fig.update_layout(height=220, margin=dict(l=0, r=0, t=10, b=0), plot_bgcolor="rgba(0,0,0,0)",
+                      xaxis=dict(tickformat="%m月", dtick="M1", showgrid=False),
+                      yaxis=dict(autorange="reversed", showgrid=False))
+    return fig
+
+
+def _trend_figure(trend, colors=None, stacked=False):
+    fig = go.Figure()
+    for column in trend.columns:
+        fig.add_trace(go.Scatter(
+            x=trend.index, y=trend[column], name=str(column), mode="lines",
+            stackgroup="total" if stacked else None,
+            line=dict(color=colors.get(column)) if colors and column in colors else None,
+        ))
+    fig.update_layout(height=320, margin=dict(l=0, r=0, t=10, b=0), hovermode="x unified",
+                      legend=dict(orientation="h", y=-0.15))
+    return fig
+
+
+def _format_day(day):
+    return f"{day.month}月{day.day}日" if day else "-"
+
+
+# --- 📈 统计分析 ---
+def render():
+    st.title("📈 统计分析")
+    result = analytics.report(datetime.date.today())
+    summary = result.summary
+
+    if not summary['total_solved']:
+        st.info("还没有完成的打卡记录，打卡之后这里会显示热力图和趋势。")
+        return
+
+    col_total, col_year, col_current, col_longest = st.columns(4)
+    col_total.metric("累计完成", summary['total_solved'])
+    col_year.metric("最近一年", summary['year_solved'])
+    col_current.metric("当前连续", f"{summary['current_streak']} 天")
+    col_longest.metric("最长连续", f"{summary['longest_streak']} 天")
+    st.caption(f"打卡 {summary['active_days']} 天 · 最长连续 {_format_day(summary['longest_start'])} ~ "
+               f"{_format_day(summary['longest_end'])} · 最多的一天 {_format_day(summary['best_day'])} "
+               f"完成 {summary['best_day_solved']} 题")
+
+    st.subheader("🗓️ 最近一年")
+    st.plotly_chart(_heatmap_figure(result.heatmap), use_container_width=True, config={"displayModeBar": False})
+
+    col_difficulty, col_tags = st.columns(2)
+    with col_difficulty:
+        st.subheader("📊 各难度每周完成")
+        st.plotly_chart(_trend_figure(result.difficulty_trend, DIFFICULTY_COLORS, stacked=True),
+                        use_container_width=True, config={"displayModeBar": False})
+    with col_tags:
+        st.subheader("🏷️ 常做标签每月完成")
+        if result.tag_trend.empty:
+            st.caption("最近没有带标签的题目。")
+        else:
+            st.plotly_chart(_trend_figure(result.tag_trend), use_container_width=True,
+                            config={"displayModeBar": False})
@@ -0,0 +1,76 @@
+import datetime
+
+import streamlit as st
+from streamlit_calendar import calendar
+
+import queries
+from ui import navigate_to
+
+# ==========================================
+# 日历行程 (Calendar)：按月份窗口加载打卡记录
+# streamlit_calendar 组件只有这个页面用到，只在这里导入
+# ==========================================
+query_params = st.query_params
+
+
+# --- 📅 日历行程 ---
+def render():
+    st.title("📅 学习日历")
+
+    # 当前显示的月份 (每月 1 号)；翻页由下面的按钮控制，只查询这个月附近的打卡记录
+    today = datetime.date.today()
+    if 'calendar_month' not in st.session_state:
+        st.session_state['calendar_month'] = today.replace(day=1)
+    month_start = st.session_state['calendar_month']
+
+    col_prev, col_today, col_next, _ = st.columns([1, 1, 1, 5])
+    if col_prev.button("◀ 上个月", use_container_width=True):
+        st.session_state['calendar_month'] = (month_start - datetime.timedelta(days=1)).replace(day=1)
+        st.rerun()
+    if col_today.button("今天", use_container_width=True):
+        st.session_state['calendar_month'] = today.replace(day=1)
+        st.rerun()
+    if col_next.button("下个月 ▶", use_container_width=True):
+        st.session_state['calendar_month'] = (month_start + datetime.timedelta(days=32)).replace(day=1)
+        st.rerun()
+
+    # 月视图最多显示 6 周 (前后会露出相邻月份的几天)，窗口前后各留一周缓冲
+    next_month_start = (month_start + datetime.timedelta(days=32)).replace(day=1)
+    window_start = month_start - datetime.timedelta(days=7)
+    window_end = next_month_start + datetime.timedelta(days=14)
+
+    # 逐行读取窗口内的打卡记录 (走 logs.log_date 索引)，直接生成日历事件
+    events = []
+    for log_date, title, pid, difficulty in queries.iter_calendar_logs(window_start, window_end):
+        color = "#0ca678" if difficulty == "简单" else ("#f59f00" if difficulty == "中等" else "#fa5252")
+        events.append({
+            "title": f"{title}",
+            "start": log_date,
+            "backgroundColor": color,
+            "borderColor": color,
+            "extendedProps": {"pid": pid}  # 传递自定义数据
+        })
+
+    calendar_options = {
+        # 翻页按钮在上方：日历自带的 prev/next 只会在前端切换，拿不到新窗口的数据
+        "headerToolbar": {"left": "", "center": "title", "right": ""},
+        "initialView": "dayGridMonth",
+        "initialDate": month_start.isoformat(),
+        "editable": False,  # 不允许拖拽修改
+    }
+
+    # 渲染日历
+    # `key`很重要，避免 Streamlit 重用组件状态；按月份区分，翻页后 initialDate 才会生效
+    cal_output = calendar(events=events, options=calendar_options, key=f"my_calendar_{month_start:%Y%m}",
+                          custom_css="""
+        .fc-event { cursor: pointer; }
+    """)
+    st.caption(f"{window_start} ~ {window_end - datetime.timedelta(days=1)} 共 {len(events)} 条打卡记录")
+
+    # 处理日历点击跳转
+    if cal_output.get("eventClick"):
+        event_data = cal_output["eventClick"]["event"]
+        clicked_pid = event_data["extendedProps"]["pid"]
+        # 记录是从日历进入的，以便返回时能正确跳转
+        st.session_state['prev_page_on_detail'] = 'calendar'
+        navigate_to("problem_detail", id=clicked_pid, source="calendar")
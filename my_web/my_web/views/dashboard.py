@@ -0,0 +1,44 @@
+import streamlit as st
+
+import queries
+from db import get_cache, get_pool
+
+# ==========================================
+# 仪表盘 (Dashboard)：统计概览与近期动态
+# ==========================================
+query_params = st.query_params
+
+
+# --- 🏠 仪表盘 ---
+def render():
+    st.title("🏠 下午好，Lyn")
+    st.caption("这里是你的概览。")
+
+    # 统计数据 (stats 表由触发器增量维护，只读一行)
+    stats, today_solved = queries.get_dashboard_stats()
+
+    col_dash1, col_dash2, col_dash3 = st.columns(3)
+    col_dash1.metric("已解决题目", str(stats['solved_count']))
+    col_dash2.metric("资源收藏", str(stats['resource_count']))
+    col_dash3.metric("笔记本数量", str(stats['notebook_count']))
+    st.caption(f"题库共 {stats['problem_count']} 道：简单 {stats['easy_count']} · 中等 {stats['medium_count']} · "
+               f"困难 {stats['hard_count']}　|　今日已刷 {today_solved} 题")
+
+    st.divider()
+
+    # 近期活动 (示例，可根据日志表数据丰富)
+    st.subheader("📢 近期动态")
+    latest_logs = queries.get_recent_activity(limit=5)
+    if latest_logs:
+        for log in latest_logs:
+            st.markdown(f"**{log['log_date']}**: 完成了题目 **[{log['title']}]**")
+    else:
+        st.info("暂无近期活动。")
+
+    # 连接池与查询缓存的命中情况
+    with st.expander("⚙️ 数据层统计", expanded=False):
+        col_pool_stats, col_cache_stats = st.columns(2)
+        col_pool_stats.caption("连接池")
+        col_pool_stats.json(get_pool().stats())
+        col_cache_stats.caption("查询缓存")
+        col_cache_stats.json(get_cache().stats())
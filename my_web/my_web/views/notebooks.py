@@ -0,0 +1,357 @@
+import datetime
+import difflib
+import html
+import sqlite3
+import time
+
+import streamlit as st
+
+import cards
+import queries
+import revisions
+from db import run_query
+from ui import (bulk_delete_bar, confirm_delete_key, delete_row, deleted_message, navigate_to, selection_key,
+                set_confirm_delete)
+
+# ==========================================
+# 笔记本 (Notebooks)：笔记本列表与笔记编辑页
+# ==========================================
+query_params = st.query_params
+
+AUTOSAVE_SECONDS = 3  # 停止编辑这么久之后自动保存
+
+
+# --- 📓 笔记本列表 ---
+def render_list():
+    st.title("📓 我的笔记本")
+
+    with st.expander("➕ 新建笔记本", expanded=False):
+        # Initialize session state for input if not present
+        if 'nb_name_input_value' not in st.session_state:
+            st.session_state.nb_name_input_value = ""
+
+        with st.form("new_notebook_form"):
+            nb_name = st.text_input("笔记本名称", value=st.session_state.nb_name_input_value, key="nb_name_form_input")
+            submitted = st.form_submit_button("创建笔记本")
+            if submitted:
+                if nb_name:
+                    try:
+                        run_query("INSERT INTO notebooks (name, created_at) VALUES (?, ?)",
+                                  (nb_name, datetime.date.today()))
+                        st.success(f"笔记本 '{nb_name}' 已创建！")
+                        st.session_state.nb_name_input_value = ""  # Clear the input field in session state
+                        st.rerun()
+                    except sqlite3.IntegrityError:
+                        st.error(f"笔记本名称 '{nb_name}' 已存在，请更换一个。")
+                else:
+                    st.error("笔记本名称不能为空。")
+
+    notebooks = queries.get_notebooks()
+
+    if not notebooks:
+        st.info("还没有笔记本，快去创建一个吧！")
+    else:
+        bulk_bar = st.container()
+
+        # 使用 4 等宽列来放置笔记本
+        cols_nb = st.columns(4)
+
+        for idx, nb in enumerate(notebooks):
+            with cols_nb[idx % 4]:  # 将每个笔记本卡片放置在 4 个内容列中的一个
+                _notebook_card(nb)
+                # 勾选框留在卡片 fragment 外面，勾选时整页重新运行，批量删除栏才会更新
+                st.checkbox("选择", key=selection_key("notebooks", nb['id']))
+
+        with bulk_bar:
+            bulk_delete_bar("notebooks", [nb['id'] for nb in notebooks], "笔记本")
+
+
+def _render_notebook_card(nb):
+    return f"""
+    <div style="
+        background-color: #ffffff;
+        border: 1px solid #e0e0e0;
+        border-radius: 8px;
+        padding: 10px;
+        margin-bottom: 5px; /* Space between card and buttons below */
+        text-align: left;
+        width: 100%;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.05);
+        min-height: 100px; /* Adjusted min-height to fit title + date */
+        display: flex;
+        flex-direction: column;
+        justify-content: flex-start;
+    ">
+        <h3 style="margin-top: 0; margin-bottom: 5px; color: #37352f; font-size: 1.1em; word-break: break-word;">{html.escape(nb['name'])}</h3>
+        <p style="font-size:0.8em; color:gray; margin-bottom: 0;">创建于 {nb['created_at']}</p>
+    </div>
+    """
+
+
+@st.fragment
+def _notebook_card(nb):
+    """一个笔记本卡片。点删除 / 确认 / 取消时只重新运行这张卡片。"""
+    if message := deleted_message("notebooks", nb['id']):
+        st.caption(f"🗑️ {message}")
+        return
+
+    # Card content: title and date inside the div (按行版本缓存，见 cards.py)
+    st.markdown(cards.cached("notebooks", nb, _render_notebook_card), unsafe_allow_html=True)
+
+    # Buttons in a new row of columns, immediately after the card div
+    # Adjusted column ratios to give buttons more space for horizontal display
+    button_col_enter, spacer_col, button_col_delete, _ = st.columns([2, 0.01, 2, 4.6])
+
+    with button_col_enter:
+        # "进入" button
+        if st.button("进入", key=f"nb_card_click_{nb['id']}", use_container_width=True):
+            navigate_to("notebook_detail", notebook_id=nb['id'])
+
+    with button_col_delete:
+        # "删除" button with trash can icon and secondary type
+        # Only show delete button if not in confirmation state for this notebook
+        if not st.session_state.get(confirm_delete_key("notebooks", nb['id'])):
+            st.button("删除", key=f"del_nb_{nb['id']}", type="secondary", use_container_width=True,
+                      on_click=set_confirm_delete, args=("notebooks", nb['id'], True))
+
+    # If the current notebook is pending deletion, display confirmation message
+    if st.session_state.get(confirm_delete_key("notebooks", nb['id'])):
+        st.warning(f"确定要删除笔记本 '{nb['name']}' 吗？此操作无法撤销。")
+        # Confirmation buttons use the same column layout as the action buttons
+        confirm_btn_col1, confirm_spacer_col, confirm_btn_col2, _ = st.columns([1, 0.2, 1, 5])
+        # 笔记由外键 ON DELETE CASCADE 在同一事务里删除
+        confirm_btn_col1.button("✅ 确认删除", key=f"confirm_del_nb_{nb['id']}", on_click=delete_row,
+                                args=("notebooks", nb['id'], f"笔记本 '{nb['name']}' 已删除。"))
+        confirm_btn_col2.button("❌ 取消", key=f"cancel_del_nb_{nb['id']}", on_click=set_confirm_delete,
+                                args=("notebooks", nb['id'], False))
+
+
+# --- 📝 笔记本详情页 (包含目录和笔记编辑) ---
+def render_detail():
+    notebook_id = query_params.get("notebook_id")
+    note_id = query_params.get("note_id")
+
+    if not notebook_id:
+        st.error("未指定笔记本ID。")
+        navigate_to("notebook")  # 返回笔记本列表
+        st.stop()
+
+    current_notebook = queries.get_notebook(notebook_id)
+    if not current_notebook:
+        st.error("找不到该笔记本。")
+        navigate_to("notebook")
+        st.stop()
+
+    st.title(f"📓 {current_notebook['name']}")
+
+    # 如果没有指定 note_id，尝试加载最新的一篇笔记，或者提示用户创建
+    if not note_id:
+        latest_note_id = queries.get_latest_note_id(notebook_id)
+        if latest_note_id:
+            note_id = latest_note_id
+            # 更新URL，让它指向这篇笔记
+            navigate_to("notebook_detail", notebook_id=notebook_id, note_id=note_id)
+            st.stop()  # 重新运行以加载正确的 note_id
+        else:
+            st.info("这个笔记本还没有笔记，请在左侧侧边栏点击 '➕ 新建笔记'。")
+            st.stop()  # 停止渲染，等待用户创建笔记
+
+    current_note = queries.get_note(note_id, notebook_id)
+    if not current_note:
+        st.error("找不到这篇笔记。")
+        # 尝试跳转到同一个笔记本的最新笔记，如果没有则返回笔记本列表
+        latest_note_id = queries.get_latest_note_id(notebook_id)
+        if latest_note_id:
+            navigate_to("notebook_detail", notebook_id=notebook_id, note_id=latest_note_id)
+        else:
+            navigate_to("notebook_detail", notebook_id=notebook_id)  # 强制刷新笔记本详情页，会显示“没有笔记”提示
+        st.stop()
+
+    # 笔记编辑区
+    st.subheader(f"📄 {current_note['title']}")
+
+    # 编辑框的内容按笔记分别保存在 session_state 里；切换笔记时先保存上一篇还没保存的修改
+    editing = st.session_state.get('editing_note')
+    if editing and editing != (notebook_id, note_id):
+        # 保存冲突时留着编辑框的内容，回到这篇笔记时还能选择覆盖或放弃
+        if _autosave(editing[1], force=True) or st.session_state.get('note_save_status') != "conflict":
+            _forget_editor(editing[1])
+        st.session_state['note_save_status'] = None
+    st.session_state['editing_note'] = (notebook_id, note_id)
+    title_key, content_key, base_key = _editor_keys(note_id)
+    if title_key not in st.session_state:
+        content = current_note['content'] or ""
+        st.session_state[title_key] = current_note['title']
+        st.session_state[content_key] = content
+        st.session_state[base_key] = _base(current_note['title'], current_note['content'])
+
+    if (restored_rev := st.session_state.pop('note_restored', None)) is not None:
+        st.toast(f"✅ 已恢复到第 {restored_rev} 版")
+
+    # 编辑区和历史版本各是一个 fragment：改输入框、保存时只重新运行编辑区
+    _note_editor(notebook_id, note_id, current_note['title'])
+
+    _render_revisions(notebook_id, note_id)
+
+
+@st.fragment
+def _note_editor(notebook_id, note_id, page_title):
+    """标题框、内容框、自动保存状态和保存 / 删除按钮。"""
+    title_key, content_key, _ = _editor_keys(note_id)
+    st.text_input("笔记标题", key=title_key, on_change=_mark_edited)
+    st.text_area("笔记内容", height=500, key=content_key, on_change=_mark_edited)
+    _autosave_status(notebook_id, note_id, page_title)
+
+    col_note_save, col_note_delete = st.columns([1, 1])
+    with col_note_save:
+        if st.button("💾 保存笔记", type="primary"):
+            if _autosave(note_id, force=True):
+                st.toast("✅ 笔记已保存！")
+                # 只有标题变了才整页重新运行 (更新侧边栏目录)，否则只有编辑区这个 fragment 在运行
+                if st.session_state[title_key] != page_title:
+                    st.rerun()
+            elif st.session_state.get('note_save_status') == "conflict":
+                st.rerun()  # 在上面的保存状态里显示覆盖 / 放弃的选择
+            else:
+                st.toast("内容没有变化。")
+    with col_note_delete:
+        if st.button("🗑️ 删除笔记", type="secondary"):
+            # 为了简化交互，删除操作直接执行，不进行二次确认 (历史版本由外键级联删除)
+            run_query("DELETE FROM notes WHERE id=?", (note_id,))
+            _forget_editor(note_id)
+            st.session_state.pop('editing_note', None)
+            st.toast("✅ 笔记已删除！")
+            # 删除后回到同一个笔记本的最新笔记，如果没有则返回笔记本列表
+            latest_note_after_delete = queries.get_latest_note_id(notebook_id)
+            if latest_note_after_delete:
+                navigate_to("notebook_detail", notebook_id=notebook_id, note_id=latest_note_after_delete)
+            else:
+                navigate_to("notebook_detail", notebook_id=notebook_id)  # 强制刷新笔记本详情页，会显示“没有笔记”提示
+            st.stop()
+
+    current_note = queries.get_note(note_id, notebook_id)
+    if current_note:
+        st.markdown(f"<p style='font-size:0.8em; color:gray;'>最后更新于: {current_note['updated_at']}</p>",
+                    unsafe_allow_html=True)
+
+
+# --- 自动保存 ---
+def _editor_keys(note_id):
+    """标题框、内容框，以及编辑框载入 / 上次保存时的笔记 (见 _base)。"""
+    return f"note_title_edit_{note_id}", f"note_content_edit_{note_id}", f"note_saved_{note_id}"
+
+
+def _base(title, content):
+    """
+    保存的基准：编辑框载入 / 上次保存成功时的笔记 (content 保留数据库里的原值，可能是 NULL)。
+    数据库里的笔记已经不是这个版本时保存会冲突。
+    """
+    return {"title": title, "content": content, "content_hash": revisions.content_hash(content)}
+
+
+def _forget_editor(note_id):
+    for key in _editor_keys(note_id):
+        st.session_state.pop(key, None)
+
+
+def _mark_edited():
+    st.session_state['note_edited_at'] = time.monotonic()
+
+
+def _autosave(note_id, force=False):
+    """
+    编辑框在载入 / 上次保存之后改过、且停止编辑已超过 AUTOSAVE_SECONDS (force=True 时不等) 时保存。
+    是否改过按内容哈希判断，没改时不读也不写数据库。保存以 session 里的基准为准 (不重新读数据库)，
+    笔记在这之后被其他地方改过时不覆盖，状态改为 "conflict"，由用户选择覆盖还是载入最新内容。
+    返回这次是否写入了数据库。
+    """
+    title_key, content_key, base_key = _editor_keys(note_id)
+    if title_key not in st.session_state:
+        return False
+    base = st.session_state[base_key]
+    title, content = st.session_state[title_key], st.session_state[content_key]
+    if (title, revisions.content_hash(content)) == (base['title'], base['content_hash']):
+        return False
+    if not force and time.monotonic() - st.session_state.get('note_edited_at', 0) < AUTOSAVE_SECONDS:
+        st.session_state['note_save_status'] = "pending"
+        return False
+    try:
+        saved = revisions.save_note(note_id, title, content, base)
+    except revisions.NoteConflict:
+        st.session_state['note_save_status'] = "conflict"
+        return False
+    # 只有保存成功之后才前移基准
+    st.session_state[base_key] = _base(title, content)
+    st.session_state['note_save_status'] = "saved"
+    st.session_state['note_saved_at'] = datetime.datetime.now().strftime("%H:%M:%S")
+    return saved
+
+
+@st.fragment(run_every=AUTOSAVE_SECONDS)
+def _autosave_status(notebook_id, note_id, page_title):
+    """每 AUTOSAVE_SECONDS 秒只重新运行这一小块：检查并保存修改，显示保存状态。"""
+    saved = st.session_state.get('note_save_status') != "conflict" and _autosave(note_id)
+    status = st.session_state.get('note_save_status')
+    if status == "pending":
+        st.caption("✏️ 有未保存的修改，停止编辑后自动保存")
+    elif status == "conflict":
+        st.caption("⚠️ 这篇笔记在打开之后被其他地方修改过，自动保存已暂停")
+        col_overwrite, col_reload = st.columns(2)
+        if col_overwrite.button("💾 用我的修改覆盖", key=f"note_overwrite_{note_id}"):
+            latest = queries.get_note(note_id, notebook_id)
+            if latest:
+                st.session_state[_editor_keys(note_id)[2]] = _base(latest['title'], latest['content'])
+            st.session_state['note_save_status'] = None
+            saved = _autosave(note_id, force=True)
+        if col_reload.button("📥 放弃修改，载入最新内容", key=f"note_reload_{note_id}"):
+            _forget_editor(note_id)
+            st.session_state['note_save_status'] = None
+            st.rerun()
+    elif status == "saved":
+        st.caption(f"✅ 已自动保存 {st.session_state['note_saved_at']}")
+    # 标题变了需要整页重新运行，更新侧边栏目录和页面标题
+    if saved and st.session_state[_editor_keys(note_id)[0]] != page_title:
+        st.rerun()
+
+
+# --- 🕘 历史版本 ---
+def _restore(notebook_id, note_id, rev):
+    content = revisions.get_revision(note_id, rev)
+    st.session_state[_editor_keys(note_id)[1]] = content
+    _autosave(note_id, force=True)
+    st.session_state['note_restored'] = rev  # 提示在整页重新运行时显示 (fragment 的回调里不能显示 toast)
+
+
+@st.fragment
+def _render_revisions(notebook_id, note_id):
+    """切换版本、显示方式时只重新运行这一块；恢复之后整页重新运行，让编辑区显示恢复的内容。"""
+    if 'note_restored' in st.session_state:
+        st.rerun()
+    history = revisions.list_revisions(note_id)
+    with st.expander(f"🕘 历史版本 ({len(history)})"):
+        if not history:
+            st.caption("保存后这里会记录每一版的内容。")
+            return
+        by_rev = {r['rev']: r for r in history}
+
+        def label(rev):
+            r = by_rev[rev]
+            kind = "完整" if r['keyframe'] else "差异"
+            return f"第 {rev} 版 · {r['created_at']} · {r['size']} 字 ({kind}，{r['bytes'] / 1024:.1f} KB)"
+
+        col_rev, col_mode = st.columns([3, 1])
+        rev = col_rev.selectbox("版本", list(by_rev), format_func=label, key=f"note_revision_{note_id}")
+        mode = col_mode.radio("显示", ["与编辑框的差异", "完整内容"], key="note_revision_mode")
+        content = revisions.get_revision(note_id, rev)
+        if mode == "完整内容":
+            st.code(content, language=None)
+        else:
+            current = st.session_state.get(_editor_keys(note_id)[1], "")
+            diff = "\n".join(difflib.unified_diff(content.splitlines(), current.splitlines(), f"第 {rev} 版", "编辑框",
+                                                   n=2, lineterm=""))
+            if diff:
+                st.code(diff, language="diff")
+            else:
+                st.caption("与编辑框中的内容相同。")
+        st.button("↩️ 恢复到这一版", key="note_revision_restore", on_click=_restore,
+                  args=(notebook_id, note_id, rev))
@@ -0,0 +1,156 @@
+import html
+import os
+
+import streamlit as st
+
+import cards
+import perf
+from db import get_cache, get_pool, get_writer
+
+# ==========================================
+# 查询性能 (_perf)：run_query 统计、每次 rerun 的火焰图、慢查询日志
+# ==========================================
+# 不在侧边栏导航里，直接访问 ?page=_perf。统计本身在 perf.py，这里只负责展示。
+query_params = st.query_params
+
+FLAME_ROW_PX = 24
+SLOW_LOG_TAIL = 20
+
+
+def _set_enabled():
+    perf.enable(st.session_state['perf_enabled'])
+
+
+def _set_slow_query_ms():
+    perf.set_slow_query_ms(st.session_state['perf_slow_ms'])
+
+
+def _reset():
+    perf.stats.reset()
+    perf.traces.clear()
+
+
+def _flame_tree(queries):
+    """把一次 trace 里的查询按调用链合并成树：根 -> app.py -> 页面函数 -> queries 函数 -> SQL。"""
+    root = {"name": "", "ms": 0.0, "count": 0, "cached": True, "children": {}}
+    for q in queries:
+        node = root
+        node["ms"] += q["ms"]
+        for name in q["stack"] + [q["sql"]]:
+            node = node["children"].setdefault(name, {"name": name, "ms": 0.0, "count": 0, "cached": True,
+                                                      "children": {}})
+            node["ms"] += q["ms"]
+            node["count"] += 1
+            node["cached"] = node["cached"] and q["cached"]
+    return root
+
+
+def _flame_html(root, total_ms):
+    """按耗时比例画的火焰图 (自上而下)；整行宽度是整次 rerun 的耗时，空白部分是 SQL 之外的时间。"""
+    boxes = []
+    depth_max = 0
+
+    def walk(node, left, depth):
+        nonlocal depth_max
+        depth_max = max(depth_max, depth)
+        for child in sorted(node["children"].values(), key=lambda n: n["ms"], reverse=True):
+            width = child["ms"] / total_ms * 100 if total_ms else 0
+            if child["children"]:
+                bg, fg = "#e8f5ff", "#1971c2"  # 调用链上的函数
+            elif child["cached"]:
+                bg, fg = "#e6fcf5", "#0ca678"  # 全部命中读缓存的 SQL
+            else:
+                bg, fg = "#fff3bf", "#f59f00"  # 实际执行的 SQL
+            label = f"{child['name']} · {child['ms']:.1f} ms × {child['count']}"
+            boxes.append(
+                f"<div title='{html.escape(label, quote=True)}' style='position:absolute; left:{left:.3f}%; "
+                f"width:{max(width, 0.2):.3f}%; top:{depth * FLAME_ROW_PX}px; height:{FLAME_ROW_PX - 2}px; "
+                f"background:{bg}; color:{fg}; border-radius:3px; padding:2px 4px; box-sizing:border-box; "
+                f"overflow:hidden; white-space:nowrap; text-overflow:ellipsis; font-size:12px;'>"
+                f"{html.escape(label)}</div>")
+            walk(child, left, depth + 1)
+            left += width
+
+    walk(root, 0.0, 0)
+    return (f"<div style='position:relative; height:{depth_max * FLAME_ROW_PX}px; background:#f7f6f3; "
+            f"border-radius:4px;'>{''.join(boxes)}</div>")
+
+
+def _render_traces():
+    if not perf.traces:
+        st.info("还没有记录。打开 “记录查询” 后到其他页面操作几次再回来。")
+        return
+    traces = list(reversed(perf.traces))
+
+    def label(i):
+        t = traces[i]
+        sql_ms = sum(q["ms"] for q in t["queries"])
+        rerun = " (被 rerun 打断)" if t["interrupted"] else ""
+        return (f"{t['at']} {t['page']}{rerun} · 总计 {t['wall_ms']:.0f} ms · "
+                f"SQL {sql_ms:.1f} ms / {len(t['queries'])} 条")
+
+    selected = st.selectbox("最近的 rerun", range(len(traces)), format_func=label, key="perf_trace")
+    trace = traces[selected]
+    root = _flame_tree(trace["queries"])
+    st.markdown(_flame_html(root, max(trace["wall_ms"], root["ms"])), unsafe_allow_html=True)
+    st.caption("蓝色：调用链上的函数；黄色：执行的 SQL；绿色：命中读缓存的 SQL。鼠标悬停查看完整内容。")
+    with st.expander(f"本次 rerun 的 {len(trace['queries'])} 条查询"):
+        st.dataframe([{"ms": round(q["ms"], 3), "rows": q["rows"], "cached": q["cached"], "site": q["site"],
+                       "sql": q["sql"]} for q in trace["queries"]], use_container_width=True)
+
+
+def _render_slow_log():
+    if not os.path.exists(perf.SLOW_LOG_FILE):
+        st.caption(f"暂无超过 {perf.slow_query_ms:g} ms 的查询。")
+        return
+    with open(perf.SLOW_LOG_FILE, encoding="utf-8") as f:
+        lines = f.readlines()[-SLOW_LOG_TAIL:]
+    st.caption(f"{perf.SLOW_LOG_FILE} 的最后 {len(lines)} 行")
+    st.code("".join(lines), language=None)
+
+
+def _render_live():
+    pool_stats, cache_stats = get_pool().stats(), get_cache().stats()
+    col_pool1, col_pool2, col_cache1, col_cache2 = st.columns(4)
+    col_pool1.metric("连接池复用率", f"{pool_stats['hit_rate']:.0%}", f"新建 {pool_stats['misses']} 次",
+                     delta_color="off")
+    col_pool2.metric("连接 (空闲 / 使用中)", f"{pool_stats['idle']} / {pool_stats['in_use']}")
+    col_cache1.metric("读缓存命中率", f"{cache_stats['hit_rate']:.0%}",
+                      f"{cache_stats['entries']} 条 / {cache_stats['rows']} 行", delta_color="off")
+    col_cache2.metric("缓存淘汰 / 失效", f"{cache_stats['evictions']} / {cache_stats['invalidations']}")
+    card_stats = cards.stats()
+    st.caption(f"卡片渲染缓存：{card_stats['entries']} 张卡片，命中 {card_stats['hits']} 次，"
+               f"重新渲染 {card_stats['misses']} 次")
+    writer_stats = get_writer().stats()
+    st.caption(f"写入线程：{writer_stats['ops']} 次写入，分 {writer_stats['batches']} 批提交 "
+               f"(平均每批 {writer_stats['avg_batch']:.1f}，最多 {writer_stats['largest_batch']})，"
+               f"队列中 {writer_stats['queued']} 个，synchronous={writer_stats['synchronous']}")
+
+    st.subheader("🔥 每次 rerun 的查询")
+    _render_traces()
+
+    st.subheader("📊 按调用位置和 SQL 汇总")
+    summary = perf.stats.snapshot()
+    if summary:
+        st.dataframe(summary, use_container_width=True)
+    else:
+        st.caption("暂无数据。")
+
+    st.subheader("🐢 慢查询日志")
+    _render_slow_log()
+
+
+# --- ⏱️ 查询性能 ---
+def render():
+    st.title("⏱️ 查询性能")
+    st.caption("统计所有经过 run_query 的查询。统计只保存在当前进程内存中，重启后清空；慢查询另外写入日志文件。")
+
+    col_enabled, col_slow, col_live, col_reset = st.columns([1, 1, 1, 1])
+    col_enabled.toggle("记录查询", value=perf.enabled, key="perf_enabled", on_change=_set_enabled)
+    col_slow.number_input("慢查询阈值 (ms)", min_value=0.0, value=perf.slow_query_ms, step=10.0, key="perf_slow_ms",
+                          on_change=_set_slow_query_ms)
+    live = col_live.toggle("每 2 秒自动刷新", key="perf_live")
+    col_reset.button("🧹 清空统计", on_click=_reset, use_container_width=True)
+
+    # 自动刷新时只重新运行下面这一块，不重跑整个页面
+    st.fragment(_render_live, run_every=2 if live else None)()
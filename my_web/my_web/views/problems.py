@@ -0,0 +1,411 @@
+import datetime
+import html
+import json  # 用于处理 tags 的存储
+from collections import namedtuple
+
+import streamlit as st
+
+import cards
+import queries
+import review
+import runner
+from db import get_cache, run_query
+from ui import (bulk_delete_bar, confirm_delete_key, delete_row, deleted_message, go_back, navigate_to, selection_key,
+                set_confirm_delete)
+
+# ==========================================
+# 刷题本 (Problems)：题目列表与题目详情/编辑页
+# ==========================================
+query_params = st.query_params
+
+DIFFICULTY_COLORS = {"简单": "#0ca678", "中等": "#f59f00", "困难": "#fa5252"}
+ProblemCard = namedtuple("ProblemCard", ["mark", "title", "meta", "tags"])
+
+
+# --- 💻 刷题本 (包含列表和详情页逻辑) ---
+def render_list():
+    st.title("💻 算法题库")
+
+    # 筛选器
+    col_filter1, col_filter2, col_filter3 = st.columns([1, 2, 1])
+    all_difficulties = ["所有", "简单", "中等", "困难"]
+    selected_difficulty = col_filter1.selectbox("按难度筛选", all_difficulties, key="diff_filter")
+
+    # 获取所有 unique tags (直接读标签索引表，不再逐行解析 JSON)
+    available_tags = queries.get_all_tags()
+    selected_tags = col_filter2.multiselect("按标签筛选", available_tags, key="tags_filter")
+    page_size = col_filter3.selectbox("每页显示", [20, 50, 100], key="problems_page_size")
+
+    # 已加载的题目存在 session 里，“加载更多” 只读下一页追加到后面。
+    # 筛选条件或每页数量变化时回到第一页；题目被修改过 (读缓存的失效计数只在写入 problems / problem_tags 时增加，
+    # 普通的 rerun 不会改变它) 时按已加载的条数重新读一次。
+    filter_signature = (selected_difficulty, tuple(selected_tags), page_size)
+    generation = get_cache().generation(("problems", "problem_tags"))
+    loaded = st.session_state.get('problems_loaded')
+    if loaded is None or loaded['filter'] != filter_signature:
+        rows, has_more = queries.get_problem_page(selected_difficulty, selected_tags, page_size)
+        loaded = st.session_state['problems_loaded'] = {
+            "filter": filter_signature, "generation": generation, "rows": rows, "has_more": has_more}
+    elif loaded['generation'] != generation:
+        rows, has_more = queries.get_problem_page(selected_difficulty, selected_tags,
+                                                  max(page_size, len(loaded['rows'])))
+        loaded.update(generation=generation, rows=rows, has_more=has_more)
+
+    # 顶部添加按钮
+    with st.expander("➕ 添加新题目"):
+        with st.form("new_problem"):
+            c1, c2 = st.columns([3, 1])
+            new_title = c1.text_input("题目名称", key="add_title")
+            new_diff = c2.selectbox("难度", ["简单", "中等", "困难"], key="add_diff")
+
+            # 标签输入
+            new_tags_input = st.text_input("标签 (用逗号分隔，如: 数组,哈希表)", key="add_tags")
+
+            new_desc = st.text_area("题目描述简要", key="add_desc")
+            submitted = st.form_submit_button("保存题目")
+            if submitted and new_title:
+                tags_list = [t.strip() for t in new_tags_input.split(',') if t.strip()]
+                tags_json = json.dumps(tags_list, ensure_ascii=False)  # 确保中文标签正常存储
+                run_query(
+                    "INSERT INTO problems (title, difficulty, tags, description, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (new_title, new_diff, tags_json, new_desc, datetime.date.today()))
+                st.success("题目已添加！")
+                st.rerun()
+
+    with st.expander("🧪 重新运行所有题解"):
+        st.caption(f"用保存的测试用例重新运行每道题的题解，同时运行 {runner.WORKERS} 道。")
+        if st.button("▶️ 全部运行", key="run_all_tests"):
+            _run_all_tests()
+
+    # 题目列表 (难度与标签筛选都在 SQL 中完成)，以及之后是否还有更多题目
+    problems_to_display, has_more_problems = loaded['rows'], loaded['has_more']
+
+    if not problems_to_display:
+        st.info("没有找到符合条件的题目。")
+    else:
+        # 批量删除栏放在列表上方，但要等各行的勾选框渲染之后才能读到勾选状态
+        bulk_bar = st.container()
+
+        # 自定义表格显示：勾选框留在整页里 (批量删除栏要跟着更新)，其余部分每行一个 fragment
+        for p in problems_to_display:
+            col_select, col_row = st.columns([0.3, 9.7])
+            with col_select:
+                st.checkbox("选择", key=selection_key("problems", p['id']), label_visibility="collapsed")
+            with col_row:
+                _problem_row(p)
+            st.divider()
+
+        with bulk_bar:
+            bulk_delete_bar("problems", [p['id'] for p in problems_to_display], "题目")
+
+        st.caption(f"已显示 {len(problems_to_display)} 道题目")
+        if has_more_problems and st.button("⬇️ 加载更多", use_container_width=True):
+            rows, has_more = queries.get_problem_page(selected_difficulty, selected_tags, page_size,
+                                                      problems_to_display[-1]['id'])
+            loaded.update(rows=problems_to_display + rows, has_more=has_more)
+            st.rerun()
+
+
+def _run_all_tests():
+    bar = st.progress(0.0, text="正在运行...")
+    results = runner.run_all(progress=lambda done, total: bar.progress(done / total, text=f"已运行 {done}/{total} 道题"))
+    bar.empty()
+    if not results:
+        st.info("还没有题目添加测试用例。")
+        return
+    titles = {row['id']: row['title'] for row in run_query(
+        "SELECT id, title FROM problems WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(list(results)),),
+        fetch=True)}
+    passed = sum(result.runtime_ms is not None for result in results.values())
+    st.write(f"共 {len(results)} 道题，{passed} 道全部通过。")
+    st.dataframe([{"题目": titles.get(problem_id, problem_id), "全部通过": result.runtime_ms is not None,
+                   "结果": runner.summary(result)} for problem_id, result in sorted(results.items())],
+                 hide_index=True, use_container_width=True)
+
+
+def _render_problem_card(p):
+    """题目卡片里不随交互变化的部分 (难度色条、标题、难度和日期、标签)，按行版本缓存 (见 cards.py)。"""
+    # 难度颜色处理
+    color = DIFFICULTY_COLORS.get(p['difficulty'], "#fa5252")
+    # 解析标签
+    try:
+        p_tags = json.loads(p['tags']) if p['tags'] else []
+    except (json.JSONDecodeError, TypeError):
+        p_tags = []
+    return ProblemCard(
+        mark=f"<div style='margin-top:10px; width:10px; height:40px; background:{color}; border-radius:4px;'></div>",
+        title=f"**{html.escape(p['title'])}**",
+        meta=f"难度: {p['difficulty']} | 创建日期: {p['created_at']}",
+        tags="".join([f"<span class='tag tag-custom'>{html.escape(str(tag))}</span>" for tag in p_tags]),
+    )
+
+
+@st.fragment
+def _problem_row(p):
+    """列表中的一道题。点删除 / 确认 / 取消时只重新运行这一行。"""
+    if message := deleted_message("problems", p['id']):
+        st.caption(f"🗑️ {message}")
+        return
+
+    card = cards.cached("problems", p, _render_problem_card)
+
+    # 卡片布局
+    # MODIFICATION 1: 调整 col_action 宽度以容纳更多按钮并使其更窄
+    col_mark, col_info, col_action = st.columns([0.2, 7.7, 1.8])
+    with col_mark:
+        st.markdown(card.mark, unsafe_allow_html=True)
+    with col_info:
+        st.markdown(card.title, unsafe_allow_html=True)
+        st.caption(card.meta)
+        # 显示标签
+        if card.tags:
+            st.markdown(card.tags, unsafe_allow_html=True)
+    with col_action:
+        # 查看详情（现在详情页也支持编辑）
+        if st.button("查看详情", key=f"btn_view_{p['id']}", use_container_width=True):
+            navigate_to("problem_detail", id=p['id'], source="code_problems")
+
+        # 删除按钮及确认逻辑 (每道题在 session_state 里有自己的待确认标记)
+        if st.session_state.get(confirm_delete_key("problems", p['id'])):
+            st.warning(f"确定删除 '{p['title']}' 吗？此操作会同时删除所有相关打卡日志且无法撤销！")
+            col_confirm_del1, col_confirm_del2 = st.columns(2)
+            col_confirm_del1.button("✅ 确认删除", key=f"confirm_del_{p['id']}", use_container_width=True,
+                                    on_click=delete_row,
+                                    args=("problems", p['id'], f"题目 '{p['title']}' 及相关日志已删除。"))
+            col_confirm_del2.button("❌ 取消", key=f"cancel_del_{p['id']}", use_container_width=True,
+                                    on_click=set_confirm_delete, args=("problems", p['id'], False))
+        else:
+            st.button("🗑️ 删除", key=f"btn_del_{p['id']}", type="secondary", use_container_width=True,
+                      on_click=set_confirm_delete, args=("problems", p['id'], True))
+
+
+# --- 📝 题目详情页 (独立页面) ---
+def render_detail():
+    p_id = query_params.get("id")
+    source_page = query_params.get("source", "code_problems")  # 记录是从哪来的(日历还是列表)
+
+    # 将来源页面保存到 session_state，以便 go_back 函数使用
+    if 'prev_page_on_detail' not in st.session_state:
+        st.session_state['prev_page_on_detail'] = source_page
+    else:  # 如果在详情页内部切换了，更新来源
+        if query_params.get("source"):
+            st.session_state['prev_page_on_detail'] = query_params.get("source")
+
+    if p_id:
+        problem = queries.get_problem(p_id)
+        if problem:
+
+            # 顶部返回按钮 (删除顶上的删除按钮，并让返回按钮占据完整宽度)
+            col_back_btn = st.columns([1])[0]  # 调整为单列
+            with col_back_btn:
+                if st.button("⬅️ 返回"):
+                    go_back()
+
+            # 编辑区和打卡区各是一个 fragment：改输入框、保存、打卡时只重新运行对应的那一块
+            _problem_editor(p_id)
+            st.divider()
+            _tests_panel(p_id)
+            st.divider()
+            _check_in_panel(p_id)
+
+
+@st.fragment
+def _problem_editor(p_id):
+    """题目标题栏 + 编辑区。标题栏也放在这里，保存后不用整页重新运行就能显示新的标题、难度和标签。"""
+    problem = queries.get_problem(p_id)
+    if not problem:
+        st.error("找不到这道题，可能已经被删除。")
+        return
+
+    # --- 题目名称、难度、标签排列在一行 (只读显示) ---
+    # 准备标签的HTML
+    problem_tags_html = ""
+    try:
+        p_tags_list = json.loads(problem['tags']) if problem['tags'] else []
+        problem_tags_html = "".join(
+            [f"<span class='tag tag-custom' style='margin-right: 5px; margin-bottom: 0;'>{html.escape(str(tag))}</span>"
+             for tag in p_tags_list])
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    # 难度颜色
+    difficulty_bg_color = '#e6fcf5' if problem['difficulty'] == '简单' else (
+        '#fff3bf' if problem['difficulty'] == '中等' else '#fff5f5')
+    difficulty_text_color = '#0ca678' if problem['difficulty'] == '简单' else (
+        '#f59f00' if problem['difficulty'] == '中等' else '#fa5252')
+
+    st.markdown(f"""
+        <div style="display: flex; align-items: center; gap: 15px; margin-bottom: 5px; margin-top: 15px;">
+            <h1 style="margin: 0; font-size: 2em;">{html.escape(problem['title'])}</h1>
+            <span style="
+                display: inline-block;
+                padding: 4px 10px;
+                border-radius: 6px;
+                font-weight: bold;
+                font-size: 0.9em;
+                background-color: {difficulty_bg_color};
+                color: {difficulty_text_color};
+            ">{html.escape(problem['difficulty'] or '')}</span>
+            <div style="display: flex; flex-wrap: wrap; align-items: center;">
+                {problem_tags_html}
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown(f"📅 创建于 {problem['created_at']}")  # 保持创建日期显示
+
+    # --- 编辑区域 ---
+    # Removed st.subheader("📝 编辑题目信息") and the markdown labels for inputs
+
+    # Then, display the input widgets themselves in a row, using hidden labels
+    col_edit_title, col_edit_diff, col_edit_tags = st.columns([3, 1, 2])
+
+    with col_edit_title:
+        st.text_input("题目名称", value=problem['title'],
+                      key="edit_title")  # label_visibility="hidden" removed to make the label visible by default
+
+    with col_edit_diff:
+        all_difficulties = ["简单", "中等", "困难"]
+        # 找到当前难度的索引，如果找不到默认为0
+        initial_difficulty_index = all_difficulties.index(problem['difficulty']) if problem[
+                                                                                        'difficulty'] in all_difficulties else 0
+        st.selectbox("难度", all_difficulties, index=initial_difficulty_index,
+                     key="edit_difficulty")  # label_visibility="hidden" removed
+
+    with col_edit_tags:
+        # 将 JSON 字符串转换为逗号分隔的字符串以便编辑
+        current_tags_str = ""
+        try:
+            p_tags = json.loads(problem['tags']) if problem['tags'] else []
+            current_tags_str = ", ".join(p_tags)
+        except (json.JSONDecodeError, TypeError):
+            # 忽略无效 JSON，将其视为空字符串
+            pass
+        st.text_input("标签 (用逗号分隔，如: 数组,哈希表)", value=current_tags_str,
+                      key="edit_tags_input")  # label_visibility="hidden" removed
+
+    # 主要内容区 (描述、笔记、代码)
+    c1, c2 = st.columns([1, 1])
+
+    with c1:
+        st.subheader("📄 题目描述")
+        st.text_area("描述", value=problem['description'] or "", height=200, key="desc_input")
+
+        st.subheader("💡 思考与笔记")
+        st.text_area("在这里写下你的思路...", value=problem['notes'] or "", height=300,
+                     key="notes_input")
+
+    with c2:
+        st.subheader("💻 代码解答")
+        st.text_area("Python 代码",
+                     value=problem['solution_code'] or "class Solution:\n    def solve(self):",
+                     height=560, key="code_input")
+
+    # 底部保存按钮 (回调里保存，随后这个 fragment 重新运行时标题栏就是新的内容)
+    st.button("💾 保存所有修改", type="primary", on_click=_save_problem, args=(p_id,))
+    if st.session_state.pop('problem_saved', False):
+        st.toast("✅ 保存成功！")
+
+
+def _save_problem(p_id):
+    # 将编辑后的标签字符串转换回 JSON 格式
+    edited_tags_list = [t.strip() for t in st.session_state['edit_tags_input'].split(',') if t.strip()]
+    edited_tags_json = json.dumps(edited_tags_list, ensure_ascii=False)  # 确保中文标签正常存储
+
+    run_query("""
+        UPDATE problems SET title=?, difficulty=?, tags=?, description=?, notes=?, solution_code=? WHERE id=?
+    """, (st.session_state['edit_title'], st.session_state['edit_difficulty'], edited_tags_json,
+          st.session_state['desc_input'], st.session_state['notes_input'], st.session_state['code_input'], p_id))
+    st.session_state['problem_saved'] = True
+
+
+@st.fragment
+def _tests_panel(p_id):
+    """测试用例：添加、删除用例，用保存的题解代码运行 (见 runner.py)。"""
+    st.subheader("🧪 测试用例")
+    st.caption("参数写成 JSON 数组，每个元素是一个参数。运行的是已保存的代码，改了代码请先保存。")
+    if message := st.session_state.pop('tests_message', None):
+        st.error(message)
+
+    last_run = st.session_state.get(f"test_run_{p_id}")
+    if last_run:
+        (st.success if last_run.runtime_ms is not None else st.warning)(f"上次运行：{runner.summary(last_run)}")
+    results = {case.test_id: case for case in last_run.cases} if last_run else {}
+
+    for test in runner.get_tests(p_id):
+        col_args, col_expected, col_result, col_delete = st.columns([4, 3, 3, 1])
+        col_args.code(test['args'], language="json")
+        col_expected.code(test['expected'], language="json")
+        case = results.get(test['id'])
+        if case:
+            timing = f" ({case.runtime_ms:.2f} ms)" if case.runtime_ms is not None else ""
+            col_result.markdown(f"{runner.STATUS_LABELS[case.status]}{timing}")
+            if case.status == "failed":
+                col_result.caption(f"输出：{case.output}")
+            elif case.error:
+                col_result.caption(case.error)
+        col_delete.button("🗑️", key=f"del_test_{test['id']}", on_click=runner.delete_test, args=(test['id'],))
+
+    col_args, col_expected, col_add = st.columns([4, 3, 1], vertical_alignment="bottom")
+    col_args.text_input("参数 (JSON 数组)", placeholder="[[2, 7, 11, 15], 9]", key="new_test_args")
+    col_expected.text_input("期望输出 (JSON)", placeholder="[0, 1]", key="new_test_expected")
+    col_add.button("➕ 添加", on_click=_add_test, args=(p_id,), use_container_width=True)
+    st.button("▶️ 运行测试", on_click=_run_tests, args=(p_id,))
+
+
+def _add_test(p_id):
+    try:
+        runner.add_test(p_id, st.session_state['new_test_args'], st.session_state['new_test_expected'])
+    except ValueError as e:
+        st.session_state['tests_message'] = str(e)
+        return
+    st.session_state['new_test_args'] = ""
+    st.session_state['new_test_expected'] = ""
+
+
+def _run_tests(p_id):
+    st.session_state[f"test_run_{p_id}"] = runner.run_problem(p_id)
+
+
+@st.fragment
+def _check_in_panel(p_id):
+    """打卡区 (关联日历)。"""
+    problem = queries.get_problem(p_id)
+    if not problem:
+        return
+
+    # 打卡区 (关联日历)，同时按这次的回忆质量安排下次复习
+    st.subheader("📅 提交记录 (同步至日历)")
+    if message := st.session_state.pop('check_in_message', None):
+        st.success(message)
+    if problem['review_due']:
+        st.caption(f"🧠 下次复习：{problem['review_due']} (间隔 {problem['review_interval']} 天，"
+                   f"连续做出 {problem['review_reps']} 次)")
+    col_log1, col_log2, col_log3 = st.columns([1, 2, 1])
+    with col_log1:
+        st.date_input("打卡日期", datetime.date.today(), key="check_in_date")
+    with col_log2:
+        st.radio("这次做得怎么样", list(review.QUALITY_LABELS), index=2, horizontal=True,
+                 format_func=review.QUALITY_LABELS.get, key="check_in_quality")
+    with col_log3:
+        # 回调里打卡，随后这个 fragment 重新运行时上面的复习计划就是新的
+        st.button("✅ 今日已刷 (打卡)", on_click=_check_in, args=(p_id,))
+
+    # 每次打卡时测试全部通过的总用时
+    runtimes = run_query("SELECT log_date, runtime_ms FROM logs WHERE problem_id=? AND runtime_ms IS NOT NULL "
+                         "ORDER BY log_date, id", (p_id,), fetch=True)
+    if runtimes:
+        st.caption("⏱️ 历次打卡时运行测试的总用时")
+        st.line_chart({"打卡日期": [str(row['log_date']) for row in runtimes],
+                       "用时 (ms)": [row['runtime_ms'] for row in runtimes]}, x="打卡日期", y="用时 (ms)", height=200)
+
+
+def _check_in(p_id):
+    # 有测试用例时先用保存的题解运行一遍，全部通过才把总用时记到这次打卡上
+    result = runner.run_problem(p_id) if runner.get_tests(p_id) else None
+    state = review.check_in(p_id, st.session_state['check_in_date'], st.session_state['check_in_quality'],
+                            runtime_ms=result.runtime_ms if result else None)
+    message = f"已打卡！下次复习：{state.due}。请去日历查看。"
+    if result:
+        message += f" 测试：{runner.summary(result)}。"
+    st.session_state['check_in_message'] = message
@@ -0,0 +1,119 @@
+import html
+from collections import namedtuple
+
+import streamlit as st
+
+import cards
+import linkcheck
+import queries
+from db import run_query
+from ui import bulk_delete_bar, delete_row, deleted_message, selection_key
+
+# ==========================================
+# 资源库 (Resources)
+# ==========================================
+# 链接是否有效、页面标题和封面由后台任务检查、下载到本地 (见 linkcheck.py)，这里只读数据库和本地文件。
+query_params = st.query_params
+
+LINK_STATUS_LABELS = {
+    "ok": "🟢 链接正常",
+    "broken": "🔴 链接失效",
+    "error": "🟠 无法访问",
+    "invalid": "⚪ 不是网页链接",
+}
+ResourceCard = namedtuple("ResourceCard", ["title", "meta", "page_title", "link"])
+
+
+def _link_status(res):
+    if res['checked_at'] is None:
+        return "⏳ 等待检查" if res['url'] else None
+    label = LINK_STATUS_LABELS.get(res['link_status'])
+    if label and res['http_status'] and res['link_status'] == "broken":
+        label += f" ({res['http_status']})"
+    return label
+
+
+def _recheck_all():
+    run_query("UPDATE resources SET checked_at = NULL")
+    linkcheck.wake()
+
+
+def _render_resource_card(res):
+    """资源卡片里的文字部分，按行版本缓存 (见 cards.py)；后台检查链接写入结果时 rev 也会变。"""
+    link_status = _link_status(res)
+    url = html.escape(res['url'] or "", quote=True)
+    return ResourceCard(
+        title=f"**{html.escape(res['title'])}**",
+        meta=f"🏷️ {res['category']}" + (f"　{link_status}" if link_status else ""),
+        page_title=f"📄 {res['page_title']}" if res['page_title'] and res['page_title'] != res['title'] else None,
+        link=f"链接: <a href='{url}' target='_blank'>{url}</a>" if url else None,
+    )
+
+
+@st.fragment
+def _resource_card(res):
+    """一个资源卡片。点删除时只重新运行这张卡片。"""
+    if message := deleted_message("resources", res['id']):
+        st.caption(f"🗑️ {message}")
+        return
+
+    card = cards.cached("resources", res, _render_resource_card)
+    thumb = linkcheck.thumb_file(res['thumb_path'])
+    if thumb:
+        st.image(thumb, use_container_width=True, caption=res['title'])
+    else:
+        st.markdown(card.title, unsafe_allow_html=True)  # 占位符 (没有封面，或者还没下载到本地)
+    st.caption(card.meta)
+    if card.page_title:
+        st.caption(card.page_title)
+    if card.link:
+        # 同时显示文本链接和可点击链接
+        st.markdown(card.link, unsafe_allow_html=True)
+
+    st.button("🗑️ 删除", key=f"del_res_{res['id']}", on_click=delete_row,
+              args=("resources", res['id'], f"资源 '{res['title']}' 已删除。"))
+
+
+# --- 📦 资源库 ---
+def render():
+    st.title("📦 资源收藏夹")
+    linkcheck.start_worker()
+
+    with st.expander("➕ 添加新资源", expanded=False):
+        with st.form("add_res"):
+            r_title = st.text_input("资源名称", key="res_title")
+            r_cat = st.selectbox("分类", ["书籍", "文章", "视频", "工具", "网站"], key="res_cat")
+            r_url = st.text_input("链接 URL", key="res_url")
+            r_img = st.text_input("封面图片 URL (可选)", placeholder="https://...", key="res_img")
+            sub_res = st.form_submit_button("添加")
+            if sub_res and r_title:
+                run_query("INSERT INTO resources (title, category, url, image_url, status) VALUES (?, ?, ?, ?, ?)",
+                          (r_title, r_cat, r_url, r_img, "待看"))
+                linkcheck.wake()
+                st.success("资源已添加！")
+                st.rerun()
+
+    # 获取所有资源
+    resources = queries.get_resources()
+
+    if not resources:
+        st.info("还没有资源，快去添加一个吧！")
+    else:
+        bulk_bar = st.container()
+        unchecked = linkcheck.count_unchecked()
+        col_check_note, col_check_button = st.columns([4, 1])
+        if unchecked:
+            col_check_note.caption(f"⏳ {unchecked} 个资源的链接和封面正在后台检查，刷新页面即可看到结果。")
+        col_check_button.button("🔄 重新检查链接", on_click=_recheck_all, use_container_width=True)
+
+        # 简单的网格布局
+        cols = st.columns(3)
+        for idx, res in enumerate(resources):
+            with cols[idx % 3]:
+                with st.container(border=True):
+                    _resource_card(res)
+                    # 勾选框留在卡片 fragment 外面，勾选时整页重新运行，批量删除栏才会更新
+                    st.checkbox("选择", key=selection_key("resources", res['id']))
+
+        with bulk_bar:
+            bulk_delete_bar("resources", [res['id'] for res in resources], "资源")
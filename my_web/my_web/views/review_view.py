@@ -0,0 +1,60 @@
+import datetime
+import html
+
+import streamlit as st
+
+import queries
+import review
+from ui import navigate_to
+
+# ==========================================
+# 今日复习 (Review)：按 SM-2 复习计划到期的题目
+# ==========================================
+# 复习计划在每次打卡时由 review.check_in 增量更新，这里只按 review_due 的索引读出到期的题。
+query_params = st.query_params
+
+PAGE_SIZE = 50
+DIFFICULTY_COLORS = {"简单": "#0ca678", "中等": "#f59f00", "困难": "#fa5252"}
+
+
+def _check_in(problem_id, quality):
+    state = review.check_in(problem_id, datetime.date.today(), quality)
+    st.toast(f"✅ 已打卡，下次复习：{state.due}")
+
+
+# --- 🧠 今日复习 ---
+def render():
+    st.title("🧠 今日复习")
+    today = datetime.date.today()
+    due_count, upcoming_count = queries.count_due_reviews(today)
+
+    col_due, col_upcoming = st.columns(2)
+    col_due.metric("今天该复习", due_count)
+    col_upcoming.metric("未来 7 天到期", upcoming_count)
+    st.caption("每道题打卡时选择这次做得怎么样：做得越轻松，下次复习隔得越久；没做出来的明天再练。")
+
+    if not due_count:
+        st.success("🎉 今天没有需要复习的题目。")
+        return
+
+    for p in queries.get_due_reviews(today, PAGE_SIZE):
+        overdue = (today - datetime.date.fromisoformat(p['review_due'])).days
+        col_title, col_buttons = st.columns([3, 4])
+        with col_title:
+            color = DIFFICULTY_COLORS.get(p['difficulty'], "gray")
+            st.markdown(f"**{html.escape(p['title'])}** "
+                        f"<span style='color:{color}; font-size:0.85em;'>{html.escape(p['difficulty'] or '')}</span>",
+                        unsafe_allow_html=True)
+            st.caption(f"{'今天到期' if overdue == 0 else f'已过期 {overdue} 天'} · 上次间隔 {p['review_interval']} 天")
+        with col_buttons:
+            col_open, *col_quality = st.columns(len(review.QUALITY_LABELS) + 1)
+            if col_open.button("打开", key=f"review_open_{p['id']}", use_container_width=True):
+                st.session_state['prev_page_on_detail'] = 'review'
+                navigate_to("problem_detail", id=p['id'], source="review")
+            for col, (quality, label) in zip(col_quality, review.QUALITY_LABELS.items()):
+                col.button(label, key=f"review_{p['id']}_{quality}", use_container_width=True,
+                           on_click=_check_in, args=(p['id'], quality))
+        st.divider()
+
+    if due_count > PAGE_SIZE:
+        st.caption(f"只显示最早到期的 {PAGE_SIZE} 道，复习完这些后会显示剩下的。")
@@ -0,0 +1,51 @@
+import time
+
+import streamlit as st
+
+from search import KIND_NOTE, KIND_PROBLEM, search
+from ui import navigate_to
+
+# ==========================================
+# 全文搜索 (Search)
+# ==========================================
+query_params = st.query_params
+
+
+# --- 🔍 全文搜索 ---
+def render():
+    st.title("🔍 全文搜索")
+    st.caption("在题目 (标题、描述、笔记、代码) 和笔记 (标题、内容) 中搜索，多个关键词用空格分隔。")
+
+    col_search_text, col_search_kind = st.columns([3, 1])
+    # 与新建笔记本的输入框相同：把输入值存在 session_state 里，从详情页返回时仍然保留
+    if 'search_text_value' not in st.session_state:
+        st.session_state.search_text_value = ""
+    search_text = col_search_text.text_input("关键词", value=st.session_state.search_text_value,
+                                             key="search_text_input")
+    st.session_state.search_text_value = search_text
+    search_kind_map = {"全部": None, "题目": KIND_PROBLEM, "笔记": KIND_NOTE}
+    search_kind = col_search_kind.selectbox("范围", list(search_kind_map), key="search_kind")
+
+    if search_text.strip():
+        search_started = time.perf_counter()
+        search_results = search(search_text, kind=search_kind_map[search_kind], limit=50)
+        st.caption(f"共 {len(search_results)} 条结果 · {(time.perf_counter() - search_started) * 1000:.1f} ms")
+
+        if not search_results:
+            st.info("没有找到相关的题目或笔记。")
+        for hit in search_results:
+            col_hit, col_hit_action = st.columns([8, 1])
+            with col_hit:
+                icon = "💻" if hit['kind'] == KIND_PROBLEM else "📝"
+                st.markdown(f"{icon} **{hit['title_html']}**", unsafe_allow_html=True)
+                if hit['snippet_html'].strip():
+                    st.markdown(f"<p style='font-size:0.9em; color:gray;'>{hit['snippet_html']}</p>",
+                                unsafe_allow_html=True)
+            with col_hit_action:
+                if st.button("打开", key=f"search_open_{hit['kind']}_{hit['id']}", use_container_width=True):
+                    if hit['kind'] == KIND_PROBLEM:
+                        st.session_state['prev_page_on_detail'] = 'search'
+                        navigate_to("problem_detail", id=hit['id'], source="search")
+                    else:
+                        navigate_to("notebook_detail", notebook_id=hit['notebook_id'], note_id=hit['id'])
+            st.divider()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+import streamlit as st
+
+import transfer
+
+# ==========================================
+# 导入导出 (Transfer)：批量导入题库、打卡记录和笔记，或导出备份
+# ==========================================
+# 读写逻辑在 transfer.py (命令行也用它)，这里只负责上传/下载和显示进度。
+query_params = st.query_params
+
+TABLE_LABELS = {
+    "problems": "💻 题目",
+    "problem_tests": "🧪 测试用例",
+    "logs": "📅 打卡记录",
+    "notebooks": "📓 笔记本",
+    "notes": "📝 笔记",
+    "resources": "📦 资源",
+}
+MIME_TYPES = {".jsonl": "application/x-ndjson", ".csv": "text/csv", ".parquet": "application/vnd.apache.parquet"}
+
+
+def _progress_callback(bar, verb):
+    def update(done, fraction):
+        bar.progress(min(fraction or 0.0, 1.0), text=f"已{verb} {done} 行")
+    return update
+
+
+# --- 🔁 导入导出 ---
+def render():
+    st.title("🔁 导入导出")
+    st.caption("支持 JSONL、CSV、Parquet。大文件按批写入，不会一次性读进内存。"
+               "带 id 列时按 id 覆盖已有记录，没有 id 时新增；笔记需要先导入所属的笔记本，测试用例和打卡记录需要先导入题目。")
+
+    tab_import, tab_export = st.tabs(["⬆️ 导入", "⬇️ 导出"])
+
+    with tab_import:
+        import_table = st.selectbox("导入到", list(TABLE_LABELS), format_func=TABLE_LABELS.get, key="import_table")
+        uploaded = st.file_uploader("选择文件", type=["jsonl", "json", "csv", "parquet"], key="import_file")
+        if uploaded is not None and st.button("开始导入", type="primary"):
+            bar = st.progress(0.0, text="准备导入...")
+            try:
+                count = transfer.import_rows(import_table, uploaded, progress=_progress_callback(bar, "导入"))
+            except transfer.TransferError as e:
+                st.error(f"{e}。已导入 {e.imported} 行。")
+            except (ValueError, UnicodeDecodeError) as e:
+                st.error(f"无法读取文件：{e}")
+            else:
+                bar.progress(1.0, text=f"已导入 {count} 行")
+                st.success(f"已导入 {count} 行到 {TABLE_LABELS[import_table]}！")
+
+    with tab_export:
+        col_table, col_format = st.columns([2, 1])
+        export_table = col_table.selectbox("导出", list(TABLE_LABELS), format_func=TABLE_LABELS.get,
+                                           key="export_table")
+        export_format = col_format.selectbox("格式", list(transfer.FORMATS), key="export_format")
+        if st.button("生成导出文件"):
+            # 先写到服务器上的临时文件，再提供下载；上一次生成的文件先删掉
+            old_path = st.session_state.get('export_path')
+            if old_path and os.path.exists(old_path):
+                os.remove(old_path)
+            fd, path = tempfile.mkstemp(suffix=export_format, prefix=f"{export_table}_")
+            os.close(fd)
+            bar = st.progress(0.0, text="准备导出...")
+            count = transfer.export_rows(export_table, path, progress=_progress_callback(bar, "导出"))
+            st.session_state['export_path'] = path
+            st.session_state['export_name'] = f"{export_table}{export_format}"
+            st.session_state['export_count'] = count
+
+        export_path = st.session_state.get('export_path')
+        if export_path and os.path.exists(export_path):
+            export_name = st.session_state['export_name']
+            st.caption(f"{export_name}：{st.session_state['export_count']} 行，"
+                       f"{os.path.getsize(export_path) / 1024:.0f} KB")
+            with open(export_path, "rb") as f:
+                st.download_button(f"📥 下载 {export_name}", f, file_name=export_name,
+                                   mime=MIME_TYPES[os.path.splitext(export_name)[1]])